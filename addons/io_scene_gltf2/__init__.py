@@ -57,7 +57,8 @@ import bpy
 from bpy.props import (StringProperty,
                        BoolProperty,
                        EnumProperty,
-                       IntProperty)
+                       IntProperty,
+                       FloatProperty)
 from bpy.types import Operator
 from bpy_extras.io_utils import ImportHelper, ExportHelper
 from io_scene_gltf2.io.exp import gltf2_io_draco_compression_extension
@@ -193,6 +194,13 @@ class ExportGLTF2_Base:
         default=True
     )
 
+    export_split_primitives = BoolProperty(
+        name='Split Large Meshes',
+        description='Split meshes with 65535 vertices or more, for viewers without 32 bit index support. '
+                    'Otherwise a single primitive with 32 bit indices is exported',
+        default=True
+    )
+
     export_cameras = BoolProperty(
         name='Cameras',
         description='Export cameras',
@@ -211,6 +219,12 @@ class ExportGLTF2_Base:
         default=False
     )
 
+    export_validate = BoolProperty(
+        name='Validate',
+        description='Check the type of every glTF property before writing the file',
+        default=True
+    )
+
     export_yup = BoolProperty(
         name='+Y Up',
         description='Export using glTF convention, +Y up',
@@ -249,6 +263,33 @@ class ExportGLTF2_Base:
         default=False
     )
 
+    export_optimize_animation = BoolProperty(
+        name='Optimize Sampled Animations',
+        description='Remove the sampled keyframes that interpolating their neighbours reproduces, '
+                    'and reduce constant animations to a single keyframe',
+        default=False
+    )
+
+    export_optimize_animation_tolerance = FloatProperty(
+        name='Tolerance',
+        description='Maximum difference of the optimized locations, scales and shape key values '
+                    'from the sampled ones',
+        default=0.0001,
+        min=0.0,
+        max=1.0,
+        precision=4
+    )
+
+    export_optimize_animation_angle = FloatProperty(
+        name='Angle Tolerance',
+        description='Maximum angle between the optimized rotations and the sampled ones',
+        subtype='ANGLE',
+        default=0.0001,
+        min=0.0,
+        max=0.1,
+        precision=4
+    )
+
     export_current_frame = BoolProperty(
         name='Use Current Frame',
         description='Export the scene in the current animation frame',
@@ -371,10 +412,12 @@ class ExportGLTF2_Base:
 
         export_settings['gltf_materials'] = self.export_materials
         export_settings['gltf_colors'] = self.export_colors
+        export_settings['gltf_split_primitives'] = self.export_split_primitives
         export_settings['gltf_cameras'] = self.export_cameras
         export_settings['gltf_selected'] = self.export_selected
         export_settings['gltf_layers'] = True  # self.export_layers
         export_settings['gltf_extras'] = self.export_extras
+        export_settings['gltf_validate'] = self.export_validate
         export_settings['gltf_yup'] = self.export_yup
         export_settings['gltf_apply'] = self.export_apply
         export_settings['gltf_current_frame'] = self.export_current_frame
@@ -382,10 +425,14 @@ class ExportGLTF2_Base:
         if self.export_animations:
             export_settings['gltf_frame_range'] = self.export_frame_range
             export_settings['gltf_force_sampling'] = self.export_force_sampling
+            export_settings['gltf_optimize_animation'] = self.export_optimize_animation
         else:
             export_settings['gltf_frame_range'] = False
             export_settings['gltf_move_keyframes'] = False
             export_settings['gltf_force_sampling'] = False
+            export_settings['gltf_optimize_animation'] = False
+        export_settings['gltf_optimize_animation_tolerance'] = self.export_optimize_animation_tolerance
+        export_settings['gltf_optimize_animation_angle'] = self.export_optimize_animation_angle
         export_settings['gltf_skins'] = self.export_skins
         if self.export_skins:
             export_settings['gltf_all_vertex_influences'] = self.export_all_influences
@@ -431,6 +478,7 @@ class ExportGLTF2_Base:
         col.prop(self, 'export_apply')
         col.prop(self, 'export_yup')
         col.prop(self, 'export_extras')
+        col.prop(self, 'export_validate')
         col.prop(self, 'will_save_settings')
         col.prop(self, 'export_copyright')
 
@@ -441,6 +489,7 @@ class ExportGLTF2_Base:
         if self.export_normals:
             col.prop(self, 'export_tangents')
         col.prop(self, 'export_colors')
+        col.prop(self, 'export_split_primitives')
         col.prop(self, 'export_materials')
         if self.export_materials:
             col.prop(self, 'export_image_format')
@@ -469,6 +518,10 @@ class ExportGLTF2_Base:
             col.prop(self, 'export_frame_range')
             col.prop(self, 'export_frame_step')
             col.prop(self, 'export_force_sampling')
+            col.prop(self, 'export_optimize_animation')
+            if self.export_optimize_animation:
+                col.prop(self, 'export_optimize_animation_tolerance')
+                col.prop(self, 'export_optimize_animation_angle')
         col.prop(self, 'export_skins')
         if self.export_skins:
             col.prop(self, 'export_all_influences')
@@ -518,11 +571,41 @@ class ImportGLTF2(Operator, ImportHelper):
         description="How normals are computed during import",
         default="NORMALS")
 
+    import_memory_map = BoolProperty(
+        name='Memory-map files',
+        description='Map .glb and .bin files in memory instead of reading them. '
+                    'Only data actually used is loaded, which saves memory on large files',
+        default=False
+    )
+
+    import_prefetch = BoolProperty(
+        name='Prefetch files',
+        description='Read external buffers and images in background threads while creating objects. '
+                    'Speeds up import of files with many external resources, mostly on network drives',
+        default=False
+    )
+
+    import_strict = BoolProperty(
+        name='Strict validation',
+        description='Check type of every glTF property while loading, and refuse invalid files',
+        default=False
+    )
+
+    import_validate_mesh = BoolProperty(
+        name='Validate meshes',
+        description='Check vertex indices of meshes, and remove invalid, degenerate or duplicate triangles',
+        default=True
+    )
+
     def draw(self, context):
         layout = self.layout
 
         layout.prop(self, 'import_pack_images')
         layout.prop(self, 'import_shading')
+        layout.prop(self, 'import_memory_map')
+        layout.prop(self, 'import_prefetch')
+        layout.prop(self, 'import_strict')
+        layout.prop(self, 'import_validate_mesh')
 
     def execute(self, context):
         return self.import_gltf2(context)
@@ -536,19 +619,27 @@ class ImportGLTF2(Operator, ImportHelper):
         import_settings = self.as_keywords()
 
         self.gltf_importer = glTFImporter(self.filepath, import_settings)
-        success, txt = self.gltf_importer.read()
-        if not success:
-            self.report({'ERROR'}, txt)
-            return {'CANCELLED'}
-        success, txt = self.gltf_importer.checks()
-        if not success:
-            self.report({'ERROR'}, txt)
-            return {'CANCELLED'}
-        self.gltf_importer.log.critical("Data are loaded, start creating Blender stuff")
-        start_time = time.time()
-        BlenderGlTF.create(self.gltf_importer)
-        elapsed_s = "{:.2f}s".format(time.time() - start_time)
-        self.gltf_importer.log.critical("glTF import finished in " + elapsed_s)
+        try:
+            success, txt = self.gltf_importer.read()
+            if not success:
+                self.report({'ERROR'}, txt)
+                return {'CANCELLED'}
+            success, txt = self.gltf_importer.checks()
+            if not success:
+                self.report({'ERROR'}, txt)
+                return {'CANCELLED'}
+            self.gltf_importer.log.critical("Data are loaded, start creating Blender stuff")
+            start_time = time.time()
+            BlenderGlTF.create(self.gltf_importer)
+            elapsed_s = "{:.2f}s".format(time.time() - start_time)
+            self.gltf_importer.log.critical("glTF import finished in " + elapsed_s)
+            self.gltf_importer.log.info("Accessor cache: {} hits, {} misses".format(
+                self.gltf_importer.accessor_cache_hits,
+                self.gltf_importer.accessor_cache_misses
+            ))
+        finally:
+            # Close memory-mapped files and cancel prefetching, also when the import fails
+            self.gltf_importer.release_buffers()
         self.gltf_importer.log.removeHandler(self.gltf_importer.log_handler)
 
         return {'FINISHED'}
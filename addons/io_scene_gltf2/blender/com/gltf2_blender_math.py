@@ -15,6 +15,7 @@
 import bpy
 import typing
 import math
+import numpy as np
 from mathutils import Matrix, Vector, Quaternion, Euler
 
 from io_scene_gltf2.blender.com.gltf2_blender_data_path import get_target_property_name
@@ -170,6 +171,116 @@ def transform_value(value: Vector, _: Matrix = Matrix.Identity(4)) -> Vector:
     return value
 
 
+def rotations_to_quaternions(values: np.ndarray, data_path: str) -> np.ndarray:
+    """Transform rows of rotation values to w first quaternions, as list_to_mathutils does for one value."""
+    target = get_target_property_name(data_path)
+
+    if target in ('delta_rotation_euler', 'rotation_euler'):
+        return euler_to_quaternions(values)
+    elif target == 'rotation_axis_angle':
+        axes = values[:, 1:]
+        lengths = np.linalg.norm(axes, axis=1, keepdims=True)
+        half_angles = np.radians(values[:, :1]) / 2
+        result = np.hstack((np.cos(half_angles), axes * np.sin(half_angles) / np.where(lengths > 0, lengths, 1)))
+        # Null axes give the identity, like mathutils
+        result[lengths[:, 0] == 0] = (1.0, 0.0, 0.0, 0.0)
+        return result
+
+    return values
+
+
+def euler_to_quaternions(eulers: np.ndarray) -> np.ndarray:
+    """Transform rows of XYZ Euler angles to w first quaternions."""
+    cos_x, cos_y, cos_z = np.cos(eulers / 2).T
+    sin_x, sin_y, sin_z = np.sin(eulers / 2).T
+    return np.stack((
+        cos_y * cos_x * cos_z + sin_y * sin_x * sin_z,
+        cos_y * sin_x * cos_z - sin_y * cos_x * sin_z,
+        cos_y * sin_x * sin_z + sin_y * cos_x * cos_z,
+        cos_y * cos_x * sin_z - sin_y * sin_x * cos_z
+    ), axis=1)
+
+
+def quaternions_to_matrices(quaternions: np.ndarray) -> np.ndarray:
+    """Transform rows of unit w first quaternions to 3x3 rotation matrices."""
+    w, x, y, z = quaternions.T
+    return np.stack((
+        np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)), axis=1),
+        np.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)), axis=1),
+        np.stack((2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)), axis=1)
+    ), axis=1)
+
+
+def matrices_to_quaternions(matrices: np.ndarray) -> np.ndarray:
+    """Transform 3x3 matrices to unit w first quaternions of their rotations, with w positive like mathutils."""
+    # Scale is removed by normalizing the axes
+    m = matrices / np.linalg.norm(matrices, axis=1, keepdims=True)
+    result = np.empty((len(m), 4))
+
+    # Largest of w, x, y and z first, the others are derived from it
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    w_first = trace > -0.9996
+    x_first = ~w_first & (m[:, 0, 0] > m[:, 1, 1]) & (m[:, 0, 0] > m[:, 2, 2])
+    y_first = ~w_first & ~x_first & (m[:, 1, 1] > m[:, 2, 2])
+    z_first = ~w_first & ~x_first & ~y_first
+
+    c = m[w_first]
+    s = 2 * np.sqrt(1 + c[:, 0, 0] + c[:, 1, 1] + c[:, 2, 2])
+    result[w_first] = np.stack((s / 4, (c[:, 2, 1] - c[:, 1, 2]) / s, (c[:, 0, 2] - c[:, 2, 0]) / s,
+                                (c[:, 1, 0] - c[:, 0, 1]) / s), axis=1)
+    c = m[x_first]
+    s = 2 * np.sqrt(np.maximum(1 + c[:, 0, 0] - c[:, 1, 1] - c[:, 2, 2], 0))
+    result[x_first] = np.stack(((c[:, 2, 1] - c[:, 1, 2]) / s, s / 4, (c[:, 0, 1] + c[:, 1, 0]) / s,
+                                (c[:, 0, 2] + c[:, 2, 0]) / s), axis=1)
+    c = m[y_first]
+    s = 2 * np.sqrt(np.maximum(1 + c[:, 1, 1] - c[:, 0, 0] - c[:, 2, 2], 0))
+    result[y_first] = np.stack(((c[:, 0, 2] - c[:, 2, 0]) / s, (c[:, 0, 1] + c[:, 1, 0]) / s, s / 4,
+                                (c[:, 1, 2] + c[:, 2, 1]) / s), axis=1)
+    c = m[z_first]
+    s = 2 * np.sqrt(np.maximum(1 + c[:, 2, 2] - c[:, 0, 0] - c[:, 1, 1], 0))
+    result[z_first] = np.stack(((c[:, 1, 0] - c[:, 0, 1]) / s, (c[:, 0, 2] + c[:, 2, 0]) / s,
+                                (c[:, 1, 2] + c[:, 2, 1]) / s, s / 4), axis=1)
+
+    result /= np.linalg.norm(result, axis=1, keepdims=True)
+    result[result[:, 0] < 0] *= -1
+    return result
+
+
+def transform_array(values: np.ndarray, data_path: str, transform: Matrix = Matrix.Identity(4)) -> np.ndarray:
+    """Manage transformations of rows of values, rotations being w first quaternions."""
+    target = get_target_property_name(data_path)
+    matrix = np.array(transform, dtype=np.float64)
+
+    if target in ('delta_location', 'location'):
+        return values @ matrix[:3, :3].T + matrix[:3, 3]
+    elif target in ('delta_rotation_euler', 'rotation_axis_angle', 'rotation_euler', 'rotation_quaternion'):
+        lengths = np.linalg.norm(values, axis=1, keepdims=True)
+        rotations = quaternions_to_matrices(values / np.where(lengths > 0, lengths, 1))
+        return matrices_to_quaternions(matrix[:3, :3] @ rotations)
+    elif target == 'scale':
+        return np.abs(values) * np.linalg.norm(matrix[:3, :3], axis=0)
+    elif target == 'value':
+        return values
+
+    raise RuntimeError("Cannot transform values at {}".format(data_path))
+
+
+def swizzle_yup_array(values: np.ndarray, data_path: str) -> np.ndarray:
+    """Manage Yup of rows of values, rotations being w first quaternions."""
+    target = get_target_property_name(data_path)
+
+    if target in ('delta_location', 'location'):
+        return values[:, (0, 2, 1)] * (1, 1, -1)
+    elif target in ('delta_rotation_euler', 'rotation_axis_angle', 'rotation_euler', 'rotation_quaternion'):
+        return values[:, (0, 1, 3, 2)] * (1, 1, 1, -1)
+    elif target == 'scale':
+        return values[:, (0, 2, 1)]
+    elif target == 'value':
+        return values
+
+    raise RuntimeError("Cannot transform values at {}".format(data_path))
+
+
 def round_if_near(value: float, target: float) -> float:
     """If value is very close to target, round to target."""
     return value if abs(value - target) > 2.0e-6 else target
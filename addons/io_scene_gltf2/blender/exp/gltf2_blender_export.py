@@ -20,6 +20,7 @@ import traceback
 from io_scene_gltf2.blender.com import gltf2_blender_json
 from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
 from io_scene_gltf2.blender.exp import gltf2_blender_gather
+from io_scene_gltf2.blender.exp import gltf2_blender_gather_cache
 from io_scene_gltf2.blender.exp.gltf2_blender_gltf2_exporter import GlTF2Exporter
 from io_scene_gltf2.io.com.gltf2_io_debug import print_console, print_newline
 from io_scene_gltf2.io.exp import gltf2_io_export
@@ -37,8 +38,8 @@ def save(context, export_settings):
 
     __notify_start(context)
     start_time = time.time()
-    json, buffer = __export(export_settings)
-    __write_file(json, buffer, export_settings)
+    gltf, buffer = __export(export_settings)
+    __write_file(gltf, buffer, export_settings)
 
     end_time = time.time()
     __notify_end(context, end_time - start_time)
@@ -50,13 +51,24 @@ def save(context, export_settings):
 
 def __export(export_settings):
     export_settings['gltf_channelcache'] = dict()
-    exporter = GlTF2Exporter(__get_copyright(export_settings))
-    __gather_gltf(exporter, export_settings)
-    buffer = __create_buffer(exporter, export_settings)
-    exporter.finalize_images(export_settings[gltf2_blender_export_keys.FILE_DIRECTORY])
-    json = __fix_json(exporter.glTF.to_dict())
+    # Results of the gather functions, for this export only
+    export_settings[gltf2_blender_export_keys.CACHE] = gltf2_blender_gather_cache.ExportCache()
+    try:
+        exporter = GlTF2Exporter(__get_copyright(export_settings))
+        __gather_gltf(exporter, export_settings)
+        buffer = __create_buffer(exporter, export_settings)
+        exporter.finalize_images(export_settings[gltf2_blender_export_keys.FILE_DIRECTORY])
+    finally:
+        __drop_cache(export_settings)
+
+    return exporter.glTF, buffer
+
 
-    return json, buffer
+def __drop_cache(export_settings):
+    cache = export_settings.pop(gltf2_blender_export_keys.CACHE)
+    for name, (hits, misses, size) in sorted(cache.statistics().items()):
+        print_console('DEBUG', 'Cache of {}: {} hits, {} misses, {} results'.format(name, hits, misses, size))
+    cache.clear()
 
 
 def __get_copyright(export_settings):
@@ -77,9 +89,17 @@ def __gather_gltf(exporter, export_settings):
     for animation in animations:
         exporter.add_animation(animation)
 
+    if gltf2_blender_export_keys.OPTIMIZED_KEYFRAMES in export_settings:
+        total, removed = export_settings.pop(gltf2_blender_export_keys.OPTIMIZED_KEYFRAMES)
+        print_console('INFO', 'Animation optimization removed {} of {} sampled keyframes'.format(removed, total))
+    if gltf2_blender_export_keys.SAMPLER_INPUTS in export_settings:
+        inputs, (samplers, bytes_saved) = export_settings.pop(gltf2_blender_export_keys.SAMPLER_INPUTS)
+        print_console('INFO', '{} animation samplers share {} inputs, saving {} bytes'.format(
+            samplers, len(inputs), bytes_saved))
+
 
 def __create_buffer(exporter, export_settings):
-    buffer = bytes()
+    buffer = None
     if export_settings[gltf2_blender_export_keys.FORMAT] == 'GLB':
         buffer = exporter.finalize_buffer(export_settings[gltf2_blender_export_keys.FILE_DIRECTORY], is_glb=True)
     else:
@@ -92,48 +112,14 @@ def __create_buffer(exporter, export_settings):
     return buffer
 
 
-def __fix_json(obj):
-    # TODO: move to custom JSON encoder
-    fixed = obj
-    if isinstance(obj, dict):
-        fixed = {}
-        for key, value in obj.items():
-            if not __should_include_json_value(key, value):
-                continue
-            fixed[key] = __fix_json(value)
-    elif isinstance(obj, list):
-        fixed = []
-        for value in obj:
-            fixed.append(__fix_json(value))
-    elif isinstance(obj, float):
-        # force floats to int, if they are integers (prevent INTEGER_WRITTEN_AS_FLOAT validator warnings)
-        if int(obj) == obj:
-            return int(obj)
-    return fixed
-
-
-def __should_include_json_value(key, value):
-    allowed_empty_collections = ["KHR_materials_unlit"]
-
-    if value is None:
-        return False
-    elif __is_empty_collection(value) and key not in allowed_empty_collections:
-        return False
-    return True
-
-
-def __is_empty_collection(value):
-    return (isinstance(value, dict) or isinstance(value, list)) and len(value) == 0
-
-
-def __write_file(json, buffer, export_settings):
+def __write_file(gltf, buffer, export_settings):
     try:
         gltf2_io_export.save_gltf(
-            json,
+            gltf,
             export_settings,
             gltf2_blender_json.BlenderJSONEncoder,
             buffer)
-    except AssertionError as e:
+    except (AssertionError, ValueError) as e:
         _, _, tb = sys.exc_info()
         traceback.print_tb(tb)  # Fixed format
         tb_info = traceback.extract_tb(tb)
@@ -31,7 +31,13 @@ DISPLACEMENT = 'gltf_displacement'
 FORCE_SAMPLING = 'gltf_force_sampling'
 FRAME_RANGE = 'gltf_frame_range'
 FRAME_STEP = 'gltf_frame_step'
+OPTIMIZE_ANIMATION = 'gltf_optimize_animation'
+OPTIMIZE_ANIMATION_TOLERANCE = 'gltf_optimize_animation_tolerance'
+OPTIMIZE_ANIMATION_ANGLE = 'gltf_optimize_animation_angle'
+OPTIMIZED_KEYFRAMES = 'gltf_optimized_keyframes'
+SAMPLER_INPUTS = 'gltf_sampler_inputs'
 JOINT_CACHE = 'gltf_joint_cache'
+CACHE = 'gltf_cache'
 COPYRIGHT = 'gltf_copyright'
 FORMAT = 'gltf_format'
 FILE_DIRECTORY = 'gltf_filedirectory'
@@ -45,7 +51,9 @@ TANGENTS = 'gltf_tangents'
 MORPH_TANGENT = 'gltf_morph_tangent'
 MORPH_NORMAL = 'gltf_morph_normal'
 MATERIALS = 'gltf_materials'
+SPLIT_PRIMITIVES = 'gltf_split_primitives'
 EXTRAS = 'gltf_extras'
+VALIDATE = 'gltf_validate'
 CAMERAS = 'gltf_cameras'
 LIGHTS = 'gltf_lights'
 ANIMATIONS = 'gltf_animations'
@@ -16,13 +16,14 @@
 # Imports
 #
 
+import bpy
+import numpy as np
 from mathutils import Vector, Quaternion
 from mathutils.geometry import tessellate_polygon
-from operator import attrgetter
 
 from . import gltf2_blender_export_keys
 from ...io.com.gltf2_io_debug import print_console
-from ...io.com.gltf2_io_color_management import color_srgb_to_scene_linear
+from ...io.com.gltf2_io_color_management import color_srgb_to_scene_linear_array
 from io_scene_gltf2.blender.exp import gltf2_blender_gather_skins
 
 #
@@ -48,17 +49,6 @@ POSITION_ATTRIBUTE = 'POSITION'
 GLTF_MAX_COLORS = 2
 
 
-#
-# Classes
-#
-
-class ShapeKey:
-    def __init__(self, shape_key, vertex_normals, polygon_normals):
-        self.shape_key = shape_key
-        self.vertex_normals = vertex_normals
-        self.polygon_normals = polygon_normals
-
-
 #
 # Functions
 #
@@ -71,6 +61,18 @@ def convert_swizzle_location(loc, export_settings):
         return Vector((loc[0], loc[1], loc[2]))
 
 
+def convert_swizzle_locations(locs, export_settings):
+    """Convert an array of locations (one per row) from Blender coordinate system to glTF coordinate system."""
+    if export_settings[gltf2_blender_export_keys.YUP]:
+        result = np.empty_like(locs)
+        result[:, 0] = locs[:, 0]
+        result[:, 1] = locs[:, 2]
+        result[:, 2] = -locs[:, 1]
+        return result
+    else:
+        return locs.copy()
+
+
 def convert_swizzle_tangent(tan, export_settings):
     """Convert a tangent from Blender coordinate system to glTF coordinate system."""
     if tan[0] == 0.0 and tan[1] == 0.0 and tan[2] == 0.0:
@@ -107,280 +109,272 @@ def decompose_transition(matrix, export_settings):
 
     return translation, rotation, scale
 
-def extract_primitive_floor(a, indices, use_tangents):
-    """Shift indices, that the first one starts with 0. It is assumed, that the indices are packed."""
-    attributes = {
-        POSITION_ATTRIBUTE: [],
-        NORMAL_ATTRIBUTE: []
-    }
-
-    if use_tangents:
-        attributes[TANGENT_ATTRIBUTE] = []
-
-    result_primitive = {
-        MATERIAL_ID: a[MATERIAL_ID],
-        INDICES_ID: [],
-        ATTRIBUTES_ID: attributes
-    }
-
-    source_attributes = a[ATTRIBUTES_ID]
-
-    #
-
-    tex_coord_index = 0
-    process_tex_coord = True
-    while process_tex_coord:
-        tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
 
-        if source_attributes.get(tex_coord_id) is not None:
-            attributes[tex_coord_id] = []
-            tex_coord_index += 1
-        else:
-            process_tex_coord = False
-
-    tex_coord_max = tex_coord_index
-
-    #
-
-    color_index = 0
-    process_color = True
-    while process_color:
-        color_id = COLOR_PREFIX + str(color_index)
-
-        if source_attributes.get(color_id) is not None:
-            attributes[color_id] = []
-            color_index += 1
-        else:
-            process_color = False
-
-    color_max = color_index
-
-    #
+def split_primitive(a, max_vertices):
+    """
+    Split a primitive into primitives of consecutive triangles, each using at most max_vertices vertices.
 
-    bone_index = 0
-    process_bone = True
-    while process_bone:
-        joint_id = JOINTS_PREFIX + str(bone_index)
-        weight_id = WEIGHTS_PREFIX + str(bone_index)
+    Triangles are added greedily to the current primitive, in a single pass. The vertex count of every
+    prefix of a window of triangles is known after numbering the window vertices in order of first
+    appearance. Windows end where the vertices never seen before would exceed max_vertices by themselves.
+    """
+    indices = np.asarray(a[INDICES_ID], dtype=np.uint32)
+    triangle_count = len(indices) // 3
 
-        if source_attributes.get(joint_id) is not None:
-            attributes[joint_id] = []
-            attributes[weight_id] = []
-            bone_index += 1
-        else:
-            process_bone = False
+    # Vertices seen for the first time in the primitive, up to each triangle:
+    # a lower bound of the vertex count of any run of triangles.
+    _, first_positions = np.unique(indices, return_index=True)
+    is_new = np.zeros(len(indices), dtype=np.int64)
+    is_new[first_positions] = 1
+    new_vertex_counts = np.cumsum(is_new.reshape(-1, 3).sum(axis=1))
 
-    bone_max = bone_index
+    # Bound the window size, even when vertices are shared by a lot of triangles
+    max_window = 4 * max_vertices
 
-    #
+    start = 0
+    while start < triangle_count:
+        seen = new_vertex_counts[start - 1] if start > 0 else 0
+        end = np.searchsorted(new_vertex_counts, seen + max_vertices, side='right')
+        end = max(start + 1, min(end, start + max_window))
 
-    morph_index = 0
-    process_morph = True
-    while process_morph:
-        morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-        morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-        morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+        window_indices = indices[start * 3:end * 3]
+        new_indices, first_positions = __pack_indices(window_indices)
 
-        if source_attributes.get(morph_position_id) is not None:
-            attributes[morph_position_id] = []
-            attributes[morph_normal_id] = []
-            if use_tangents:
-                attributes[morph_tangent_id] = []
-            morph_index += 1
-        else:
-            process_morph = False
+        # Vertex count of the first triangles of the window
+        vertex_counts = np.maximum.accumulate(new_indices.reshape(-1, 3).max(axis=1)) + 1
+        count = np.searchsorted(vertex_counts, max_vertices, side='right')
+        vertex_count = vertex_counts[count - 1]
 
-    morph_max = morph_index
+        yield __extract_vertices(a, new_indices[:count * 3], window_indices[first_positions[:vertex_count]])
 
-    #
+        start += count
 
-    min_index = min(indices)
-    max_index = max(indices)
 
-    for old_index in indices:
-        result_primitive[INDICES_ID].append(old_index - min_index)
+def __extract_vertices(a, indices, old_indices):
+    """Primitive made of the vertices old_indices of a, with the given indices."""
+    source_attributes = a[ATTRIBUTES_ID]
+    vertex_count = len(source_attributes[POSITION_ATTRIBUTE]) // 3
 
-    for old_index in range(min_index, max_index + 1):
-        for vi in range(0, 3):
-            attributes[POSITION_ATTRIBUTE].append(source_attributes[POSITION_ATTRIBUTE][old_index * 3 + vi])
-            attributes[NORMAL_ATTRIBUTE].append(source_attributes[NORMAL_ATTRIBUTE][old_index * 3 + vi])
+    attributes = {}
+    for attribute_id, source in source_attributes.items():
+        attributes[attribute_id] = source.reshape(vertex_count, -1)[old_indices].ravel()
 
-        if use_tangents:
-            for vi in range(0, 4):
-                attributes[TANGENT_ATTRIBUTE].append(source_attributes[TANGENT_ATTRIBUTE][old_index * 4 + vi])
-
-        for tex_coord_index in range(0, tex_coord_max):
-            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-            for vi in range(0, 2):
-                attributes[tex_coord_id].append(source_attributes[tex_coord_id][old_index * 2 + vi])
-
-        for color_index in range(0, color_max):
-            color_id = COLOR_PREFIX + str(color_index)
-            for vi in range(0, 4):
-                attributes[color_id].append(source_attributes[color_id][old_index * 4 + vi])
-
-        for bone_index in range(0, bone_max):
-            joint_id = JOINTS_PREFIX + str(bone_index)
-            weight_id = WEIGHTS_PREFIX + str(bone_index)
-            for vi in range(0, 4):
-                attributes[joint_id].append(source_attributes[joint_id][old_index * 4 + vi])
-                attributes[weight_id].append(source_attributes[weight_id][old_index * 4 + vi])
-
-        for morph_index in range(0, morph_max):
-            morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-            morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-            morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-            for vi in range(0, 3):
-                attributes[morph_position_id].append(source_attributes[morph_position_id][old_index * 3 + vi])
-                attributes[morph_normal_id].append(source_attributes[morph_normal_id][old_index * 3 + vi])
-            if use_tangents:
-                for vi in range(0, 4):
-                    attributes[morph_tangent_id].append(source_attributes[morph_tangent_id][old_index * 4 + vi])
+    return {
+        MATERIAL_ID: a[MATERIAL_ID],
+        INDICES_ID: indices.astype(np.uint32),
+        ATTRIBUTES_ID: attributes
+    }
 
-    return result_primitive
 
+def __pack_indices(keys):
+    """
+    Number the distinct keys in order of first appearance.
 
-def extract_primitive_pack(a, indices, use_tangents):
-    """Pack indices, that the first one starts with 0. Current indices can have gaps."""
-    attributes = {
-        POSITION_ATTRIBUTE: [],
-        NORMAL_ATTRIBUTE: []
-    }
+    Return the new index of each key, and the position of the first appearance of each new index.
+    """
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    return new_index[inverse.ravel()], first[order]
 
-    if use_tangents:
-        attributes[TANGENT_ATTRIBUTE] = []
 
-    result_primitive = {
-        MATERIAL_ID: a[MATERIAL_ID],
-        INDICES_ID: [],
-        ATTRIBUTES_ID: attributes
-    }
+def __get_array(collection, attribute, components, dtype=np.float32):
+    """Read an attribute of all elements of a Blender collection at once."""
+    array = np.empty(len(collection) * components, dtype=dtype)
+    collection.foreach_get(attribute, array)
+    if components > 1:
+        array = array.reshape(-1, components)
+    return array
 
-    source_attributes = a[ATTRIBUTES_ID]
 
-    #
+def __normalize(vectors):
+    """Normalize vectors (one per row). Zero length vectors are kept as they are."""
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, lengths, out=vectors.copy(), where=lengths > 0.0)
 
-    tex_coord_index = 0
-    process_tex_coord = True
-    while process_tex_coord:
-        tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
 
-        if source_attributes.get(tex_coord_id) is not None:
-            attributes[tex_coord_id] = []
-            tex_coord_index += 1
-        else:
-            process_tex_coord = False
+def __rotate_by_difference(vectors, sources, targets):
+    """
+    Rotate vectors by the rotations from the sources to the targets directions.
 
-    tex_coord_max = tex_coord_index
+    Vectorized equivalent of vector.rotate(source.rotation_difference(target)).
+    """
+    sources = __normalize(sources)
+    targets = __normalize(targets)
+
+    axes = np.cross(sources, targets)
+    sines = np.linalg.norm(axes, axis=1)
+    cosines = np.sum(sources * targets, axis=1)
+    result = vectors.copy()
+
+    # Rodrigues' rotation formula
+    rotated = sines > np.finfo(np.float32).eps
+    axes = axes[rotated] / sines[rotated, None]
+    angles = np.arccos(np.clip(cosines[rotated], -1.0, 1.0))
+    v = vectors[rotated]
+    result[rotated] = v * np.cos(angles)[:, None] + np.cross(axes, v) * np.sin(angles)[:, None] + \
+        axes * (np.sum(axes * v, axis=1) * (1.0 - np.cos(angles)))[:, None]
+
+    # Opposite directions: half turn around an orthogonal axis
+    opposed = ~rotated & (cosines < 0.0)
+    if opposed.any():
+        s = sources[opposed]
+        dominant = np.argmax(np.abs(s), axis=1)
+        axes = np.where(
+            (dominant == 0)[:, None],
+            np.stack((-s[:, 1] - s[:, 2], s[:, 0], s[:, 0]), axis=1),
+            np.where(
+                (dominant == 1)[:, None],
+                np.stack((s[:, 1], -s[:, 0] - s[:, 2], s[:, 1]), axis=1),
+                np.stack((s[:, 2], s[:, 2], -s[:, 0] - s[:, 1]), axis=1)))
+        axes = __normalize(axes)
+        v = vectors[opposed]
+        result[opposed] = 2.0 * axes * np.sum(axes * v, axis=1)[:, None] - v
+
+    return result
+
+
+def get_loop_triangles(blender_mesh):
+    """
+    Loop indices of the triangles of all polygons (one triangle per row), from the tessellation of Blender.
 
-    #
+    Also return the material index of each triangle. Triangles are in polygon order.
+    """
+    blender_mesh.calc_loop_triangles()
+    triangle_loops = __get_array(blender_mesh.loop_triangles, 'loops', 3, np.int32)
+    triangle_materials = __get_array(blender_mesh.loop_triangles, 'material_index', 1, np.int32)
+    return triangle_loops, triangle_materials
 
-    color_index = 0
-    process_color = True
-    while process_color:
-        color_id = COLOR_PREFIX + str(color_index)
 
-        if source_attributes.get(color_id) is not None:
-            attributes[color_id] = []
-            color_index += 1
-        else:
-            process_color = False
+def tessellate_polygons(loop_starts, loop_totals, loop_vertices, vertex_locations):
+    """
+    Loop indices of the triangles of all polygons (one triangle per row), tessellating polygons one by one.
 
-    color_max = color_index
+    Also return the polygon of each triangle. Used when loop triangles are not available (Blender 2.79).
+    """
+    triangle_polygons = [np.flatnonzero(loop_totals == 3)]
+    triangle_loops = [loop_starts[triangle_polygons[0], None] + np.arange(3)]
 
-    #
+    ngon_polygons = []
+    ngon_loops = []
+    for polygon_index in np.flatnonzero(loop_totals > 3):
+        # Triangulation of polygon. Using internal function, as non-convex polygons could exist.
+        loop_start = loop_starts[polygon_index]
+        loop_end = loop_start + loop_totals[polygon_index]
+        polyline = [Vector(vertex_locations[vertex_index]) for vertex_index in loop_vertices[loop_start:loop_end]]
 
-    bone_index = 0
-    process_bone = True
-    while process_bone:
-        joint_id = JOINTS_PREFIX + str(bone_index)
-        weight_id = WEIGHTS_PREFIX + str(bone_index)
+        for triangle in tessellate_polygon((polyline,)):
+            ngon_loops.append((loop_start + triangle[0], loop_start + triangle[2], loop_start + triangle[1]))
+            ngon_polygons.append(polygon_index)
 
-        if source_attributes.get(joint_id) is not None:
-            attributes[joint_id] = []
-            attributes[weight_id] = []
-            bone_index += 1
-        else:
-            process_bone = False
+    if ngon_polygons:
+        triangle_polygons.append(np.array(ngon_polygons, dtype=triangle_polygons[0].dtype))
+        triangle_loops.append(np.array(ngon_loops, dtype=triangle_loops[0].dtype))
 
-    bone_max = bone_index
+    triangle_polygons = np.concatenate(triangle_polygons)
+    triangle_loops = np.concatenate(triangle_loops)
 
-    #
+    # Keep the polygon order
+    order = np.argsort(triangle_polygons, kind='stable')
+    return triangle_loops[order], triangle_polygons[order]
 
-    morph_index = 0
-    process_morph = True
-    while process_morph:
-        morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-        morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-        morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
 
-        if source_attributes.get(morph_position_id) is not None:
-            attributes[morph_position_id] = []
-            attributes[morph_normal_id] = []
-            if use_tangents:
-                attributes[morph_tangent_id] = []
-            morph_index += 1
-        else:
-            process_morph = False
+def __get_joint_table(blender_vertex_groups, modifiers, export_settings):
+    """
+    Joint index of each vertex group, or -1 for vertex groups that are not joints of the skin.
 
-    morph_max = morph_index
+    Return None when the mesh has no skin.
+    """
+    if modifiers is None:
+        return None
 
-    #
+    modifiers_dict = {m.type: m for m in modifiers}
+    if "ARMATURE" not in modifiers_dict:
+        return None
 
-    old_to_new_indices = {}
-    new_to_old_indices = {}
+    modifier = modifiers_dict["ARMATURE"]
+    armature = modifier.object
+    if not armature:
+        return None
 
-    new_index = 0
-    for old_index in indices:
-        if old_to_new_indices.get(old_index) is None:
-            old_to_new_indices[old_index] = new_index
-            new_to_old_indices[new_index] = old_index
-            new_index += 1
+    skin = gltf2_blender_gather_skins.gather_skin(armature, modifier.id_data, export_settings)
+    if skin is None:
+        return None
 
-        result_primitive[INDICES_ID].append(old_to_new_indices[old_index])
+    joint_indices = {}
+    for index, joint in enumerate(skin.joints):
+        joint_indices.setdefault(joint.name, index)
 
-    end_new_index = new_index
+    joint_table = np.full(len(blender_vertex_groups), -1, dtype=np.int32)
+    for vertex_group_index, vertex_group in enumerate(blender_vertex_groups):
+        joint_table[vertex_group_index] = joint_indices.get(vertex_group.name, -1)
 
-    for new_index in range(0, end_new_index):
-        old_index = new_to_old_indices[new_index]
+    return joint_table
 
-        for vi in range(0, 3):
-            attributes[POSITION_ATTRIBUTE].append(source_attributes[POSITION_ATTRIBUTE][old_index * 3 + vi])
-            attributes[NORMAL_ATTRIBUTE].append(source_attributes[NORMAL_ATTRIBUTE][old_index * 3 + vi])
 
-        if use_tangents:
-            for vi in range(0, 4):
-                attributes[TANGENT_ATTRIBUTE].append(source_attributes[TANGENT_ATTRIBUTE][old_index * 4 + vi])
-
-        for tex_coord_index in range(0, tex_coord_max):
-            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-            for vi in range(0, 2):
-                attributes[tex_coord_id].append(source_attributes[tex_coord_id][old_index * 2 + vi])
-
-        for color_index in range(0, color_max):
-            color_id = COLOR_PREFIX + str(color_index)
-            for vi in range(0, 4):
-                attributes[color_id].append(source_attributes[color_id][old_index * 4 + vi])
-
-        for bone_index in range(0, bone_max):
-            joint_id = JOINTS_PREFIX + str(bone_index)
-            weight_id = WEIGHTS_PREFIX + str(bone_index)
-            for vi in range(0, 4):
-                attributes[joint_id].append(source_attributes[joint_id][old_index * 4 + vi])
-                attributes[weight_id].append(source_attributes[weight_id][old_index * 4 + vi])
-
-        for morph_index in range(0, morph_max):
-            morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-            morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-            morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-            for vi in range(0, 3):
-                attributes[morph_position_id].append(source_attributes[morph_position_id][old_index * 3 + vi])
-                attributes[morph_normal_id].append(source_attributes[morph_normal_id][old_index * 3 + vi])
-            if use_tangents:
-                for vi in range(0, 4):
-                    attributes[morph_tangent_id].append(source_attributes[morph_tangent_id][old_index * 4 + vi])
+def __get_vertex_joints(blender_mesh, used_vertices, blender_vertex_groups, modifiers, export_settings):
+    """
+    Joints and weights of all vertices, as sets of 4 influences.
 
-    return result_primitive
+    The number of sets is given by the used vertex with most vertex groups.
+    Unless all influences are exported, influences are sorted by weight descending.
+    Meshes without skin, or whose vertex groups are not joints, get no set.
+    """
+    vertex_count = len(blender_mesh.vertices)
+
+    # Vertex groups are only read when some of them are joints
+    joint_table = None
+    if blender_vertex_groups:
+        joint_table = __get_joint_table(blender_vertex_groups, modifiers, export_settings)
+    if joint_table is None or not (joint_table >= 0).any():
+        return np.zeros((vertex_count, 0), dtype=np.uint32), np.zeros((vertex_count, 0), dtype=np.float32)
+
+    # Vertex groups have no foreach_get, so read them in a single pass.
+    group_counts = []
+    element_groups = []
+    element_weights = []
+    for vertex in blender_mesh.vertices:
+        groups = vertex.groups
+        group_counts.append(len(groups))
+        for group_element in groups:
+            element_groups.append(group_element.group)
+            element_weights.append(group_element.weight)
+
+    group_counts = np.array(group_counts, dtype=np.int32)
+    max_count = group_counts[used_vertices].max() if used_vertices.any() else 0
+    bone_max = (max_count + 3) // 4
+
+    vertex_joints = np.zeros((vertex_count, bone_max * 4), dtype=np.uint32)
+    vertex_weights = np.zeros((vertex_count, bone_max * 4), dtype=np.float32)
+
+    if bone_max == 0:
+        return vertex_joints, vertex_weights
+
+    element_vertices = np.repeat(np.arange(vertex_count), group_counts)
+    element_joints = joint_table[np.array(element_groups, dtype=np.int32)]
+    element_weights = np.array(element_weights, dtype=np.float32)
+
+    # Only keep groups that are joints, with a weight.
+    valid = (element_weights > 0.0) & (element_joints >= 0)
+    element_vertices = element_vertices[valid]
+    element_joints = element_joints[valid]
+    element_weights = element_weights[valid]
+
+    if not export_settings['gltf_all_vertex_influences']:
+        # sort groups by weight descending, so the first set holds the 4 most important influences
+        order = np.lexsort((-element_weights, element_vertices))
+        element_vertices = element_vertices[order]
+        element_joints = element_joints[order]
+        element_weights = element_weights[order]
+
+    # Position of each influence in the sets of its vertex
+    element_ranks = np.arange(len(element_vertices)) - np.searchsorted(element_vertices, element_vertices)
+
+    vertex_joints[element_vertices, element_ranks] = element_joints
+    vertex_weights[element_vertices, element_ranks] = element_weights
+
+    return vertex_joints, vertex_weights
 
 
 def extract_primitives(glTF, blender_mesh, blender_vertex_groups, modifiers, export_settings):
@@ -405,510 +399,185 @@ def extract_primitives(glTF, blender_mesh, blender_vertex_groups, modifiers, exp
             print_console('WARNING', 'Could not calculate tangents. Please try to triangulate the mesh first.')
 
     #
-
-    material_map = {}
-
-    #
-    # Gathering position, normal and tex_coords.
+    # Read mesh data at once. Loop data is the source of vertex data, as vertices are split by loop attributes.
     #
-    no_material_attributes = {
-        POSITION_ATTRIBUTE: [],
-        NORMAL_ATTRIBUTE: []
-    }
-
-    if use_tangents:
-        no_material_attributes[TANGENT_ATTRIBUTE] = []
 
-    #
-    # Directory of materials with its primitive.
-    #
-    no_material_primitives = {
-        MATERIAL_ID: 0,
-        INDICES_ID: [],
-        ATTRIBUTES_ID: no_material_attributes
-    }
-
-    material_idx_to_primitives = {0: no_material_primitives}
+    vertex_locations = __get_array(blender_mesh.vertices, 'co', 3)
+    loop_vertices = __get_array(blender_mesh.loops, 'vertex_index', 1, np.int32)
+    loop_starts = __get_array(blender_mesh.polygons, 'loop_start', 1, np.int32)
+    loop_totals = __get_array(blender_mesh.polygons, 'loop_total', 1, np.int32)
+    polygon_smooth = __get_array(blender_mesh.polygons, 'use_smooth', 1, bool)
+
+    # Polygon of each loop
+    polygon_offsets = np.cumsum(loop_totals) - loop_totals
+    polygon_loops = np.repeat(loop_starts - polygon_offsets, loop_totals) + np.arange(np.sum(loop_totals))
+    loop_polygons = np.zeros(len(loop_vertices), dtype=np.int32)
+    loop_polygons[polygon_loops] = np.repeat(np.arange(len(loop_starts), dtype=np.int32), loop_totals)
+    loop_smooth = polygon_smooth[loop_polygons]
+
+    # Flat or smooth shading of triangles is the one of their polygon, given by loop_smooth.
+    if bpy.app.version < (2, 80, 0):
+        triangle_loops, triangle_polygons = tessellate_polygons(
+            loop_starts, loop_totals, loop_vertices, vertex_locations)
+        triangle_materials = __get_array(blender_mesh.polygons, 'material_index', 1, np.int32)[triangle_polygons]
+    else:
+        triangle_loops, triangle_materials = get_loop_triangles(blender_mesh)
 
     #
 
-    vertex_index_to_new_indices = {}
+    positions = convert_swizzle_locations(vertex_locations, export_settings)
 
-    material_map[0] = vertex_index_to_new_indices
+    if blender_mesh.has_custom_normals:
+        smooth_normals = __get_array(blender_mesh.loops, 'normal', 3)
+    else:
+        smooth_normals = __get_array(blender_mesh.vertices, 'normal', 3)[loop_vertices]
+    flat_normals = __get_array(blender_mesh.polygons, 'normal', 3)[loop_polygons]
+    normals = convert_swizzle_locations(np.where(loop_smooth[:, None], smooth_normals, flat_normals), export_settings)
 
-    #
-    # Create primitive for each material.
-    #
-    for (mat_idx, _) in enumerate(blender_mesh.materials):
-        attributes = {
-            POSITION_ATTRIBUTE: [],
-            NORMAL_ATTRIBUTE: []
-        }
+    if use_tangents:
+        loop_tangents = __get_array(blender_mesh.loops, 'tangent', 3)
+        loop_bitangents = __get_array(blender_mesh.loops, 'bitangent', 3)
 
-        if use_tangents:
-            attributes[TANGENT_ATTRIBUTE] = []
+        polygon_tangents = np.zeros((len(loop_starts), 3), dtype=np.float32)
+        polygon_bitangents = np.zeros((len(loop_starts), 3), dtype=np.float32)
+        np.add.at(polygon_tangents, loop_polygons, loop_tangents)
+        np.add.at(polygon_bitangents, loop_polygons, loop_bitangents)
 
-        primitive = {
-            MATERIAL_ID: mat_idx,
-            INDICES_ID: [],
-            ATTRIBUTES_ID: attributes
-        }
+        tangents = np.where(loop_smooth[:, None], loop_tangents, __normalize(polygon_tangents)[loop_polygons])
+        bitangents = np.where(loop_smooth[:, None], loop_bitangents, __normalize(polygon_bitangents)[loop_polygons])
 
-        material_idx_to_primitives[mat_idx] = primitive
+        if not tangents.any(axis=1).all():
+            print_console('WARNING', 'Tangent has zero length.')
 
-        #
+        tangents = convert_swizzle_locations(tangents, export_settings)
+        bitangents = convert_swizzle_locations(bitangents, export_settings)
 
-        vertex_index_to_new_indices = {}
+        handedness = np.where(np.sum(np.cross(normals, tangents) * bitangents, axis=1) < 0.0, -1.0, 1.0)
+        tangents = np.concatenate((tangents, handedness[:, None].astype(np.float32)), axis=1)
 
-        material_map[mat_idx] = vertex_index_to_new_indices
+    #
 
-    tex_coord_max = 0
+    tex_coords = []
     if blender_mesh.uv_layers.active:
-        tex_coord_max = len(blender_mesh.uv_layers)
+        for uv_layer in blender_mesh.uv_layers:
+            uvs = __get_array(uv_layer.data, 'uv', 2)
+            uvs[:, 1] = 1.0 - uvs[:, 1]
+            tex_coords.append(uvs)
 
     #
 
-    vertex_colors = {}
-
-    color_index = 0
-    for vertex_color in blender_mesh.vertex_colors:
-        vertex_color_name = COLOR_PREFIX + str(color_index)
-        vertex_colors[vertex_color_name] = vertex_color
-
-        color_index += 1
-        if color_index >= GLTF_MAX_COLORS:
-            break
-    color_max = color_index
+    colors = []
+    for vertex_color in blender_mesh.vertex_colors[:GLTF_MAX_COLORS]:
+        components = len(vertex_color.data[0].color) if len(vertex_color.data) > 0 else 4
+        color = __get_array(vertex_color.data, 'color', components)
+        linear_color = np.ones((len(color), 4), dtype=np.float32)
+        linear_color[:, :3] = color_srgb_to_scene_linear_array(color[:, :3])
+        colors.append(linear_color)
 
     #
 
-    bone_max = 0
-    for blender_polygon in blender_mesh.polygons:
-        for loop_index in blender_polygon.loop_indices:
-            vertex_index = blender_mesh.loops[loop_index].vertex_index
-            bones_count = len(blender_mesh.vertices[vertex_index].groups)
-            if bones_count > 0:
-                if bones_count % 4 == 0:
-                    bones_count -= 1
-                bone_max = max(bone_max, bones_count // 4 + 1)
+    vertex_joints = None
+    vertex_weights = None
+    if export_settings[gltf2_blender_export_keys.SKINS]:
+        used_vertices = np.zeros(len(vertex_locations), dtype=bool)
+        used_vertices[loop_vertices[polygon_loops]] = True
+        vertex_joints, vertex_weights = __get_vertex_joints(
+            blender_mesh, used_vertices, blender_vertex_groups, modifiers, export_settings)
+    bone_max = vertex_joints.shape[1] // 4 if vertex_joints is not None else 0
 
     #
 
-    morph_max = 0
-
-    blender_shape_keys = []
-
-    if blender_mesh.shape_keys is not None:
-        morph_max = len(blender_mesh.shape_keys.key_blocks) - 1
+    target_positions = []
+    target_normals = []
+    target_tangents = []
 
+    if blender_mesh.shape_keys is not None and export_settings[gltf2_blender_export_keys.MORPH]:
         for blender_shape_key in blender_mesh.shape_keys.key_blocks:
-            if blender_shape_key != blender_shape_key.relative_key:
-                blender_shape_keys.append(ShapeKey(
-                    blender_shape_key,
-                    blender_shape_key.normals_vertex_get(),  # calculate vertex normals for this shape key
-                    blender_shape_key.normals_polygon_get()))  # calculate polygon normals for this shape key
-
-    #
-    # Convert polygon to primitive indices and eliminate invalid ones. Assign to material.
-    #
-    for blender_polygon in blender_mesh.polygons:
-        export_color = True
-
-        #
-
-        if not blender_polygon.material_index in material_idx_to_primitives:
-            primitive = material_idx_to_primitives[0]
-            vertex_index_to_new_indices = material_map[0]
-        else:
-            primitive = material_idx_to_primitives[blender_polygon.material_index]
-            vertex_index_to_new_indices = material_map[blender_polygon.material_index]
-        #
-
-        attributes = primitive[ATTRIBUTES_ID]
-
-        face_normal = blender_polygon.normal
-        face_tangent = Vector((0.0, 0.0, 0.0))
-        face_bitangent = Vector((0.0, 0.0, 0.0))
-        if use_tangents:
-            for loop_index in blender_polygon.loop_indices:
-                temp_vertex = blender_mesh.loops[loop_index]
-                face_tangent += temp_vertex.tangent
-                face_bitangent += temp_vertex.bitangent
-
-            face_tangent.normalize()
-            face_bitangent.normalize()
-
-        #
-
-        indices = primitive[INDICES_ID]
-
-        loop_index_list = []
-
-        if len(blender_polygon.loop_indices) == 3:
-            loop_index_list.extend(blender_polygon.loop_indices)
-        elif len(blender_polygon.loop_indices) > 3:
-            # Triangulation of polygon. Using internal function, as non-convex polygons could exist.
-            polyline = []
-
-            for loop_index in blender_polygon.loop_indices:
-                vertex_index = blender_mesh.loops[loop_index].vertex_index
-                v = blender_mesh.vertices[vertex_index].co
-                polyline.append(Vector((v[0], v[1], v[2])))
-
-            triangles = tessellate_polygon((polyline,))
-
-            for triangle in triangles:
-                loop_index_list.append(blender_polygon.loop_indices[triangle[0]])
-                loop_index_list.append(blender_polygon.loop_indices[triangle[2]])
-                loop_index_list.append(blender_polygon.loop_indices[triangle[1]])
-        else:
-            continue
-
-        for loop_index in loop_index_list:
-            vertex_index = blender_mesh.loops[loop_index].vertex_index
-
-            if vertex_index_to_new_indices.get(vertex_index) is None:
-                vertex_index_to_new_indices[vertex_index] = []
-
-            #
-
-            v = None
-            n = None
-            t = None
-            b = None
-            uvs = []
-            colors = []
-            joints = []
-            weights = []
-
-            target_positions = []
-            target_normals = []
-            target_tangents = []
-
-            vertex = blender_mesh.vertices[vertex_index]
-
-            v = convert_swizzle_location(vertex.co, export_settings)
-            if blender_polygon.use_smooth:
-                if blender_mesh.has_custom_normals:
-                    n = convert_swizzle_location(blender_mesh.loops[loop_index].normal, export_settings)
-                else:
-                    n = convert_swizzle_location(vertex.normal, export_settings)
-                if use_tangents:
-                    t = convert_swizzle_tangent(blender_mesh.loops[loop_index].tangent, export_settings)
-                    b = convert_swizzle_location(blender_mesh.loops[loop_index].bitangent, export_settings)
-            else:
-                n = convert_swizzle_location(face_normal, export_settings)
-                if use_tangents:
-                    t = convert_swizzle_tangent(face_tangent, export_settings)
-                    b = convert_swizzle_location(face_bitangent, export_settings)
-
-            if use_tangents:
-                tv = Vector((t[0], t[1], t[2]))
-                bv = Vector((b[0], b[1], b[2]))
-                nv = Vector((n[0], n[1], n[2]))
-
-                if (nv.cross(tv)).dot(bv) < 0.0:
-                    t[3] = -1.0
-
-            if blender_mesh.uv_layers.active:
-                for tex_coord_index in range(0, tex_coord_max):
-                    uv = blender_mesh.uv_layers[tex_coord_index].data[loop_index].uv
-                    uvs.append([uv.x, 1.0 - uv.y])
-
-            #
-
-            if color_max > 0 and export_color:
-                for color_index in range(0, color_max):
-                    color_name = COLOR_PREFIX + str(color_index)
-                    color = vertex_colors[color_name].data[loop_index].color
-                    colors.append([
-                        color_srgb_to_scene_linear(color[0]),
-                        color_srgb_to_scene_linear(color[1]),
-                        color_srgb_to_scene_linear(color[2]),
-                        1.0
-                    ])
-
-            #
-
-            bone_count = 0
-
-            if blender_vertex_groups is not None and vertex.groups is not None and len(vertex.groups) > 0 and export_settings[gltf2_blender_export_keys.SKINS]:
-                joint = []
-                weight = []
-                vertex_groups = vertex.groups
-                if not export_settings['gltf_all_vertex_influences']:
-                    # sort groups by weight descending
-                    vertex_groups = sorted(vertex.groups, key=attrgetter('weight'), reverse=True)
-                for group_element in vertex_groups:
-
-                    if len(joint) == 4:
-                        bone_count += 1
-                        joints.append(joint)
-                        weights.append(weight)
-                        joint = []
-                        weight = []
-
-                    #
-
-                    joint_weight = group_element.weight
-                    if joint_weight <= 0.0:
-                        continue
-
-                    #
-
-                    vertex_group_index = group_element.group
-                    vertex_group_name = blender_vertex_groups[vertex_group_index].name
-
-                    joint_index = None
-
-                    if modifiers is not None:
-                        modifiers_dict = {m.type: m for m in modifiers}
-                        if "ARMATURE" in modifiers_dict:
-                            modifier = modifiers_dict["ARMATURE"]
-                            armature = modifier.object
-                            if armature:
-                                skin = gltf2_blender_gather_skins.gather_skin(armature, modifier.id_data, export_settings)
-                                for index, j in enumerate(skin.joints):
-                                    if j.name == vertex_group_name:
-                                        joint_index = index
-                                        break
-
-                    #
-                    if joint_index is not None:
-                        joint.append(joint_index)
-                        weight.append(joint_weight)
-
-                if len(joint) > 0:
-                    bone_count += 1
-
-                    for fill in range(0, 4 - len(joint)):
-                        joint.append(0)
-                        weight.append(0.0)
-
-                    joints.append(joint)
-                    weights.append(weight)
-
-            for fill in range(0, bone_max - bone_count):
-                joints.append([0, 0, 0, 0])
-                weights.append([0.0, 0.0, 0.0, 0.0])
-
-            #
-
-            if morph_max > 0 and export_settings[gltf2_blender_export_keys.MORPH]:
-                for morph_index in range(0, morph_max):
-                    blender_shape_key = blender_shape_keys[morph_index]
-
-                    v_morph = convert_swizzle_location(blender_shape_key.shape_key.data[vertex_index].co,
-                                                       export_settings)
-
-                    # Store delta.
-                    v_morph -= v
-
-                    target_positions.append(v_morph)
-
-                    #
-
-                    n_morph = None
-
-                    if blender_polygon.use_smooth:
-                        temp_normals = blender_shape_key.vertex_normals
-                        n_morph = (temp_normals[vertex_index * 3 + 0], temp_normals[vertex_index * 3 + 1],
-                                   temp_normals[vertex_index * 3 + 2])
-                    else:
-                        temp_normals = blender_shape_key.polygon_normals
-                        n_morph = (
-                            temp_normals[blender_polygon.index * 3 + 0], temp_normals[blender_polygon.index * 3 + 1],
-                            temp_normals[blender_polygon.index * 3 + 2])
-
-                    n_morph = convert_swizzle_location(n_morph, export_settings)
-
-                    # Store delta.
-                    n_morph -= n
-
-                    target_normals.append(n_morph)
-
-                    #
-
-                    if use_tangents:
-                        rotation = n_morph.rotation_difference(n)
-
-                        t_morph = Vector((t[0], t[1], t[2]))
-
-                        t_morph.rotate(rotation)
-
-                        target_tangents.append(t_morph)
-
-            #
-            #
-
-            create = True
-
-            for current_new_index in vertex_index_to_new_indices[vertex_index]:
-                found = True
-
-                for i in range(0, 3):
-                    if attributes[POSITION_ATTRIBUTE][current_new_index * 3 + i] != v[i]:
-                        found = False
-                        break
-
-                    if attributes[NORMAL_ATTRIBUTE][current_new_index * 3 + i] != n[i]:
-                        found = False
-                        break
-
-                if use_tangents:
-                    for i in range(0, 4):
-                        if attributes[TANGENT_ATTRIBUTE][current_new_index * 4 + i] != t[i]:
-                            found = False
-                            break
-
-                if not found:
-                    continue
-
-                for tex_coord_index in range(0, tex_coord_max):
-                    uv = uvs[tex_coord_index]
-
-                    tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-                    for i in range(0, 2):
-                        if attributes[tex_coord_id][current_new_index * 2 + i] != uv[i]:
-                            found = False
-                            break
-
-                if export_color:
-                    for color_index in range(0, color_max):
-                        color = colors[color_index]
-
-                        color_id = COLOR_PREFIX + str(color_index)
-                        for i in range(0, 3):
-                            # Alpha is always 1.0 - see above.
-                            current_color = attributes[color_id][current_new_index * 4 + i]
-                            if color_srgb_to_scene_linear(current_color) != color[i]:
-                                found = False
-                                break
-
-                if export_settings[gltf2_blender_export_keys.SKINS]:
-                    for bone_index in range(0, bone_max):
-                        joint = joints[bone_index]
-                        weight = weights[bone_index]
-
-                        joint_id = JOINTS_PREFIX + str(bone_index)
-                        weight_id = WEIGHTS_PREFIX + str(bone_index)
-                        for i in range(0, 4):
-                            if attributes[joint_id][current_new_index * 4 + i] != joint[i]:
-                                found = False
-                                break
-                            if attributes[weight_id][current_new_index * 4 + i] != weight[i]:
-                                found = False
-                                break
-
-                if export_settings[gltf2_blender_export_keys.MORPH]:
-                    for morph_index in range(0, morph_max):
-                        target_position = target_positions[morph_index]
-                        target_normal = target_normals[morph_index]
-                        if use_tangents:
-                            target_tangent = target_tangents[morph_index]
-
-                        target_position_id = MORPH_POSITION_PREFIX + str(morph_index)
-                        target_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
-                        target_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
-                        for i in range(0, 3):
-                            if attributes[target_position_id][current_new_index * 3 + i] != target_position[i]:
-                                found = False
-                                break
-                            if attributes[target_normal_id][current_new_index * 3 + i] != target_normal[i]:
-                                found = False
-                                break
-                            if use_tangents:
-                                if attributes[target_tangent_id][current_new_index * 3 + i] != target_tangent[i]:
-                                    found = False
-                                    break
-
-                if found:
-                    indices.append(current_new_index)
-
-                    create = False
-                    break
-
-            if not create:
+            if blender_shape_key == blender_shape_key.relative_key:
                 continue
 
-            new_index = 0
-
-            if primitive.get('max_index') is not None:
-                new_index = primitive['max_index'] + 1
-
-            primitive['max_index'] = new_index
+            # Store deltas.
+            morph_locations = __get_array(blender_shape_key.data, 'co', 3)
+            target_positions.append(convert_swizzle_locations(morph_locations, export_settings) - positions)
 
-            vertex_index_to_new_indices[vertex_index].append(new_index)
-
-            #
-            #
+            # calculate vertex and polygon normals for this shape key
+            morph_vertex_normals = np.array(blender_shape_key.normals_vertex_get(), dtype=np.float32).reshape(-1, 3)
+            morph_polygon_normals = np.array(blender_shape_key.normals_polygon_get(), dtype=np.float32).reshape(-1, 3)
+            morph_normals = np.where(loop_smooth[:, None],
+                                     morph_vertex_normals[loop_vertices], morph_polygon_normals[loop_polygons])
+            morph_normals = convert_swizzle_locations(morph_normals, export_settings) - normals
+            target_normals.append(morph_normals)
 
-            indices.append(new_index)
-
-            #
-
-            attributes[POSITION_ATTRIBUTE].extend(v)
-            attributes[NORMAL_ATTRIBUTE].extend(n)
             if use_tangents:
-                attributes[TANGENT_ATTRIBUTE].extend(t)
-
-            if blender_mesh.uv_layers.active:
-                for tex_coord_index in range(0, tex_coord_max):
-                    tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
-
-                    if attributes.get(tex_coord_id) is None:
-                        attributes[tex_coord_id] = []
-
-                    attributes[tex_coord_id].extend(uvs[tex_coord_index])
-
-            if export_color:
-                for color_index in range(0, color_max):
-                    color_id = COLOR_PREFIX + str(color_index)
+                target_tangents.append(__rotate_by_difference(tangents[:, :3], morph_normals, normals))
 
-                    if attributes.get(color_id) is None:
-                        attributes[color_id] = []
-
-                    attributes[color_id].extend(colors[color_index])
-
-            if export_settings[gltf2_blender_export_keys.SKINS]:
-                for bone_index in range(0, bone_max):
-                    joint_id = JOINTS_PREFIX + str(bone_index)
-
-                    if attributes.get(joint_id) is None:
-                        attributes[joint_id] = []
+    #
+    # Vertices are the distinct combinations of vertex and loop attributes.
+    #
 
-                    attributes[joint_id].extend(joints[bone_index])
+    loop_attributes = [normals] + tex_coords + [color[:, :3] for color in colors] + target_normals
+    if use_tangents:
+        loop_attributes.append(tangents)
+    # Adding zero turns negative zeros to positive zeros, so they are the same vertex
+    loop_keys = np.concatenate(
+        [loop_vertices.astype(np.uint32)[:, None]] +
+        [(attribute + np.float32(0.0)).view(np.uint32) for attribute in loop_attributes],
+        axis=1)
+    loop_keys = loop_keys.view(np.dtype((np.void, loop_keys.dtype.itemsize * loop_keys.shape[1]))).ravel()
+    _, loop_keys = np.unique(loop_keys, return_inverse=True)
+    loop_keys = loop_keys.ravel()
 
-                    weight_id = WEIGHTS_PREFIX + str(bone_index)
+    #
+    # Create primitive for each material.
+    #
 
-                    if attributes.get(weight_id) is None:
-                        attributes[weight_id] = []
+    material_count = max(len(blender_mesh.materials), 1)
+    # Polygons with an invalid material index go to the first material.
+    triangle_materials[triangle_materials >= material_count] = 0
 
-                    attributes[weight_id].extend(weights[bone_index])
+    material_idx_to_primitives = {}
 
-            if export_settings[gltf2_blender_export_keys.MORPH]:
-                for morph_index in range(0, morph_max):
-                    target_position_id = MORPH_POSITION_PREFIX + str(morph_index)
+    for material_idx in range(material_count):
+        corner_loops = triangle_loops[triangle_materials == material_idx].ravel()
+        if len(corner_loops) == 0:
+            continue
 
-                    if attributes.get(target_position_id) is None:
-                        attributes[target_position_id] = []
+        indices, first_corners = __pack_indices(loop_keys[corner_loops])
+        vertex_loops = corner_loops[first_corners]
+        vertex_indices = loop_vertices[vertex_loops]
 
-                    attributes[target_position_id].extend(target_positions[morph_index])
+        attributes = {
+            POSITION_ATTRIBUTE: positions[vertex_indices].ravel(),
+            NORMAL_ATTRIBUTE: normals[vertex_loops].ravel()
+        }
 
-                    target_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
+        if use_tangents:
+            attributes[TANGENT_ATTRIBUTE] = tangents[vertex_loops].ravel()
 
-                    if attributes.get(target_normal_id) is None:
-                        attributes[target_normal_id] = []
+        for tex_coord_index, tex_coord in enumerate(tex_coords):
+            attributes[TEXCOORD_PREFIX + str(tex_coord_index)] = tex_coord[vertex_loops].ravel()
 
-                    attributes[target_normal_id].extend(target_normals[morph_index])
+        for color_index, color in enumerate(colors):
+            attributes[COLOR_PREFIX + str(color_index)] = color[vertex_loops].ravel()
 
-                    if use_tangents:
-                        target_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+        for bone_index in range(bone_max):
+            attributes[JOINTS_PREFIX + str(bone_index)] = \
+                vertex_joints[vertex_indices, bone_index * 4:bone_index * 4 + 4].ravel()
+            attributes[WEIGHTS_PREFIX + str(bone_index)] = \
+                vertex_weights[vertex_indices, bone_index * 4:bone_index * 4 + 4].ravel()
 
-                        if attributes.get(target_tangent_id) is None:
-                            attributes[target_tangent_id] = []
+        for morph_index in range(len(target_positions)):
+            attributes[MORPH_POSITION_PREFIX + str(morph_index)] = target_positions[morph_index][vertex_indices].ravel()
+            attributes[MORPH_NORMAL_PREFIX + str(morph_index)] = target_normals[morph_index][vertex_loops].ravel()
+            if use_tangents:
+                attributes[MORPH_TANGENT_PREFIX + str(morph_index)] = \
+                    target_tangents[morph_index][vertex_loops].ravel()
 
-                        attributes[target_tangent_id].extend(target_tangents[morph_index])
+        material_idx_to_primitives[material_idx] = {
+            MATERIAL_ID: material_idx,
+            INDICES_ID: indices.astype(np.uint32),
+            ATTRIBUTES_ID: attributes
+        }
 
     #
     # Add primitive plus split them if needed.
@@ -917,51 +586,9 @@ def extract_primitives(glTF, blender_mesh, blender_vertex_groups, modifiers, exp
     result_primitives = []
 
     for material_idx, primitive in material_idx_to_primitives.items():
-        export_color = True
-
-        #
-
         indices = primitive[INDICES_ID]
 
-        if len(indices) == 0:
-            continue
-
-        position = primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE]
-        normal = primitive[ATTRIBUTES_ID][NORMAL_ATTRIBUTE]
-        if use_tangents:
-            tangent = primitive[ATTRIBUTES_ID][TANGENT_ATTRIBUTE]
-        tex_coords = []
-        for tex_coord_index in range(0, tex_coord_max):
-            tex_coords.append(primitive[ATTRIBUTES_ID][TEXCOORD_PREFIX + str(tex_coord_index)])
-        colors = []
-        if export_color:
-            for color_index in range(0, color_max):
-                colors.append(primitive[ATTRIBUTES_ID][COLOR_PREFIX + str(color_index)])
-        joints = []
-        weights = []
-        if export_settings[gltf2_blender_export_keys.SKINS]:
-            for bone_index in range(0, bone_max):
-                joints.append(primitive[ATTRIBUTES_ID][JOINTS_PREFIX + str(bone_index)])
-                weights.append(primitive[ATTRIBUTES_ID][WEIGHTS_PREFIX + str(bone_index)])
-
-        target_positions = []
-        target_normals = []
-        target_tangents = []
-        if export_settings[gltf2_blender_export_keys.MORPH]:
-            for morph_index in range(0, morph_max):
-                target_positions.append(primitive[ATTRIBUTES_ID][MORPH_POSITION_PREFIX + str(morph_index)])
-                target_normals.append(primitive[ATTRIBUTES_ID][MORPH_NORMAL_PREFIX + str(morph_index)])
-                if use_tangents:
-                    target_tangents.append(primitive[ATTRIBUTES_ID][MORPH_TANGENT_PREFIX + str(morph_index)])
-
-        #
-
-        count = len(indices)
-
-        if count == 0:
-            continue
-
-        max_index = max(indices)
+        max_index = indices.max()
 
         #
 
@@ -974,134 +601,21 @@ def extract_primitives(glTF, blender_mesh, blender_vertex_groups, modifiers, exp
 
         #
 
-        if max_index >= range_indices:
+        if max_index >= range_indices and export_settings[gltf2_blender_export_keys.SPLIT_PRIMITIVES]:
             #
             # Splitting result_primitives.
             #
 
-            # At start, all indices are pending.
-            pending_attributes = {
-                POSITION_ATTRIBUTE: [],
-                NORMAL_ATTRIBUTE: []
-            }
-
-            if use_tangents:
-                pending_attributes[TANGENT_ATTRIBUTE] = []
-
-            pending_primitive = {
-                MATERIAL_ID: material_idx,
-                INDICES_ID: [],
-                ATTRIBUTES_ID: pending_attributes
-            }
-
-            pending_primitive[INDICES_ID].extend(indices)
+            for current_primitive in split_primitive(primitive, range_indices):
+                result_primitives.append(current_primitive)
 
-            pending_attributes[POSITION_ATTRIBUTE].extend(position)
-            pending_attributes[NORMAL_ATTRIBUTE].extend(normal)
-            if use_tangents:
-                pending_attributes[TANGENT_ATTRIBUTE].extend(tangent)
-            tex_coord_index = 0
-            for tex_coord in tex_coords:
-                pending_attributes[TEXCOORD_PREFIX + str(tex_coord_index)] = tex_coord
-                tex_coord_index += 1
-            if export_color:
-                color_index = 0
-                for color in colors:
-                    pending_attributes[COLOR_PREFIX + str(color_index)] = color
-                    color_index += 1
-            if export_settings[gltf2_blender_export_keys.SKINS]:
-                joint_index = 0
-                for joint in joints:
-                    pending_attributes[JOINTS_PREFIX + str(joint_index)] = joint
-                    joint_index += 1
-                weight_index = 0
-                for weight in weights:
-                    pending_attributes[WEIGHTS_PREFIX + str(weight_index)] = weight
-                    weight_index += 1
-            if export_settings[gltf2_blender_export_keys.MORPH]:
-                morph_index = 0
-                for target_position in target_positions:
-                    pending_attributes[MORPH_POSITION_PREFIX + str(morph_index)] = target_position
-                    morph_index += 1
-                morph_index = 0
-                for target_normal in target_normals:
-                    pending_attributes[MORPH_NORMAL_PREFIX + str(morph_index)] = target_normal
-                    morph_index += 1
-                if use_tangents:
-                    morph_index = 0
-                    for target_tangent in target_tangents:
-                        pending_attributes[MORPH_TANGENT_PREFIX + str(morph_index)] = target_tangent
-                        morph_index += 1
-
-            pending_indices = pending_primitive[INDICES_ID]
-
-            # Continue until all are processed.
-            while len(pending_indices) > 0:
-
-                process_indices = pending_primitive[INDICES_ID]
-                max_index = max(process_indices)
-
-                pending_indices = []
-
-                #
-                #
-
-                all_local_indices = []
-
-                for i in range(0, (max_index // range_indices) + 1):
-                    all_local_indices.append([])
-
-                #
-                #
-
-                # For all faces ...
-                for face_index in range(0, len(process_indices), 3):
-
-                    written = False
-
-                    face_min_index = min(process_indices[face_index + 0], process_indices[face_index + 1],
-                                         process_indices[face_index + 2])
-                    face_max_index = max(process_indices[face_index + 0], process_indices[face_index + 1],
-                                         process_indices[face_index + 2])
-
-                    # ... check if it can be but in a range of maximum indices.
-                    for i in range(0, (max_index // range_indices) + 1):
-                        offset = i * range_indices
-
-                        # Yes, so store the primitive with its indices.
-                        if face_min_index >= offset and face_max_index < offset + range_indices:
-                            all_local_indices[i].extend(
-                                [process_indices[face_index + 0], process_indices[face_index + 1],
-                                 process_indices[face_index + 2]])
-
-                            written = True
-                            break
-
-                    # If not written, the triangle face has indices from different ranges.
-                    if not written:
-                        pending_indices.extend([process_indices[face_index + 0], process_indices[face_index + 1],
-                                                process_indices[face_index + 2]])
-
-                # Only add result_primitives, which do have indices in it.
-                for local_indices in all_local_indices:
-                    if len(local_indices) > 0:
-                        current_primitive = extract_primitive_floor(pending_primitive, local_indices, use_tangents)
-
-                        result_primitives.append(current_primitive)
-
-                        print_console('DEBUG', 'Adding primitive with splitting. Indices: ' + str(
-                            len(current_primitive[INDICES_ID])) + ' Vertices: ' + str(
-                            len(current_primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE]) // 3))
-
-                # Process primitive faces having indices in several ranges.
-                if len(pending_indices) > 0:
-                    pending_primitive = extract_primitive_pack(pending_primitive, pending_indices, use_tangents)
-
-                    print_console('DEBUG', 'Creating temporary primitive for splitting')
+                print_console('DEBUG', 'Adding primitive with splitting. Indices: ' + str(
+                    len(current_primitive[INDICES_ID])) + ' Vertices: ' + str(
+                    len(current_primitive[ATTRIBUTES_ID][POSITION_ATTRIBUTE]) // 3))
 
         else:
             #
-            # No splitting needed.
+            # No splitting needed, or 32 bit indices are used.
             #
             result_primitives.append(primitive)
 
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import bpy
-import mathutils
+import numpy as np
 import typing
 
 from io_scene_gltf2.blender.exp.gltf2_blender_gather_cache import cached
@@ -24,85 +24,306 @@ from . import gltf2_blender_export_keys
 from io_scene_gltf2.io.com import gltf2_io_debug
 
 
-class Keyframe:
-    def __init__(self, channels: typing.Tuple[bpy.types.FCurve], frame: float, bake_channel: typing.Union[str, None]):
-        self.seconds = frame / bpy.context.scene.render.fps
-        self.frame = frame
-        self.fps = bpy.context.scene.render.fps
-        if bake_channel is None:
-            self.target = channels[0].data_path.split('.')[-1]
-            self.__indices = [c.array_index for c in channels]
-        else:
-            self.target = bake_channel
-            self.__indices = []
-            for i in range(self.get_target_len()):
-                self.__indices.append(i)
-
-
-        # Data holders for virtual properties
-        self.__value = None
-        self.__in_tangent = None
-        self.__out_tangent = None
-
-    def get_target_len(self):
-        length = {
-            "delta_location": 3,
-            "delta_rotation_euler": 3,
-            "location": 3,
-            "rotation_axis_angle": 4,
-            "rotation_euler": 3,
-            "rotation_quaternion": 4,
-            "scale": 3,
-            "value": 1
-        }.get(self.target)
-
-        if length is None:
-            raise RuntimeError("Animations with target type '{}' are not supported.".format(self.target))
-
-        return length
-
-    def __set_indexed(self, value):
-        # 'value' targets don't use keyframe.array_index
-        if self.target == "value":
-            return value
-        # Sometimes blender animations only reference a subset of components of a data target. Keyframe should always
-        # contain a complete Vector/ Quaternion --> use the array_index value of the keyframe to set components in such
-        # structures
-        result = [0.0] * self.get_target_len()
-        for i, v in zip(self.__indices, value):
-            result[i] = v
-        result = gltf2_blender_math.list_to_mathutils(result, self.target)
-        return result
+# Number of components of the animated properties
+TARGET_LENGTHS = {
+    "delta_location": 3,
+    "delta_rotation_euler": 3,
+    "location": 3,
+    "rotation_axis_angle": 4,
+    "rotation_euler": 3,
+    "rotation_quaternion": 4,
+    "scale": 3,
+    "value": 1
+}
 
-    def get_indices(self):
-        return self.__indices
+ROTATION_TARGETS = ("delta_rotation_euler", "rotation_axis_angle", "rotation_euler", "rotation_quaternion")
 
-    def set_value_index(self, idx, val):
-        self.__value[idx] = val
 
-    @property
-    def value(self) -> typing.Union[mathutils.Vector, mathutils.Euler, mathutils.Quaternion, typing.List[float]]:
-        return self.__value
+class Keyframes:
+    """
+    Keyframes of an animation sampler, with one row of values per keyframe.
+
+    Values are in Blender space, rotations being w first quaternions whatever the rotation mode. Tangents, for cubic
+    spline interpolation, are given as control points one frame before and after each keyframe.
+    """
 
-    @value.setter
-    def value(self, value: typing.List[float]):
-        self.__value = self.__set_indexed(value)
+    def __init__(self,
+                 target: str,
+                 frames: typing.Sequence[float],
+                 values: np.ndarray,
+                 in_tangents: typing.Optional[np.ndarray] = None,
+                 out_tangents: typing.Optional[np.ndarray] = None):
+        self.target = target
+        self.frames = np.array(frames, dtype=np.float64)
+        self.seconds = self.frames / bpy.context.scene.render.fps
+        self.values = np.asarray(values, dtype=np.float32)
+        self.in_tangents = None if in_tangents is None else np.asarray(in_tangents, dtype=np.float32)
+        self.out_tangents = None if out_tangents is None else np.asarray(out_tangents, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.frames)
 
     @property
-    def in_tangent(self) -> typing.Union[mathutils.Vector, mathutils.Euler, mathutils.Quaternion, typing.List[float]]:
-        return self.__in_tangent
+    def is_rotation(self) -> bool:
+        return self.target in ROTATION_TARGETS
 
-    @in_tangent.setter
-    def in_tangent(self, value: typing.List[float]):
-        self.__in_tangent = self.__set_indexed(value)
+    def select(self, indices: typing.Sequence[int]) -> 'Keyframes':
+        """Keyframes at indices only."""
+        return Keyframes(self.target, self.frames[indices], self.values[indices],
+                         None if self.in_tangents is None else self.in_tangents[indices],
+                         None if self.out_tangents is None else self.out_tangents[indices])
 
-    @property
-    def out_tangent(self) -> typing.Union[mathutils.Vector, mathutils.Euler, mathutils.Quaternion, typing.List[float]]:
-        return self.__in_tangent
 
-    @out_tangent.setter
-    def out_tangent(self, value: typing.List[float]):
-        self.__out_tangent = self.__set_indexed(value)
+def get_target_values(target: str,
+                      channels: typing.Tuple[bpy.types.FCurve],
+                      channel_values: np.ndarray,
+                      non_keyed_values: typing.Tuple[typing.Optional[float]]
+                      ) -> np.ndarray:
+    """
+    Values of the target property from values of its F-curves, one column per F-curve.
+
+    Sometimes blender animations only reference a subset of components of a data target: the other components are
+    taken from non_keyed_values.
+    """
+    length = TARGET_LENGTHS.get(target)
+    if length is None:
+        raise RuntimeError("Animations with target type '{}' are not supported.".format(target))
+    # 'value' targets don't use keyframe.array_index
+    if target == "value":
+        return channel_values
+
+    values = np.zeros((len(channel_values), length), dtype=np.float64)
+    for i, value in enumerate(non_keyed_values):
+        if value is not None:
+            values[:, i] = value
+    for channel, column in zip(channels, channel_values.T):
+        values[:, channel.array_index] = column
+    return gltf2_blender_math.rotations_to_quaternions(values, target)
+
+
+class BakedPose:
+    """
+    Transforms of all the bones of an armature, sampled at the frames of a baked animation.
+
+    Transforms are stored per frame and bone as location, rotation quaternion (w first) and scale.
+    """
+
+    COMPONENTS = {
+        "location": slice(0, 3),
+        "rotation_axis_angle": slice(3, 7),
+        "rotation_euler": slice(3, 7),
+        "rotation_quaternion": slice(3, 7),
+        "scale": slice(7, 10)
+    }
+
+    def __init__(self, frames: typing.List[float], bone_names: typing.List[str]):
+        self.frames = frames
+        self.bone_indices = {name: index for index, name in enumerate(bone_names)}
+        self.transforms = np.empty((len(frames), len(bone_names), 10), dtype=np.float64)
+
+    def get(self, bone_name: str, target_property: str) -> np.ndarray:
+        """Values of a property of a bone, one row per frame."""
+        return self.transforms[:, self.bone_indices[bone_name], self.COMPONENTS[target_property]]
+
+
+# cache, so that the scene is stepped through only once for all the channels of an action
+# channels of an action are gathered together, older baked poses are dropped to free their memory
+@cached(max_entries=4)
+def bake_pose(blender_object_if_armature: bpy.types.Object,
+              start_frame,
+              end_frame,
+              space: str,
+              action_name: str,
+              export_settings
+              ) -> BakedPose:
+    """
+    Sample the transforms of all bones at every frame, setting each frame once.
+
+    Transforms are the bone matrix_basis in 'BASIS' space, the pose matrix converted to local space in 'LOCAL' space.
+    """
+    frames = []
+    frame = start_frame
+    step = export_settings['gltf_frame_step']
+    while frame <= end_frame:
+        frames.append(frame)
+        frame += step
+
+    pose_bones = list(blender_object_if_armature.pose.bones)
+    baked_pose = BakedPose(frames, [pose_bone.name for pose_bone in pose_bones])
+
+    for frame_index, frame in enumerate(frames):
+        bpy.context.scene.frame_set(frame)
+        for bone_index, pose_bone in enumerate(pose_bones):
+            if space == 'BASIS':
+                matrix = pose_bone.matrix_basis
+            elif bpy.app.version < (2, 80, 0):
+                matrix = blender_object_if_armature.convert_space(pose_bone, pose_bone.matrix, 'POSE', 'LOCAL')
+            else:
+                matrix = blender_object_if_armature.convert_space(pose_bone=pose_bone, matrix=pose_bone.matrix,
+                                                                  from_space='POSE', to_space='LOCAL')
+            trans, rot, scale = matrix.decompose()
+            transform = baked_pose.transforms[frame_index, bone_index]
+            transform[0:3] = trans
+            transform[3:7] = rot
+            transform[7:10] = scale
+
+    return baked_pose
+
+
+# Keyframe interpolations, as read with foreach_get
+INTERPOLATION_CONSTANT = 0
+INTERPOLATION_LINEAR = 1
+INTERPOLATION_BEZIER = 2
+
+# Distance to a keyframe under which Blender evaluates an F-curve to the keyframe value
+KEYFRAME_THRESHOLD = 0.0001
+
+# Precision, in frames, and maximum number of steps of the search for the frames on Bezier segments
+BEZIER_TOLERANCE = 1e-6
+BEZIER_STEPS = 32
+
+
+class FCurveData:
+    """
+    Keyframe points of an F-curve, read in bulk, to evaluate the curve at many frames at once.
+
+    Evaluation follows FCurve.evaluate for constant, linear and Bezier interpolations and both extrapolation modes.
+    Curves with modifiers or other interpolations, and Bezier segments with overlapping handles, are evaluated frame
+    by frame by Blender.
+    """
+
+    def __init__(self, fcurve: bpy.types.FCurve):
+        self.fcurve = fcurve
+        count = len(fcurve.keyframe_points)
+        self.co = self.__get_points(fcurve, 'co', count)
+        self.handle_left = self.__get_points(fcurve, 'handle_left', count)
+        self.handle_right = self.__get_points(fcurve, 'handle_right', count)
+        self.interpolation = np.empty(count, dtype=np.int32)
+        fcurve.keyframe_points.foreach_get('interpolation', self.interpolation)
+        self.extrapolation = fcurve.extrapolation
+
+        self.frames = self.co[:, 0]
+        self.values = self.co[:, 1]
+        # Interpolation of all keyframes, None if they use several ones
+        interpolations = np.unique(self.interpolation)
+        self.uniform_interpolation = int(interpolations[0]) if len(interpolations) == 1 else None
+        self.is_vectorized = count > 0 and len(fcurve.modifiers) == 0 and \
+            (interpolations <= INTERPOLATION_BEZIER).all()
+
+    @staticmethod
+    def __get_points(fcurve, attribute, count):
+        # Read in single precision, as stored by Blender
+        points = np.empty(count * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get(attribute, points)
+        return points.reshape(count, 2).astype(np.float64)
+
+    def evaluate(self, frames) -> np.ndarray:
+        """Values of the F-curve at frames, as FCurve.evaluate gives them."""
+        # Blender evaluates F-curves in single precision
+        frames = np.asarray(frames, dtype=np.float32).astype(np.float64)
+        if not self.is_vectorized:
+            return np.array([self.fcurve.evaluate(frame) for frame in frames.tolist()], dtype=np.float64)
+
+        result = np.empty(len(frames), dtype=np.float64)
+        before = frames <= self.frames[0]
+        after = frames >= self.frames[-1]
+        inside = ~(before | after)
+        result[before] = self.__extrapolate(frames[before], 0, 1, self.handle_left)
+        result[after] = self.__extrapolate(frames[after], -1, -2, self.handle_right)
+        result[inside] = self.__interpolate(frames[inside])
+        return result.astype(np.float32).astype(np.float64)
+
+    def __extrapolate(self, frames, endpoint, neighbor, handles):
+        frame, value = self.co[endpoint]
+        if self.interpolation[endpoint] == INTERPOLATION_CONSTANT or self.extrapolation == 'CONSTANT':
+            return np.full(len(frames), value)
+
+        if self.interpolation[endpoint] == INTERPOLATION_LINEAR:
+            # Slope of the segment to the next keyframe
+            if len(self.co) == 1:
+                return np.full(len(frames), value)
+            neighbor_frame, neighbor_value = self.co[neighbor]
+            duration = neighbor_frame - frame
+            change = neighbor_value - value
+        else:
+            # Slope of the outer handle
+            handle_frame, handle_value = handles[endpoint]
+            duration = frame - handle_frame
+            change = value - handle_value
+        if duration == 0:
+            return np.full(len(frames), value)
+        return value - change / duration * (frame - frames)
+
+    def __interpolate(self, frames):
+        """Values at frames strictly between the first and last keyframes."""
+        next_keys = np.searchsorted(self.frames, frames, side='right')
+        keys = next_keys - 1
+        begin = self.values[keys]
+        change = self.values[next_keys] - begin
+        duration = self.frames[next_keys] - self.frames[keys]
+        interpolation = self.interpolation[keys]
+
+        # Constant segments, and segments of null duration, keep the value of their first keyframe
+        result = begin.copy()
+        linear = (interpolation == INTERPOLATION_LINEAR) & (duration != 0)
+        result[linear] = begin[linear] + change[linear] * (frames[linear] - self.frames[keys[linear]]) / \
+            duration[linear]
+        bezier = (interpolation == INTERPOLATION_BEZIER) & (duration != 0)
+        result[bezier] = self.__interpolate_bezier(frames[bezier], keys[bezier])
+
+        # Frames on a keyframe
+        on_key = np.abs(frames - self.frames[keys]) < KEYFRAME_THRESHOLD
+        result[on_key] = begin[on_key]
+        on_next_key = np.abs(self.frames[next_keys] - frames) < KEYFRAME_THRESHOLD
+        result[on_next_key] = self.values[next_keys[on_next_key]]
+        return result
+
+    def __interpolate_bezier(self, frames, keys):
+        x0, y0 = self.co[keys].T
+        x1, y1 = self.handle_right[keys].T
+        x2, y2 = self.handle_left[keys + 1].T
+        x3, y3 = self.co[keys + 1].T
+
+        # Handles going past the other end of the segment, or backwards, are corrected by Blender in a way that
+        # depends on its version: leave these segments to FCurve.evaluate
+        irregular = (x1 - x0) + (x3 - x2) > x3 - x0
+        irregular |= (x1 < x0) | (x2 > x3)
+
+        # Solve x(t) = frame on the segment, then take y(t). x is monotonic, its control points being in order:
+        # Newton steps, falling back to bisection when they leave the interval known to hold the solution
+        t = np.clip((frames - x0) / (x3 - x0), 0, 1)
+        low = np.zeros(len(keys))
+        high = np.ones(len(keys))
+        for _ in range(BEZIER_STEPS):
+            error = self.__bezier(x0, x1, x2, x3, t) - frames
+            if ((np.abs(error) < BEZIER_TOLERANCE) | irregular).all():
+                break
+            low = np.where(error < 0, t, low)
+            high = np.where(error < 0, high, t)
+            s = 1 - t
+            derivative = 3 * (s * s * (x1 - x0) + 2 * s * t * (x2 - x1) + t * t * (x3 - x2))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = t - error / derivative
+            t = np.where((t >= low) & (t <= high), t, (low + high) / 2)
+        result = self.__bezier(y0, y1, y2, y3, t)
+        result[irregular] = [self.fcurve.evaluate(frame) for frame in frames[irregular].tolist()]
+
+        # Flat segments, Blender skips the evaluation
+        epsilon = np.finfo(np.float32).eps
+        flat = (np.abs(y0 - y3) < epsilon) & (np.abs(y1 - y2) < epsilon) & (np.abs(y2 - y3) < epsilon)
+        result[flat] = y0[flat]
+        return result
+
+    @staticmethod
+    def __bezier(p0, p1, p2, p3, t):
+        s = 1 - t
+        return s * s * s * p0 + 3 * s * s * t * p1 + 3 * s * t * t * p2 + t * t * t * p3
+
+
+# cache for performance reasons, the fcurves of a channel group are read once
+@cached(max_entries=256)
+def get_fcurve_data(fcurve: bpy.types.FCurve, export_settings) -> FCurveData:
+    return FCurveData(fcurve)
 
 
 # cache for performance reasons
@@ -116,19 +337,21 @@ def gather_keyframes(blender_object_if_armature: typing.Optional[bpy.types.Objec
                      bake_range_end,
                      action_name: str,
                      export_settings
-                     ) -> typing.List[Keyframe]:
+                     ) -> Keyframes:
     """Convert the blender action groups' fcurves to keyframes for use in glTF."""
     if bake_bone is None:
         # Find the start and end of the whole action group
-        ranges = [channel.range() for channel in channels]
-
         start_frame = min([channel.range()[0] for channel in channels])
         end_frame = max([channel.range()[1] for channel in channels])
     else:
         start_frame = bake_range_start
         end_frame = bake_range_end
 
-    keyframes = []
+    if bake_channel is None:
+        target = channels[0].data_path.split('.')[-1]
+    else:
+        target = bake_channel
+
     if needs_baking(blender_object_if_armature, channels, export_settings):
         # Bake the animation, by evaluating the animation for all frames
         # TODO: maybe baking can also be done with FCurve.convert_to_samples
@@ -142,95 +365,45 @@ def gather_keyframes(blender_object_if_armature: typing.Optional[bpy.types.Objec
         else:
             pose_bone_if_armature = None
 
+        if isinstance(pose_bone_if_armature, bpy.types.PoseBone):
+            # we need to bake in the constraints
+            baked_pose = bake_pose(blender_object_if_armature, start_frame, end_frame,
+                                   'BASIS' if bake_bone is None else 'LOCAL', action_name, export_settings)
+            return Keyframes(target, baked_pose.frames, baked_pose.get(pose_bone_if_armature.name, target))
+
         # sample all frames
+        frames = []
         frame = start_frame
         step = export_settings['gltf_frame_step']
         while frame <= end_frame:
-            key = Keyframe(channels, frame, bake_channel)
-            if isinstance(pose_bone_if_armature, bpy.types.PoseBone):
-                # we need to bake in the constraints
-                bpy.context.scene.frame_set(frame)
-                if bake_bone is None:
-                    trans, rot, scale = pose_bone_if_armature.matrix_basis.decompose()
-                else:
-                    matrix = pose_bone_if_armature.matrix
-                    if bpy.app.version < (2, 80, 0):
-                        new_matrix = blender_object_if_armature.convert_space(pose_bone_if_armature, matrix, 'POSE', 'LOCAL')
-                    else:
-                        new_matrix = blender_object_if_armature.convert_space(pose_bone=pose_bone_if_armature, matrix=matrix, from_space='POSE', to_space='LOCAL')
-                    trans, rot, scale = new_matrix.decompose()
-                if bake_channel is None:
-                    target_property = channels[0].data_path.split('.')[-1]
-                else:
-                    target_property = bake_channel
-                key.value = {
-                    "location": trans,
-                    "rotation_axis_angle": rot,
-                    "rotation_euler": rot,
-                    "rotation_quaternion": rot,
-                    "scale": scale
-                }[target_property]
-            else:
-                key.value = [c.evaluate(frame) for c in channels]
-                complete_key(key, non_keyed_values)
-            keyframes.append(key)
+            frames.append(frame)
             frame += step
-    else:
-        # Just use the keyframes as they are specified in blender
-        frames = [keyframe.co[0] for keyframe in channels[0].keyframe_points]
-        for i, frame in enumerate(frames):
-            key = Keyframe(channels, frame, bake_channel)
-            # key.value = [c.keyframe_points[i].co[0] for c in action_group.channels]
-            key.value = [c.evaluate(frame) for c in channels]
-            # Complete key with non keyed values, if needed
-            if len(channels) != key.get_target_len():
-                complete_key(key, non_keyed_values)
-
-            # compute tangents for cubic spline interpolation
-            if channels[0].keyframe_points[0].interpolation == "BEZIER":
-                # Construct the in tangent
-                if frame == frames[0]:
-                    # start in-tangent should become all zero
-                    key.in_tangent = key.value
-                else:
-                    # otherwise construct an in tangent coordinate from the keyframes control points. We intermediately
-                    # use a point at t-1 to define the tangent. This allows the tangent control point to be transformed
-                    # normally
-                    key.in_tangent = [
-                        c.keyframe_points[i].co[1] + ((c.keyframe_points[i].co[1] - c.keyframe_points[i].handle_left[1]
-                                                       ) / (frame - frames[i - 1]))
-                        for c in channels
-                    ]
-                # Construct the out tangent
-                if frame == frames[-1]:
-                    # end out-tangent should become all zero
-                    key.out_tangent = key.value
-                else:
-                    # otherwise construct an in tangent coordinate from the keyframes control points. We intermediately
-                    # use a point at t+1 to define the tangent. This allows the tangent control point to be transformed
-                    # normally
-                    key.out_tangent = [
-                        c.keyframe_points[i].co[1] + ((c.keyframe_points[i].handle_right[1] - c.keyframe_points[i].co[1]
-                                                       ) / (frames[i + 1] - frame))
-                        for c in channels
-                    ]
-
-            keyframes.append(key)
-
-    return keyframes
-
-
-def complete_key(key: Keyframe, non_keyed_values: typing.Tuple[typing.Optional[float]]):
-    """
-    Complete keyframe with non keyed values
-    """
+        channel_values = np.array([get_fcurve_data(c, export_settings).evaluate(frames) for c in channels]).T
+        return Keyframes(target, frames, get_target_values(target, channels, channel_values, non_keyed_values))
+
+    # Just use the keyframes as they are specified in blender
+    fcurves_data = [get_fcurve_data(c, export_settings) for c in channels]
+    frames = fcurves_data[0].frames
+    channel_values = np.array([data.evaluate(frames) for data in fcurves_data]).T
+    values = get_target_values(target, channels, channel_values, non_keyed_values)
+    if fcurves_data[0].uniform_interpolation != INTERPOLATION_BEZIER:
+        return Keyframes(target, frames, values)
+
+    # compute tangents for cubic spline interpolation
+    # We intermediately use points at t-1 and t+1 to define the tangents from the keyframes control points.
+    # This allows the tangent control points to be transformed normally
+    durations = np.diff(frames)
+    in_tangents = np.array([data.values + (data.values - data.handle_left[:, 1]) / np.append(1, durations)
+                            for data in fcurves_data]).T
+    out_tangents = np.array([data.values + (data.handle_right[:, 1] - data.values) / np.append(durations, 1)
+                             for data in fcurves_data]).T
+    # start in-tangent and end out-tangent should become all zero
+    in_tangents[0] = channel_values[0]
+    out_tangents[-1] = channel_values[-1]
+    return Keyframes(target, frames, values,
+                     get_target_values(target, channels, in_tangents, non_keyed_values),
+                     get_target_values(target, channels, out_tangents, non_keyed_values))
 
-    if key.target == "value":
-        return # No array_index
-    for i in range(0, key.get_target_len()):
-        if i in key.get_indices():
-            continue # this is a keyed array_index
-        key.set_value_index(i, non_keyed_values[i])
 
 def needs_baking(blender_object_if_armature: typing.Optional[bpy.types.Object],
                  channels: typing.Tuple[bpy.types.FCurve],
@@ -241,23 +414,22 @@ def needs_baking(blender_object_if_armature: typing.Optional[bpy.types.Object],
 
     Some blender animations need to be baked as they can not directly be expressed in glTF.
     """
-    def all_equal(lst):
-        return lst[1:] == lst[:-1]
-
     # Sampling is forced
     if export_settings[gltf2_blender_export_keys.FORCE_SAMPLING]:
         return True
 
+    fcurves_data = [get_fcurve_data(c, export_settings) for c in channels]
+
     # Sampling due to unsupported interpolation
-    interpolation = channels[0].keyframe_points[0].interpolation
-    if interpolation not in ["BEZIER", "LINEAR", "CONSTANT"]:
+    interpolation = fcurves_data[0].interpolation[0]
+    if interpolation > INTERPOLATION_BEZIER:
         gltf2_io_debug.print_console("WARNING",
                                      "Baking animation because of an unsupported interpolation method: {}".format(
-                                         interpolation)
+                                         channels[0].keyframe_points[0].interpolation)
                                      )
         return True
 
-    if any(any(k.interpolation != interpolation for k in c.keyframe_points) for c in channels):
+    if any(data.uniform_interpolation != interpolation for data in fcurves_data):
         # There are different interpolation methods in one action group
         gltf2_io_debug.print_console("WARNING",
                                      "Baking animation because there are keyframes with different "
@@ -265,17 +437,17 @@ def needs_baking(blender_object_if_armature: typing.Optional[bpy.types.Object],
                                      )
         return True
 
-    if not all_equal([len(c.keyframe_points) for c in channels]):
+    if any(len(data.frames) != len(fcurves_data[0].frames) for data in fcurves_data):
         gltf2_io_debug.print_console("WARNING",
                                      "Baking animation because the number of keyframes is not "
                                      "equal for all channel tracks")
         return True
 
-    if len(channels[0].keyframe_points) <= 1:
+    if len(fcurves_data[0].frames) <= 1:
         # we need to bake to 'STEP', as at least two keyframes are required to interpolate
         return True
 
-    if not all_equal(list(zip([[k.co[0] for k in c.keyframe_points] for c in channels]))):
+    if any(not np.array_equal(data.frames, fcurves_data[0].frames) for data in fcurves_data):
         # The channels have differently located keyframes
         gltf2_io_debug.print_console("WARNING",
                                      "Baking animation because of differently located keyframes in one channel")
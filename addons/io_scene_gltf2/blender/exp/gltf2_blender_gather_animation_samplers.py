@@ -13,10 +13,12 @@
 # limitations under the License.
 
 
+import math
 import typing
 
 import bpy
 import mathutils
+import numpy as np
 from io_scene_gltf2.blender.com import gltf2_blender_math
 from io_scene_gltf2.blender.com.gltf2_blender_data_path import get_target_property_name, get_target_object_path
 from io_scene_gltf2.blender.exp import gltf2_blender_gather_animation_sampler_keyframes
@@ -28,6 +30,9 @@ from io_scene_gltf2.io.com import gltf2_io_constants
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
 from . import gltf2_blender_export_keys
 
+# Dot product of unit quaternions whose rotations differ by a quarter turn
+QUARTER_TURN_DOT = math.cos(math.pi / 4)
+
 
 @cached
 def gather_animation_sampler(channels: typing.Tuple[bpy.types.FCurve],
@@ -162,17 +167,17 @@ def __gather_extras(channels: typing.Tuple[bpy.types.FCurve],
 
 
 @cached
-def __gather_input(channels: typing.Tuple[bpy.types.FCurve],
-                   blender_object_if_armature: typing.Optional[bpy.types.Object],
-                   non_keyed_values: typing.Tuple[typing.Optional[float]],
-                   bake_bone: typing.Union[str, None],
-                   bake_channel: typing.Union[str, None],
-                   bake_range_start,
-                   bake_range_end,
-                   action_name,
-                   export_settings
-                   ) -> gltf2_io.Accessor:
-    """Gather the key time codes."""
+def __gather_keyframes(blender_object_if_armature: typing.Optional[bpy.types.Object],
+                       channels: typing.Tuple[bpy.types.FCurve],
+                       non_keyed_values: typing.Tuple[typing.Optional[float]],
+                       bake_bone: typing.Union[str, None],
+                       bake_channel: typing.Union[str, None],
+                       bake_range_start,
+                       bake_range_end,
+                       action_name,
+                       export_settings
+                       ) -> gltf2_blender_gather_animation_sampler_keyframes.Keyframes:
+    """Gather the keyframes of the sampler, without the redundant ones of sampled animations if optimizing."""
     keyframes = gltf2_blender_gather_animation_sampler_keyframes.gather_keyframes(blender_object_if_armature,
                                                                                   channels,
                                                                                   non_keyed_values,
@@ -182,17 +187,142 @@ def __gather_input(channels: typing.Tuple[bpy.types.FCurve],
                                                                                   bake_range_end,
                                                                                   action_name,
                                                                                   export_settings)
-    times = [k.seconds for k in keyframes]
+    if not export_settings[gltf2_blender_export_keys.OPTIMIZE_ANIMATION] or len(keyframes) < 2:
+        return keyframes
+    # Keyframes exported as they are in Blender, with their interpolation, are kept
+    if not gltf2_blender_gather_animation_sampler_keyframes.needs_baking(blender_object_if_armature,
+                                                                         channels,
+                                                                         export_settings):
+        return keyframes
+
+    if keyframes.is_rotation:
+        tolerance = export_settings[gltf2_blender_export_keys.OPTIMIZE_ANIMATION_ANGLE]
+    else:
+        tolerance = export_settings[gltf2_blender_export_keys.OPTIMIZE_ANIMATION_TOLERANCE]
+    kept = __get_kept_keyframes(keyframes.frames,
+                                keyframes.values.astype(np.float64),
+                                keyframes.is_rotation,
+                                tolerance)
+
+    statistics = export_settings.setdefault(gltf2_blender_export_keys.OPTIMIZED_KEYFRAMES, [0, 0])
+    statistics[0] += len(keyframes)
+    statistics[1] += len(keyframes) - len(kept)
+    return keyframes.select(kept)
+
+
+def __get_kept_keyframes(frames: np.ndarray,
+                         values: np.ndarray,
+                         is_rotation: bool,
+                         tolerance: float
+                         ) -> typing.List[int]:
+    """
+    Indices of the keyframes to keep, so that linear interpolation between them stays within tolerance of all values.
+
+    Rotations are quaternions, interpolated with slerp, and their tolerance is an angle. Values all within tolerance
+    of the first one are reduced to the first keyframe.
+    """
+    if is_rotation:
+        values = values / np.linalg.norm(values, axis=1, keepdims=True)
+
+    def fits(start, end):
+        # Keyframes between start and end are reproduced by interpolating from start to end
+        if end - start < 2:
+            return True
+        # Keep rotations between keyframes under a quarter turn, far from half turns whose shortest path is ambiguous
+        if is_rotation and abs(np.dot(values[start], values[end])) < QUARTER_TURN_DOT:
+            return False
+        factors = (frames[start + 1:end] - frames[start]) / (frames[end] - frames[start])
+        errors = __get_errors(values[start], values[end], factors, values[start + 1:end], is_rotation)
+        return (errors <= tolerance).all()
+
+    count = len(values)
+    if (__get_errors(values[0], values[0], np.zeros(count), values, is_rotation) <= tolerance).all():
+        return [0]
+
+    kept = [0]
+    start = 0
+    while start < count - 1:
+        # Double the segment as long as it fits, then bisect between the longest fitting end and the next one
+        end, step = start + 1, 1
+        while end < count - 1 and fits(start, min(end + step, count - 1)):
+            end = min(end + step, count - 1)
+            step *= 2
+        if end < count - 1:
+            too_far = min(end + step, count - 1)
+            while too_far - end > 1:
+                middle = (end + too_far) // 2
+                if fits(start, middle):
+                    end = middle
+                else:
+                    too_far = middle
+        kept.append(end)
+        start = end
+    return kept
+
+
+def __get_errors(first: np.ndarray, last: np.ndarray, factors: np.ndarray, values: np.ndarray, is_rotation: bool
+                 ) -> np.ndarray:
+    """Distances of values to the interpolation from first to last at factors, angles for rotations."""
+    if not is_rotation:
+        interpolated = first + np.outer(factors, last - first)
+        return np.abs(values - interpolated).max(axis=1)
+
+    # Spherical interpolation, along the shortest path
+    dot = np.dot(first, last)
+    if dot < 0:
+        last, dot = -last, -dot
+    angle = np.arccos(min(dot, 1.0))
+    if angle < 1e-6:
+        interpolated = first + np.outer(factors, last - first)
+    else:
+        interpolated = (np.outer(np.sin((1 - factors) * angle), first) + np.outer(np.sin(factors * angle), last)) / \
+            np.sin(angle)
+    interpolated /= np.linalg.norm(interpolated, axis=1, keepdims=True)
+    return 2 * np.arccos(np.minimum(np.abs(np.sum(interpolated * values, axis=1)), 1.0))
 
-    return gltf2_blender_gather_accessors.gather_accessor(
-        gltf2_io_binary_data.BinaryData.from_list(times, gltf2_io_constants.ComponentType.Float),
+
+@cached
+def __gather_input(channels: typing.Tuple[bpy.types.FCurve],
+                   blender_object_if_armature: typing.Optional[bpy.types.Object],
+                   non_keyed_values: typing.Tuple[typing.Optional[float]],
+                   bake_bone: typing.Union[str, None],
+                   bake_channel: typing.Union[str, None],
+                   bake_range_start,
+                   bake_range_end,
+                   action_name,
+                   export_settings
+                   ) -> gltf2_io.Accessor:
+    """Gather the key time codes, shared by all the samplers of the export with the same ones."""
+    keyframes = __gather_keyframes(blender_object_if_armature,
+                                   channels,
+                                   non_keyed_values,
+                                   bake_bone,
+                                   bake_channel,
+                                   bake_range_start,
+                                   bake_range_end,
+                                   action_name,
+                                   export_settings)
+    times = keyframes.seconds
+    buffer_view = gltf2_io_binary_data.BinaryData.from_list(times, gltf2_io_constants.ComponentType.Float)
+
+    # Inputs are pooled by content, whatever the channel and action they come from
+    inputs, statistics = export_settings.setdefault(gltf2_blender_export_keys.SAMPLER_INPUTS, ({}, [0, 0]))
+    statistics[0] += 1
+    accessor = inputs.get(buffer_view)
+    if accessor is not None:
+        statistics[1] += buffer_view.byte_length
+        return accessor
+
+    accessor = inputs[buffer_view] = gltf2_blender_gather_accessors.gather_accessor(
+        buffer_view,
         gltf2_io_constants.ComponentType.Float,
         len(times),
-        tuple([max(times)]),
-        tuple([min(times)]),
+        tuple([float(times.max())]),
+        tuple([float(times.min())]),
         gltf2_io_constants.DataType.Scalar,
         export_settings
     )
+    return accessor
 
 
 def __gather_interpolation(channels: typing.Tuple[bpy.types.FCurve],
@@ -234,15 +364,15 @@ def __gather_output(channels: typing.Tuple[bpy.types.FCurve],
                     export_settings
                     ) -> gltf2_io.Accessor:
     """Gather the data of the keyframes."""
-    keyframes = gltf2_blender_gather_animation_sampler_keyframes.gather_keyframes(blender_object_if_armature,
-                                                                                  channels,
-                                                                                  non_keyed_values,
-                                                                                  bake_bone,
-                                                                                  bake_channel,
-                                                                                  bake_range_start,
-                                                                                  bake_range_end,
-                                                                                  action_name,
-                                                                                  export_settings)
+    keyframes = __gather_keyframes(blender_object_if_armature,
+                                   channels,
+                                   non_keyed_values,
+                                   bake_bone,
+                                   bake_channel,
+                                   bake_range_start,
+                                   bake_range_end,
+                                   action_name,
+                                   export_settings)
     if bake_bone is not None:
         target_datapath = "pose.bones['" + bake_bone + "']." + bake_channel
     else:
@@ -282,39 +412,27 @@ def __gather_output(channels: typing.Tuple[bpy.types.FCurve],
     else:
         transform = parent_inverse
 
-    values = []
-    for keyframe in keyframes:
-        # Transform the data and build gltf control points
-        value = gltf2_blender_math.transform(keyframe.value, target_datapath, transform)
-        if is_yup and not is_armature_animation:
-            value = gltf2_blender_math.swizzle_yup(value, target_datapath)
-        keyframe_value = gltf2_blender_math.mathutils_to_gltf(value)
-
-        if keyframe.in_tangent is not None:
-            # we can directly transform the tangent as it currently is represented by a control point
-            in_tangent = gltf2_blender_math.transform(keyframe.in_tangent, target_datapath, transform)
+    # Transform the data and build gltf control points
+    values = gltf2_blender_math.transform_array(keyframes.values.astype(np.float64), target_datapath, transform)
+    if is_yup and not is_armature_animation:
+        values = gltf2_blender_math.swizzle_yup_array(values, target_datapath)
+
+    if keyframes.in_tangents is not None:
+        # we can directly transform the tangents as they currently are represented by control points
+        tangents = []
+        for control_points in (keyframes.in_tangents, keyframes.out_tangents):
+            control_points = gltf2_blender_math.transform_array(control_points.astype(np.float64), target_datapath,
+                                                                transform)
             if is_yup and blender_object_if_armature is None:
-                in_tangent = gltf2_blender_math.swizzle_yup(in_tangent, target_datapath)
+                control_points = gltf2_blender_math.swizzle_yup_array(control_points, target_datapath)
             # the tangent in glTF is relative to the keyframe value
-            if not isinstance(value, list):
-                in_tangent = value - in_tangent
-            else:
-                in_tangent = [value[i] - in_tangent[i] for i in range(len(value))]
-            keyframe_value = gltf2_blender_math.mathutils_to_gltf(in_tangent) + keyframe_value  # append
-
-        if keyframe.out_tangent is not None:
-            # we can directly transform the tangent as it currently is represented by a control point
-            out_tangent = gltf2_blender_math.transform(keyframe.out_tangent, target_datapath, transform)
-            if is_yup and blender_object_if_armature is None:
-                out_tangent = gltf2_blender_math.swizzle_yup(out_tangent, target_datapath)
-            # the tangent in glTF is relative to the keyframe value
-            if not isinstance(value, list):
-                out_tangent = value - out_tangent
-            else:
-                out_tangent = [value[i] - out_tangent[i] for i in range(len(value))]
-            keyframe_value = keyframe_value + gltf2_blender_math.mathutils_to_gltf(out_tangent)  # append
+            tangents.append(values - control_points)
+        # in tangent, value and out tangent of each keyframe
+        values = np.hstack((tangents[0], values, tangents[1]))
 
-        values += keyframe_value
+    if keyframes.is_rotation:
+        # Blender has w-first quaternion notation
+        values = values.reshape(-1, 4)[:, (1, 2, 3, 0)]
 
     # store the keyframe data in a binary buffer
     component_type = gltf2_io_constants.ComponentType.Float
@@ -322,13 +440,13 @@ def __gather_output(channels: typing.Tuple[bpy.types.FCurve],
         # channels with 'weight' targets must have scalar accessors
         data_type = gltf2_io_constants.DataType.Scalar
     else:
-        data_type = gltf2_io_constants.DataType.vec_type_from_num(len(keyframes[0].value))
+        data_type = gltf2_io_constants.DataType.vec_type_from_num(keyframes.values.shape[1])
 
     return gltf2_io.Accessor(
         buffer_view=gltf2_io_binary_data.BinaryData.from_list(values, component_type),
         byte_offset=None,
         component_type=component_type,
-        count=len(values) // gltf2_io_constants.DataType.num_elements(data_type),
+        count=values.size // gltf2_io_constants.DataType.num_elements(data_type),
         extensions=None,
         extras=None,
         max=None,
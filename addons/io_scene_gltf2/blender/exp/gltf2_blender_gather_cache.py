@@ -15,57 +15,113 @@
 import functools
 import bpy
 
-def cached(func):
+from io_scene_gltf2.blender.exp import gltf2_blender_export_keys
+
+# Blender data used in cache keys by name
+CACHED_BY_NAME = (bpy.types.Object, bpy.types.Scene, bpy.types.Material, bpy.types.Action, bpy.types.Mesh)
+
+# Result of a lookup in the cache for a missing key
+MISSING = object()
+
+
+class ExportCache:
+    """
+    Results of the cached gather functions during one export.
+
+    A cache is created for each export, and stored in the export settings: exports with different
+    export settings never share results. Dropping the cache releases all the results at once.
+    """
+
+    def __init__(self):
+        self.__results = {}
+        self.__statistics = {}
+
+    def get(self, func, key):
+        """Cached result of func for key, or MISSING."""
+        result = self.__results.get(func, {}).get(key, MISSING)
+        statistics = self.__get_statistics(func)
+        statistics[0 if result is not MISSING else 1] += 1
+        return result
+
+    def set(self, func, key, result, max_entries=None):
+        """
+        Keep result of func for key.
+
+        :param max_entries: optional maximum number of results kept for func, the oldest ones are dropped first
+        """
+        results = self.__results.setdefault(func, {})
+        if max_entries is not None and len(results) >= max_entries:
+            del results[next(iter(results))]
+        results[key] = result
+
+    def clear(self):
+        self.__results = {}
+        self.__statistics = {}
+
+    def statistics(self):
+        """Hits, misses and number of results kept, by function name."""
+        return {
+            func.__module__ + '.' + func.__name__: (hits, misses, len(self.__results.get(func, ())))
+            for func, (hits, misses) in self.__statistics.items()
+        }
+
+    def __get_statistics(self, func):
+        statistics = self.__statistics.get(func)
+        if statistics is None:
+            statistics = self.__statistics[func] = [0, 0]
+        return statistics
+
+
+def get_cache(export_settings) -> ExportCache:
+    """Cache of the export using export_settings, created if needed."""
+    cache = export_settings.get(gltf2_blender_export_keys.CACHE)
+    if cache is None:
+        cache = export_settings[gltf2_blender_export_keys.CACHE] = ExportCache()
+    return cache
+
+
+def cached(func=None, max_entries=None):
     """
     Decorate the cache gather functions results.
 
-    The gather function is only executed if its result isn't in the cache yet
-    :param func: the function to be decorated. It will have a static __cache member afterwards
+    The gather function is only executed if its result isn't in the cache of the export yet.
+    Functions cached for performance only can be decorated with @cached(max_entries=...) to bound the number of
+    results kept: the oldest ones are dropped first, and computed again if needed.
+    Never bound functions whose results need to be unique.
+    :param func: the function to be decorated
+    :param max_entries: optional maximum number of results kept for the function
     :return:
     """
+    if func is None:
+        return functools.partial(cached, max_entries=max_entries)
+
     @functools.wraps(func)
     def wrapper_cached(*args, **kwargs):
         assert len(args) >= 2 and 0 <= len(kwargs) <= 1, "Wrong signature for cached function"
-        cache_key_args = args
-        # make a shallow copy of the keyword arguments so that 'export_settings' can be removed
-        cache_key_kwargs = dict(kwargs)
-        if kwargs.get("export_settings"):
+        # 'export_settings' should not be cached
+        if "export_settings" in kwargs:
             export_settings = kwargs["export_settings"]
-            # 'export_settings' should not be cached
-            del cache_key_kwargs["export_settings"]
+            key_args = args
         else:
             export_settings = args[-1]
-            cache_key_args = args[:-1]
-
-        __by_name = [bpy.types.Object, bpy.types.Scene, bpy.types.Material, bpy.types.Action, bpy.types.Mesh]
+            key_args = args[:-1] + tuple(kwargs.values())
 
         # we make a tuple from the function arguments so that they can be used as a key to the cache
-        cache_key = ()
-        for i in cache_key_args:
-            if type(i) in __by_name:
-                cache_key += (i.name,)
-            else:
-                cache_key += (i,)
-        for i in cache_key_kwargs.values():
-            if type(i) in __by_name:
-                cache_key += (i.name,)
-            else:
-                cache_key += (i,)
-
-        # invalidate cache if export settings have changed
-        if not hasattr(func, "__export_settings") or export_settings != func.__export_settings:
-            func.__cache = {}
-            func.__export_settings = export_settings
+        cache_key = tuple(arg.name if isinstance(arg, CACHED_BY_NAME) else arg for arg in key_args)
+
         # use or fill cache
-        if cache_key in func.__cache:
-            return func.__cache[cache_key]
-        else:
-            result = func(*args)
-            func.__cache[cache_key] = result
-            return result
+        cache = get_cache(export_settings)
+        result = cache.get(func, cache_key)
+        if result is MISSING:
+            result = func(*args, **kwargs)
+            cache.set(func, cache_key, result, max_entries)
+        return result
     return wrapper_cached
 
-
 # TODO: replace "cached" with "unique" in all cases where the caching is functional and not only for performance reasons
 call_or_fetch = cached
-unique = cached
+
+
+def unique(func):
+    """Decorate gather functions whose results need to be unique: they are kept until the end of the export."""
+    return cached(func)
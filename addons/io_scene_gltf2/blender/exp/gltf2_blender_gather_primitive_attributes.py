@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 from . import gltf2_blender_export_keys
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.com import gltf2_io_constants
@@ -41,7 +43,9 @@ def __gather_position(blender_primitive, export_settings):
     componentType = gltf2_io_constants.ComponentType.Float
     return {
         "POSITION": gltf2_io.Accessor(
-            buffer_view=gltf2_io_binary_data.BinaryData.from_list(position, componentType),
+            buffer_view=gltf2_io_binary_data.BinaryData.from_list(
+                position, componentType, gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER,
+                gltf2_io_constants.DataType.Vec3),
             byte_offset=None,
             component_type=componentType,
             count=len(position) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Vec3),
@@ -62,7 +66,9 @@ def __gather_normal(blender_primitive, export_settings):
         normal = blender_primitive["attributes"]['NORMAL']
         return {
             "NORMAL": gltf2_io.Accessor(
-                buffer_view=gltf2_io_binary_data.BinaryData.from_list(normal, gltf2_io_constants.ComponentType.Float),
+                buffer_view=gltf2_io_binary_data.BinaryData.from_list(
+                    normal, gltf2_io_constants.ComponentType.Float, gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER,
+                    gltf2_io_constants.DataType.Vec3),
                 byte_offset=None,
                 component_type=gltf2_io_constants.ComponentType.Float,
                 count=len(normal) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Vec3),
@@ -86,7 +92,8 @@ def __gather_tangent(blender_primitive, export_settings):
             return {
                 "TANGENT": gltf2_io.Accessor(
                     buffer_view=gltf2_io_binary_data.BinaryData.from_list(
-                        tangent, gltf2_io_constants.ComponentType.Float),
+                        tangent, gltf2_io_constants.ComponentType.Float,
+                        gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER, gltf2_io_constants.DataType.Vec4),
                     byte_offset=None,
                     component_type=gltf2_io_constants.ComponentType.Float,
                     count=len(tangent) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Vec4),
@@ -113,7 +120,8 @@ def __gather_texcoord(blender_primitive, export_settings):
             tex_coord = blender_primitive["attributes"][tex_coord_id]
             attributes[tex_coord_id] = gltf2_io.Accessor(
                 buffer_view=gltf2_io_binary_data.BinaryData.from_list(
-                    tex_coord, gltf2_io_constants.ComponentType.Float),
+                    tex_coord, gltf2_io_constants.ComponentType.Float,
+                    gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER, gltf2_io_constants.DataType.Vec2),
                 byte_offset=None,
                 component_type=gltf2_io_constants.ComponentType.Float,
                 count=len(tex_coord) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Vec2),
@@ -140,7 +148,8 @@ def __gather_colors(blender_primitive, export_settings):
             internal_color = blender_primitive["attributes"][color_id]
             attributes[color_id] = gltf2_io.Accessor(
                 buffer_view=gltf2_io_binary_data.BinaryData.from_list(
-                    internal_color, gltf2_io_constants.ComponentType.Float),
+                    internal_color, gltf2_io_constants.ComponentType.Float,
+                    gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER, gltf2_io_constants.DataType.Vec4),
                 byte_offset=None,
                 component_type=gltf2_io_constants.ComponentType.Float,
                 count=len(internal_color) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Vec4),
@@ -164,7 +173,8 @@ def __gather_skins(blender_primitive, export_settings):
         bone_set_index = 0
         joint_id = 'JOINTS_' + str(bone_set_index)
         weight_id = 'WEIGHTS_' + str(bone_set_index)
-        while blender_primitive["attributes"].get(joint_id) and blender_primitive["attributes"].get(weight_id):
+        while blender_primitive["attributes"].get(joint_id) is not None \
+                and blender_primitive["attributes"].get(weight_id) is not None:
             if bone_set_index >= 1:
                 if not export_settings['gltf_all_vertex_influences']:
                     gltf2_io_debug.print_console("WARNING", "There are more than 4 joint vertex influences."
@@ -175,7 +185,8 @@ def __gather_skins(blender_primitive, export_settings):
             internal_joint = blender_primitive["attributes"][joint_id]
             joint = gltf2_io.Accessor(
                 buffer_view=gltf2_io_binary_data.BinaryData.from_list(
-                    internal_joint, gltf2_io_constants.ComponentType.UnsignedShort),
+                    internal_joint, gltf2_io_constants.ComponentType.UnsignedShort,
+                    gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER, gltf2_io_constants.DataType.Vec4),
                 byte_offset=None,
                 component_type=gltf2_io_constants.ComponentType.UnsignedShort,
                 count=len(internal_joint) // gltf2_io_constants.DataType.num_elements(gltf2_io_constants.DataType.Vec4),
@@ -194,16 +205,14 @@ def __gather_skins(blender_primitive, export_settings):
             internal_weight = blender_primitive["attributes"][weight_id]
             # normalize first 4 weights, when not exporting all influences
             if not export_settings['gltf_all_vertex_influences']:
-                for idx in range(0, len(internal_weight), 4):
-                    weight_slice = internal_weight[idx:idx + 4]
-                    total = sum(weight_slice)
-                    if total > 0:
-                        factor = 1.0 / total
-                        internal_weight[idx:idx + 4] = [w * factor for w in weight_slice]
+                weight_sets = np.asarray(internal_weight, dtype=np.float64).reshape(-1, 4)
+                totals = weight_sets.sum(axis=1, keepdims=True)
+                internal_weight = np.divide(weight_sets, totals, out=weight_sets, where=totals > 0).ravel()
 
             weight = gltf2_io.Accessor(
                 buffer_view=gltf2_io_binary_data.BinaryData.from_list(
-                    internal_weight, gltf2_io_constants.ComponentType.Float),
+                    internal_weight, gltf2_io_constants.ComponentType.Float,
+                    gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER, gltf2_io_constants.DataType.Vec4),
                 byte_offset=None,
                 component_type=gltf2_io_constants.ComponentType.Float,
                 count=len(internal_weight) // gltf2_io_constants.DataType.num_elements(
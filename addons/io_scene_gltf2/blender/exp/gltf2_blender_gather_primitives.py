@@ -114,7 +114,7 @@ def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings
     # https://github.com/KhronosGroup/glTF/pull/1476/files
     # Also, UINT8 mode is not supported:
     # https://github.com/KhronosGroup/glTF/issues/1471
-    max_index = max(indices)
+    max_index = indices.max()
     if max_index < 65535:
         component_type = gltf2_io_constants.ComponentType.UnsignedShort
     elif max_index < 4294967295:
@@ -124,7 +124,8 @@ def __gather_indices(blender_primitive, blender_mesh, modifiers, export_settings
         return None
 
     element_type = gltf2_io_constants.DataType.Scalar
-    binary_data = gltf2_io_binary_data.BinaryData.from_list(indices, component_type)
+    binary_data = gltf2_io_binary_data.BinaryData.from_list(
+        indices, component_type, gltf2_io_constants.BufferViewTarget.ELEMENT_ARRAY_BUFFER)
     return gltf2_blender_gather_accessors.gather_accessor(
         binary_data,
         component_type,
@@ -152,12 +153,14 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
                     target_normal_id = 'MORPH_NORMAL_' + str(morph_index)
                     target_tangent_id = 'MORPH_TANGENT_' + str(morph_index)
 
-                    if blender_primitive["attributes"].get(target_position_id):
+                    if blender_primitive["attributes"].get(target_position_id) is not None:
                         target = {}
                         internal_target_position = blender_primitive["attributes"][target_position_id]
                         binary_data = gltf2_io_binary_data.BinaryData.from_list(
                             internal_target_position,
-                            gltf2_io_constants.ComponentType.Float
+                            gltf2_io_constants.ComponentType.Float,
+                            gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER,
+                            gltf2_io_constants.DataType.Vec3
                         )
                         target["POSITION"] = gltf2_io.Accessor(
                             buffer_view=binary_data,
@@ -179,12 +182,14 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
 
                         if export_settings[NORMALS] \
                                 and export_settings[MORPH_NORMAL] \
-                                and blender_primitive["attributes"].get(target_normal_id):
+                                and blender_primitive["attributes"].get(target_normal_id) is not None:
 
                             internal_target_normal = blender_primitive["attributes"][target_normal_id]
                             binary_data = gltf2_io_binary_data.BinaryData.from_list(
                                 internal_target_normal,
                                 gltf2_io_constants.ComponentType.Float,
+                                gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER,
+                                gltf2_io_constants.DataType.Vec3
                             )
                             target['NORMAL'] = gltf2_io.Accessor(
                                 buffer_view=binary_data,
@@ -204,11 +209,13 @@ def __gather_targets(blender_primitive, blender_mesh, modifiers, export_settings
 
                         if export_settings[TANGENTS] \
                                 and export_settings[MORPH_TANGENT] \
-                                and blender_primitive["attributes"].get(target_tangent_id):
+                                and blender_primitive["attributes"].get(target_tangent_id) is not None:
                             internal_target_tangent = blender_primitive["attributes"][target_tangent_id]
                             binary_data = gltf2_io_binary_data.BinaryData.from_list(
                                 internal_target_tangent,
                                 gltf2_io_constants.ComponentType.Float,
+                                gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER,
+                                gltf2_io_constants.DataType.Vec3
                             )
                             target['TANGENT'] = gltf2_io.Accessor(
                                 buffer_view=binary_data,
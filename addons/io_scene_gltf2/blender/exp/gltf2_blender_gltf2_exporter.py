@@ -17,11 +17,19 @@ from typing import List
 from ... import get_version_string
 from io_scene_gltf2.io.com import gltf2_io
 from io_scene_gltf2.io.com import gltf2_io_extensions
+from io_scene_gltf2.io.com.gltf2_io_debug import print_console
 from io_scene_gltf2.io.exp import gltf2_io_binary_data
 from io_scene_gltf2.io.exp import gltf2_io_buffer
 from io_scene_gltf2.io.exp import gltf2_io_image_data
 
 
+# Values that are never traversed
+PRIMITIVE_TYPES = (type(None), bool, int, float, str)
+
+# Sorted member names of each property class
+MEMBER_NAMES = {}
+
+
 class GlTF2Exporter:
     """
     The glTF exporter flattens a scene graph to a glTF serializable format.
@@ -64,6 +72,9 @@ class GlTF2Exporter:
 
         self.__buffer = gltf2_io_buffer.Buffer()
         self.__images = {}
+        # file name of each distinct image content
+        self.__image_files = {}
+        self.__image_bytes_saved = 0
 
         # mapping of all glTFChildOfRootProperty types to their corresponding root level arrays
         self.__childOfRootPropertyTypeLookup = {
@@ -82,7 +93,10 @@ class GlTF2Exporter:
             gltf2_io.Texture: self.__gltf.textures
         }
 
-        self.__propertyTypeLookup = [
+        # index of each child of root property in its root level array, by object identity
+        self.__reference_indices = {}
+
+        self.__propertyTypeLookup = {
             gltf2_io.AccessorSparseIndices,
             gltf2_io.AccessorSparse,
             gltf2_io.AccessorSparseValues,
@@ -97,7 +111,7 @@ class GlTF2Exporter:
             gltf2_io.MaterialPBRMetallicRoughness,
             gltf2_io.MaterialNormalTextureInfoClass,
             gltf2_io.MaterialOcclusionTextureInfoClass
-        ]
+        }
 
     @property
     def glTF(self):
@@ -106,7 +120,7 @@ class GlTF2Exporter:
         return self.__gltf
 
     def finalize_buffer(self, output_path=None, buffer_name=None, is_glb=False):
-        """Finalize the glTF and write buffers."""
+        """Finalize the glTF and write buffers. For GLB, return the buffer to write in the binary chunk."""
         if self.__finalized:
             raise RuntimeError("Tried to finalize buffers for finalized glTF file")
 
@@ -115,7 +129,7 @@ class GlTF2Exporter:
                 uri = None
             elif output_path and buffer_name:
                 with open(output_path + buffer_name, 'wb') as f:
-                    f.write(self.__buffer.to_bytes())
+                    self.__buffer.write(f)
                 uri = buffer_name
             else:
                 uri = self.__buffer.to_embed_string()
@@ -129,10 +143,13 @@ class GlTF2Exporter:
             )
             self.__gltf.buffers.append(buffer)
 
+        if self.__buffer.bytes_saved > 0:
+            print_console('INFO', 'Identical buffer views shared, saving ' + str(self.__buffer.bytes_saved) + ' bytes')
+
         self.__finalized = True
 
         if is_glb:
-            return self.__buffer.to_bytes()
+            return self.__buffer
 
     def add_draco_extension(self):
         """
@@ -156,6 +173,9 @@ class GlTF2Exporter:
             with open(dst_path, 'wb') as f:
                 f.write(image.data)
 
+        if self.__image_bytes_saved > 0:
+            print_console('INFO', 'Identical images shared, saving ' + str(self.__image_bytes_saved) + ' bytes')
+
     def add_scene(self, scene: gltf2_io.Scene, active: bool = True):
         """
         Add a scene to the glTF.
@@ -199,7 +219,12 @@ class GlTF2Exporter:
             # The object is not of a child of root --> don't convert to reference
             return property
 
-        return self.__append_unique_and_get_index(gltf_list, property)
+        index = self.__reference_indices.get(id(property))
+        if index is None:
+            index = len(gltf_list)
+            gltf_list.append(property)
+            self.__reference_indices[id(property)] = index
+        return index
 
     @staticmethod
     def __append_unique_and_get_index(target: list, obj):
@@ -211,6 +236,12 @@ class GlTF2Exporter:
             return index
 
     def __add_image(self, image: gltf2_io_image_data.ImageData):
+        # Images with the same content share the same file
+        uri = self.__image_files.get(image.digest)
+        if uri is not None:
+            self.__image_bytes_saved += image.byte_length
+            return uri
+
         name = image.adjusted_name()
         count = 1
         regex = re.compile(r"-\d+$")
@@ -227,7 +258,9 @@ class GlTF2Exporter:
         # TODO: allow embedding of images (base64)
 
         self.__images[name] = image
-        return name + image.file_extension
+        uri = name + image.file_extension
+        self.__image_files[image.digest] = uri
+        return uri
 
     @classmethod
     def __get_key_path(cls, d: dict, keypath: List[str], default):
@@ -243,46 +276,77 @@ class GlTF2Exporter:
         d[key] = d_key
         return cls.__get_key_path(d[key], keypath, default)
 
+    @staticmethod
+    def __get_member_names(node):
+        """Members of a property, sorted by name like dir() would list them."""
+        cls = type(node)
+        member_names = MEMBER_NAMES.get(cls)
+        if member_names is None:
+            member_names = tuple(sorted(slot for slot in cls.__slots__ if slot != '__dict__'))
+            MEMBER_NAMES[cls] = member_names
+        # Attributes set outside of the schema
+        if node.__dict__:
+            member_names = tuple(sorted(member_names + tuple(node.__dict__)))
+        return member_names
+
+    def __get_children(self, node):
+        """
+        Children of a node to traverse, as (child, container, key, is_attribute, traversed) entries.
+
+        None is returned for leaf nodes.
+        """
+        node_type = type(node)
+        if node_type in self.__childOfRootPropertyTypeLookup or node_type in self.__propertyTypeLookup:
+            if id(node) in self.__reference_indices:
+                # Already traversed and added to the glTF
+                return None
+            children = [(getattr(node, member_name), node, member_name, True, False)
+                        for member_name in self.__get_member_names(node)]
+        elif node_type is list:
+            children = [(child, node, i, False, False) for i, child in enumerate(node)]
+        elif node_type is dict:
+            children = [(child, node, key, False, False) for key, child in node.items()]
+        elif isinstance(node, gltf2_io_extensions.Extension):
+            children = [(node.extension, node, 'extension', True, False)]
+        else:
+            return None
+
+        return [child for child in children if type(child[0]) not in PRIMITIVE_TYPES]
+
     def __traverse(self, node):
         """
-        Recursively traverse a scene graph consisting of gltf compatible elements.
+        Traverse a scene graph consisting of gltf compatible elements.
 
         The tree is traversed downwards until a primitive is reached. Then any ChildOfRoot property
         is stored in the according list in the glTF and replaced with a index reference in the upper level.
+        Traversal uses an explicit stack, so that deep hierarchies do not hit the recursion limit.
         """
-        def __traverse_property(node):
-            for member_name in [a for a in dir(node) if not a.startswith('__') and not callable(getattr(node, a))]:
-                new_value = self.__traverse(getattr(node, member_name))
-                setattr(node, member_name, new_value)  # usually this is the same as before
-
-                # # TODO: maybe with extensions hooks we can find a more elegant solution
-                # if member_name == "extensions" and new_value is not None:
-                #     for extension_name in new_value.keys():
-                #         self.__append_unique_and_get_index(self.__gltf.extensions_used, extension_name)
-                #         self.__append_unique_and_get_index(self.__gltf.extensions_required, extension_name)
-            return node
-
-        # traverse nodes of a child of root property type and add them to the glTF root
+        result = [node]
+        stack = [(node, result, 0, False, False)]
+        while stack:
+            node, container, key, is_attribute, traversed = stack.pop()
+
+            if not traversed:
+                children = self.__get_children(node)
+                if children:
+                    # Come back to the node once its children are traversed, in order
+                    stack.append((node, container, key, is_attribute, True))
+                    stack.extend(reversed(children))
+                    continue
+
+            new_value = self.__convert(node)
+            if is_attribute:
+                setattr(container, key, new_value)  # usually this is the same as before
+            else:
+                container[key] = new_value
+
+        return result[0]
+
+    def __convert(self, node):
+        """Value replacing a node whose children are traversed."""
+        # child of root properties are only present at root level --> replace with index in upper level
         if type(node) in self.__childOfRootPropertyTypeLookup:
-            node = __traverse_property(node)
-            idx = self.__to_reference(node)
-            # child of root properties are only present at root level --> replace with index in upper level
-            return idx
-
-        # traverse lists, such as children and replace them with indices
-        if isinstance(node, list):
-            for i in range(len(node)):
-                node[i] = self.__traverse(node[i])
-            return node
-
-        if isinstance(node, dict):
-            for key in node.keys():
-                node[key] = self.__traverse(node[key])
-            return node
-
-        # traverse into any other property
-        if type(node) in self.__propertyTypeLookup:
-            return __traverse_property(node)
+            return self.__to_reference(node)
 
         # binary data needs to be moved to a buffer and referenced with a buffer view
         if isinstance(node, gltf2_io_binary_data.BinaryData):
@@ -296,7 +360,7 @@ class GlTF2Exporter:
 
         # extensions
         if isinstance(node, gltf2_io_extensions.Extension):
-            extension = self.__traverse(node.extension)
+            extension = node.extension
             self.__append_unique_and_get_index(self.__gltf.extensions_used, node.name)
             self.__append_unique_and_get_index(self.__gltf.extensions_required, node.name)
 
@@ -309,5 +373,6 @@ class GlTF2Exporter:
 
             return extension
 
+        # lists, dicts and other properties are updated in place,
         # do nothing for any type that does not match a glTF schema (primitives)
         return node
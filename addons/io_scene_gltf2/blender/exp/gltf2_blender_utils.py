@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import math
+import numpy as np
 from io_scene_gltf2.io.com import gltf2_io_constants
 
 
@@ -42,6 +43,8 @@ def max_components(l: list, data_type: gltf2_io_constants.DataType) -> list:
     :param data_type: the data type of the list (determines the length of the result)
     :return: a list with length num_elements(data_type) containing the maximum per component along the list
     """
+    if isinstance(l, np.ndarray):
+        return l.reshape(-1, gltf2_io_constants.DataType.num_elements(data_type)).max(axis=0).tolist()
     components_lists = split_list_by_data_type(l, data_type)
     result = [-math.inf] * gltf2_io_constants.DataType.num_elements(data_type)
     for components in components_lists:
@@ -59,6 +62,8 @@ def min_components(l: list, data_type: gltf2_io_constants.DataType) -> list:
     :param data_type: the data type of the list (determines the length of the result)
     :return: a list with length num_elements(data_type) containing the minimum per component along the list
     """
+    if isinstance(l, np.ndarray):
+        return l.reshape(-1, gltf2_io_constants.DataType.num_elements(data_type)).min(axis=0).tolist()
     components_lists = split_list_by_data_type(l, data_type)
     result = [math.inf] * gltf2_io_constants.DataType.num_elements(data_type)
     for components in components_lists:
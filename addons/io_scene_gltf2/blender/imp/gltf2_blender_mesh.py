@@ -13,11 +13,11 @@
 # limitations under the License.
 
 import bpy
-import bmesh
+import numpy as np
 
 from .gltf2_blender_primitive import BlenderPrimitive
 from ...io.imp.gltf2_io_binary import BinaryData
-from ...io.com.gltf2_io_color_management import color_linear_to_srgb
+from ...io.com.gltf2_io_color_management import color_linear_to_srgb_array
 from ..com.gltf2_blender_conversion import loc_gltf_to_blender
 
 
@@ -39,43 +39,111 @@ class BlenderMesh():
 
         mesh = bpy.data.meshes.new(mesh_name)
         verts = []
-        edges = []
         faces = []
         for prim in pymesh.primitives:
-            verts, edges, faces = BlenderPrimitive.create(gltf, prim, verts, edges, faces)
+            verts, faces = BlenderPrimitive.create(gltf, prim, verts, faces)
 
-        mesh.from_pydata(verts, edges, faces)
-        mesh.validate()
+        verts = np.concatenate(verts) if verts else np.zeros((0, 3), dtype=np.float32)
+        faces = np.concatenate(faces) if faces else np.zeros((0, 3), dtype=np.int64)
+
+        mesh.vertices.add(len(verts))
+        mesh.vertices.foreach_set('co', verts.astype(np.float32).reshape(-1))
+        mesh.loops.add(faces.size)
+        mesh.loops.foreach_set('vertex_index', faces.astype(np.int32).reshape(-1))
+        mesh.polygons.add(len(faces))
+        mesh.polygons.foreach_set('loop_start', np.arange(0, faces.size, 3, dtype=np.int32))
+        mesh.polygons.foreach_set('loop_total', np.full(len(faces), 3, dtype=np.int32))
+        if len(faces) > 0:
+            mesh.update(calc_edges=True)
+
+        # Blender validation is only needed to remove degenerate and duplicate triangles
+        if gltf.import_settings['import_validate_mesh'] and BlenderMesh.has_invalid_faces(faces):
+            mesh.validate()
 
         pymesh.blender_name = mesh.name
 
         return mesh
 
+    @staticmethod
+    def has_invalid_faces(faces):
+        """Check if some triangles use a vertex twice, or the same vertices as another triangle."""
+        sorted_faces = np.sort(faces, axis=1)
+        if np.any(sorted_faces[:, 1:] == sorted_faces[:, :-1]):
+            return True
+        # Duplicates are next to each other once the triangles are sorted
+        sorted_faces = sorted_faces[np.lexsort(sorted_faces.T[::-1])]
+        return bool(np.any(np.all(sorted_faces[1:] == sorted_faces[:-1], axis=1)))
+
+    @staticmethod
+    def set_smooth(gltf, mesh, loop_vertices, normals, has_normals):
+        """Set smooth shading of the faces whose vertices have normals."""
+        if gltf.import_settings['import_shading'] == "FLAT":
+            return
+
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get('loop_start', loop_starts)
+        # Imported faces are all triangles
+        triangles = loop_vertices[loop_starts[:, np.newaxis] + np.arange(3)]
+        use_smooth = has_normals[triangles[:, 0]]
+
+        if gltf.import_settings['import_shading'] == "NORMALS":
+            # Faces are flat only if the normal of each vertex is the face normal
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            mesh.vertices.foreach_get('co', co)
+            corners = co.reshape(-1, 3).astype(np.float64)[triangles]
+            face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+            lengths = np.linalg.norm(face_normals, axis=1, keepdims=True)
+            face_normals /= np.where(lengths > 0, lengths, 1)
+            dots = np.einsum('ij,ikj->ik', face_normals, normals[triangles])
+            use_smooth &= np.any(~(dots > 0.9999999), axis=1)
+
+        mesh.polygons.foreach_set('use_smooth', use_smooth)
+
+    @staticmethod
+    def set_loop_data(data, attribute, values, has_values, loop_vertices):
+        """Set attribute of the loops whose vertex has a value, from per vertex values. Other loops keep theirs."""
+        loop_values = np.empty((len(loop_vertices), values.shape[1]), dtype=np.float32)
+        data.foreach_get(attribute, loop_values.reshape(-1))
+        has_loop_values = has_values[loop_vertices]
+        loop_values[has_loop_values] = values[loop_vertices[has_loop_values]]
+        data.foreach_set(attribute, loop_values.reshape(-1))
+
     @staticmethod
     def set_mesh(gltf, pymesh, mesh, obj):
         """Set all data after mesh creation."""
         # Normals
         offset = 0
-        custom_normals = [[0.0, 0.0, 0.0]] * len(mesh.vertices)
+        normals = np.zeros((len(mesh.vertices), 3), dtype=np.float32)
+        has_normals = np.zeros(len(mesh.vertices), dtype=bool)
 
         if gltf.import_settings['import_shading'] == "NORMALS":
             mesh.create_normals_split()
 
         for prim in pymesh.primitives:
-            offset = BlenderPrimitive.set_normals(gltf, prim, mesh, offset, custom_normals)
+            offset = BlenderPrimitive.set_normals(gltf, prim, mesh, offset, normals, has_normals)
+
+        loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get('vertex_index', loop_vertices)
+        BlenderMesh.set_smooth(gltf, mesh, loop_vertices, normals, has_normals)
 
         mesh.update()
 
         # manage UV
         offset = 0
+        uvs = {}
         for prim in pymesh.primitives:
-            offset = BlenderPrimitive.set_UV(gltf, prim, obj, mesh, offset)
+            offset = BlenderPrimitive.set_UV(gltf, prim, obj, mesh, offset, uvs)
+
+        for texcoord, (uv, has_uv) in uvs.items():
+            BlenderMesh.set_loop_data(mesh.uv_layers[texcoord].data, 'uv', uv, has_uv, loop_vertices)
 
         mesh.update()
 
         # Normals, now that every update is done
         if gltf.import_settings['import_shading'] == "NORMALS":
-            mesh.normals_split_custom_set_from_vertices(custom_normals)
+            # Vertices without normal get a null one, that keeps the default normal.
+            # Lists are read faster than arrays of numpy floats.
+            mesh.normals_split_custom_set(normals[loop_vertices].tolist())
             mesh.use_auto_smooth = True
 
         # Object and UV are now created, we can set UVMap into material
@@ -88,15 +156,49 @@ class BlenderMesh():
         # Assign materials to mesh
         offset = 0
         cpt_index_mat = 0
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        bm.faces.ensure_lookup_table()
+        material_indices = np.zeros(len(mesh.vertices), dtype=np.int32)
         for prim in pymesh.primitives:
-            offset, cpt_index_mat = BlenderPrimitive.assign_material(gltf, prim, obj, bm, offset, cpt_index_mat)
+            offset, cpt_index_mat = BlenderPrimitive.assign_material(gltf, prim, obj, offset, cpt_index_mat,
+                                                                     material_indices)
+
+        # Faces get the material of their first vertex, all their vertices are in the same primitive
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get('loop_start', loop_starts)
+        mesh.polygons.foreach_set('material_index', material_indices[loop_vertices[loop_starts]])
+
+        BlenderMesh.set_shape_keys(gltf, pymesh, mesh, obj)
+
+        # Apply vertex color.
+        vertex_color = None
+        offset = 0
+        colors = np.zeros((len(mesh.vertices), 4), dtype=np.float32)
+        has_colors = np.zeros(len(mesh.vertices), dtype=bool)
+        for prim in pymesh.primitives:
+            if 'COLOR_0' in prim.attributes.keys():
+                # Create vertex color, once only per object
+                if vertex_color is None:
+                    vertex_color = obj.data.vertex_colors.new(name="COLOR_0")
+
+                original_color_data = BinaryData.get_array_from_accessor(gltf, prim.attributes['COLOR_0'])
+                color_data = original_color_data[prim.vertex_indices]
 
-        bm.to_mesh(obj.data)
-        bm.free()
+                # Need to convert from linear (glTF to sRGB (blender))
+                prim_colors = colors[offset:offset + prim.vertices_length]
+                prim_colors[:, :3] = color_linear_to_srgb_array(color_data[:, :3])
+                # check dimension, and add alpha if needed
+                prim_colors[:, 3] = color_data[:, 3] if color_data.shape[1] == 4 else 1.0
+                has_colors[offset:offset + prim.vertices_length] = True
+            offset = offset + prim.vertices_length
+
+        if vertex_color is not None:
+            # manage post 2.79b versions, with alpha in vertex colors
+            nb_components = len(vertex_color.data[0].color) if len(vertex_color.data) > 0 else 4
+            BlenderMesh.set_loop_data(vertex_color.data, 'color', colors[:, :nb_components], has_colors,
+                                      loop_vertices)
 
+    @staticmethod
+    def set_shape_keys(gltf, pymesh, mesh, obj):
+        """Create a shape key for each morph target with positions, and set their default weights."""
         # Create shapekeys if needed
         max_shape_to_create = 0
         for prim in pymesh.primitives:
@@ -104,15 +206,21 @@ class BlenderMesh():
                 if len(prim.targets) > max_shape_to_create:
                     max_shape_to_create = len(prim.targets)
 
-        # Create basis shape key
+        # Create basis shape key, other shape keys are set from its positions
         if max_shape_to_create > 0:
             obj.shape_key_add(name="Basis")
+            base_co = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+            mesh.vertices.foreach_get('co', base_co.reshape(-1))
 
         current_shapekey_index = 0
         for sk in range(max_shape_to_create):
 
-            # Check if this target has POSITION
-            if 'POSITION' not in prim.targets[sk].keys():
+            # Check if this target has POSITION, in any primitive
+            prims_with_target = [
+                prim for prim in pymesh.primitives
+                if prim.targets is not None and sk < len(prim.targets) and 'POSITION' in prim.targets[sk].keys()
+            ]
+            if not prims_with_target:
                 gltf.shapekeys[sk] = None
                 continue
 
@@ -127,46 +235,20 @@ class BlenderMesh():
 
             obj.shape_key_add(name=shapekey_name)
             current_shapekey_index += 1
+            gltf.shapekeys[sk] = current_shapekey_index
 
+            # Vertices of primitives without this target keep their base position
+            co = base_co.copy()
             offset_idx = 0
             for prim in pymesh.primitives:
-                if prim.targets is None:
-                    continue
-                if sk >= len(prim.targets):
-                    continue
-
-                bm = bmesh.new()
-                bm.from_mesh(mesh)
-
-                shape_layer = bm.verts.layers.shape[current_shapekey_index]
-                gltf.shapekeys[sk] = current_shapekey_index
-
-                original_pos = BinaryData.get_data_from_accessor(gltf, prim.targets[sk]['POSITION'])
-
-                tmp_indices = {}
-                tmp_idx = 0
-                pos = []
-                for i in prim.tmp_indices:
-                    if i[0] not in tmp_indices.keys():
-                        tmp_indices[i[0]] = tmp_idx
-                        tmp_idx += 1
-                        pos.append(original_pos[i[0]])
-
-                for vert in bm.verts:
-                    if vert.index not in range(offset_idx, offset_idx + prim.vertices_length):
-                        continue
-
-                    shape = vert[shape_layer]
-
-                    co = loc_gltf_to_blender(list(pos[vert.index - offset_idx]))
-                    shape.x = obj.data.vertices[vert.index].co.x + co[0]
-                    shape.y = obj.data.vertices[vert.index].co.y + co[1]
-                    shape.z = obj.data.vertices[vert.index].co.z + co[2]
-
-                bm.to_mesh(obj.data)
-                bm.free()
+                if prim in prims_with_target:
+                    displacements = BinaryData.get_array_from_accessor(gltf, prim.targets[sk]['POSITION'])
+                    co[offset_idx:offset_idx + prim.vertices_length] += \
+                        loc_gltf_to_blender(displacements[prim.vertex_indices])
                 offset_idx += prim.vertices_length
 
+            obj.data.shape_keys.key_blocks[current_shapekey_index].data.foreach_set('co', co.reshape(-1))
+
         # set default weights for shape keys, and names, if not set by convention on extras data
         if pymesh.weights is not None:
             for i in range(max_shape_to_create):
@@ -178,69 +260,3 @@ class BlenderMesh():
                         if gltf.data.accessors[pymesh.primitives[0].targets[i]['POSITION']].name is not None:
                             obj.data.shape_keys.key_blocks[gltf.shapekeys[i]].name = \
                                 gltf.data.accessors[pymesh.primitives[0].targets[i]['POSITION']].name
-
-        # Apply vertex color.
-        vertex_color = None
-        offset = 0
-        for prim in pymesh.primitives:
-            if 'COLOR_0' in prim.attributes.keys():
-                # Create vertex color, once only per object
-                if vertex_color is None:
-                    vertex_color = obj.data.vertex_colors.new(name="COLOR_0")
-
-                original_color_data = BinaryData.get_data_from_accessor(gltf, prim.attributes['COLOR_0'])
-
-                tmp_indices = {}
-                tmp_idx = 0
-                color_data = []
-                for i in prim.tmp_indices:
-                    if i[0] not in tmp_indices.keys():
-                        tmp_indices[i[0]] = tmp_idx
-                        tmp_idx += 1
-                        color_data.append(original_color_data[i[0]])
-
-                for poly in mesh.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = mesh.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-                            cpt_idx = vert_idx - offset
-                            # Need to convert from linear (glTF to sRGB (blender))
-                            if bpy.app.version < (2, 80, 0):
-                                # manage post 2.79b versions
-                                if len(vertex_color.data[loop_idx].color) == 4:
-                                    if len(color_data[cpt_idx]) == 3:
-                                        # TODO : no alpha in vertex color
-                                        srgb_color = [
-                                            color_linear_to_srgb(color_data[cpt_idx][0]),
-                                            color_linear_to_srgb(color_data[cpt_idx][1]),
-                                            color_linear_to_srgb(color_data[cpt_idx][2]),
-                                            1.0]
-                                    else:
-                                        srgb_color = [
-                                            color_linear_to_srgb(color_data[cpt_idx][0]),
-                                            color_linear_to_srgb(color_data[cpt_idx][1]),
-                                            color_linear_to_srgb(color_data[cpt_idx][2]),
-                                            color_data[cpt_idx][3]]
-                                    vertex_color.data[loop_idx].color = srgb_color
-                                else:
-                                    srgb_color = [
-                                        color_linear_to_srgb(color_data[cpt_idx][0]),
-                                        color_linear_to_srgb(color_data[cpt_idx][1]),
-                                        color_linear_to_srgb(color_data[cpt_idx][2])]
-                                    vertex_color.data[loop_idx].color = srgb_color
-                            else:
-                                # check dimension, and add alpha if needed
-                                if len(color_data[cpt_idx]) == 3:
-                                    srgb_color = [
-                                        color_linear_to_srgb(color_data[cpt_idx][0]),
-                                        color_linear_to_srgb(color_data[cpt_idx][1]),
-                                        color_linear_to_srgb(color_data[cpt_idx][2]),
-                                        1.0]
-                                else:
-                                    srgb_color = [
-                                        color_linear_to_srgb(color_data[cpt_idx][0]),
-                                        color_linear_to_srgb(color_data[cpt_idx][1]),
-                                        color_linear_to_srgb(color_data[cpt_idx][2]),
-                                        color_data[cpt_idx][3]]
-                                vertex_color.data[loop_idx].color = srgb_color
-            offset = offset + prim.vertices_length
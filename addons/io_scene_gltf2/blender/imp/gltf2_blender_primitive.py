@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import bpy
-from mathutils import Vector
+import numpy as np
 
 from .gltf2_blender_material import BlenderMaterial
 from ..com.gltf2_blender_conversion import loc_gltf_to_blender
@@ -26,45 +26,36 @@ class BlenderPrimitive():
         raise RuntimeError("%s should not be instantiated" % cls)
 
     @staticmethod
-    def create(gltf, pyprimitive, verts, edges, faces):
-        """Primitive creation."""
+    def create(gltf, pyprimitive, verts, faces):
+        """Primitive creation, appending its vertex and triangle arrays to verts and faces."""
         pyprimitive.blender_texcoord = {}
 
         # TODO mode of primitive 4 for now.
-        current_length = len(verts)
-        pos = BinaryData.get_data_from_accessor(gltf, pyprimitive.attributes['POSITION'])
+        current_length = sum(len(prim_verts) for prim_verts in verts)
+        pos = BinaryData.get_array_from_accessor(gltf, pyprimitive.attributes['POSITION'])
         if pyprimitive.indices is not None:
-            indices = BinaryData.get_data_from_accessor(gltf, pyprimitive.indices)
+            indices = BinaryData.get_array_from_accessor(gltf, pyprimitive.indices)
         else:
-            indices = []
-            indices_ = range(0, len(pos))
-            for i in indices_:
-                indices.append((i,))
+            indices = np.arange(len(pos), dtype=np.uint32).reshape(-1, 1)
 
-        pyprimitive.tmp_indices = indices
+        if gltf.import_settings['import_validate_mesh']:
+            indices = BlenderPrimitive.get_valid_indices(gltf, indices, len(pos))
 
-        # Manage only vertices that are in indices tab
-        indice_equivalents = {}
-        new_pos = []
-        new_pos_idx = 0
-        for i in indices:
-            if i[0] not in indice_equivalents.keys():
-                indice_equivalents[i[0]] = new_pos_idx
-                new_pos.append(pos[i[0]])
-                new_pos_idx += 1
+        # Manage only vertices that are in indices tab, in the order of their first use
+        used, first_use, inverse = np.unique(indices[:, 0], return_index=True, return_inverse=True)
+        order = np.argsort(first_use)
+        new_pos_idx = np.empty(len(used), dtype=np.int64)
+        new_pos_idx[order] = np.arange(len(used))
 
-        prim_verts = [loc_gltf_to_blender(vert) for vert in new_pos]
+        # glTF index of each Blender vertex of the primitive
+        pyprimitive.vertex_indices = used[order]
+        prim_verts = loc_gltf_to_blender(pos[pyprimitive.vertex_indices])
 
         pyprimitive.vertices_length = len(prim_verts)
-        verts.extend(prim_verts)
-        prim_faces = []
-        for i in range(0, len(indices), 3):
-            vals = indices[i:i + 3]
-            new_vals = []
-            for y in vals:
-                new_vals.append(indice_equivalents[y[0]] + current_length)
-            prim_faces.append(tuple(new_vals))
-        faces.extend(prim_faces)
+        verts.append(prim_verts)
+        nb_triangles = len(indices) // 3
+        prim_faces = new_pos_idx[inverse.reshape(-1)[:3 * nb_triangles]].reshape(nb_triangles, 3) + current_length
+        faces.append(prim_faces)
         pyprimitive.faces_length = len(prim_faces)
 
         # manage material of primitive
@@ -82,62 +73,33 @@ class BlenderPrimitive():
                 if vertex_color not in gltf.data.materials[pyprimitive.material].blender_material.keys():
                     BlenderMaterial.create(gltf, pyprimitive.material, vertex_color)
 
+        return verts, faces
 
-        return verts, edges, faces
-
-    def set_normals(gltf, pyprimitive, mesh, offset, custom_normals):
-        """Set Normal."""
+    @staticmethod
+    def get_valid_indices(gltf, indices, nb_vertices):
+        """Indices of the triangles whose vertices all exist, the other triangles are dropped."""
+        nb_triangles = len(indices) // 3
+        triangles = indices[:3 * nb_triangles].reshape(nb_triangles, 3)
+        valid = np.all(triangles < nb_vertices, axis=1)
+        if valid.all():
+            return indices
+
+        gltf.log.warning("Dropping " + str(nb_triangles - np.count_nonzero(valid)) + " triangles with invalid indices")
+        return triangles[valid].reshape(-1, 1)
+
+    def set_normals(gltf, pyprimitive, mesh, offset, normals, has_normals):
+        """Set Normal of the primitive vertices in the mesh normals array."""
         if 'NORMAL' in pyprimitive.attributes.keys():
-            original_normal_data = BinaryData.get_data_from_accessor(gltf, pyprimitive.attributes['NORMAL'])
-
-            tmp_indices = {}
-            tmp_idx = 0
-            normal_data = []
-            for i in pyprimitive.tmp_indices:
-                if i[0] not in tmp_indices.keys():
-                    tmp_indices[i[0]] = tmp_idx
-                    tmp_idx += 1
-                    normal_data.append(original_normal_data[i[0]])
-
-            for poly in mesh.polygons:
-                if gltf.import_settings['import_shading'] == "NORMALS":
-                    calc_norm_vertices = []
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = mesh.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + pyprimitive.vertices_length):
-                            cpt_vert = vert_idx - offset
-                            mesh.vertices[vert_idx].normal = normal_data[cpt_vert]
-                            custom_normals[vert_idx] = list(normal_data[cpt_vert])
-                            calc_norm_vertices.append(vert_idx)
-
-                        if len(calc_norm_vertices) == 3:
-                            # Calcul normal
-                            vert0 = mesh.vertices[calc_norm_vertices[0]].co
-                            vert1 = mesh.vertices[calc_norm_vertices[1]].co
-                            vert2 = mesh.vertices[calc_norm_vertices[2]].co
-                            calc_normal = (vert1 - vert0).cross(vert2 - vert0).normalized()
-
-                            # Compare normal to vertex normal
-                            for i in calc_norm_vertices:
-                                cpt_vert = vert_idx - offset
-                                vec = Vector(
-                                    (normal_data[cpt_vert][0], normal_data[cpt_vert][1], normal_data[cpt_vert][2])
-                                )
-                                if not calc_normal.dot(vec) > 0.9999999:
-                                    poly.use_smooth = True
-                                    break
-                elif gltf.import_settings['import_shading'] == "FLAT":
-                    poly.use_smooth = False
-                elif gltf.import_settings['import_shading'] == "SMOOTH":
-                    poly.use_smooth = True
-                else:
-                    pass  # Should not happend
+            original_normal_data = BinaryData.get_array_from_accessor(gltf, pyprimitive.attributes['NORMAL'])
+
+            normals[offset:offset + pyprimitive.vertices_length] = original_normal_data[pyprimitive.vertex_indices]
+            has_normals[offset:offset + pyprimitive.vertices_length] = True
 
         offset = offset + pyprimitive.vertices_length
         return offset
 
-    def set_UV(gltf, pyprimitive, obj, mesh, offset):
-        """Set UV Map."""
+    def set_UV(gltf, pyprimitive, obj, mesh, offset, uvs):
+        """Set UV Map, and the UV of the primitive vertices in the uvs arrays of each map."""
         for texcoord in [attr for attr in pyprimitive.attributes.keys() if attr[:9] == "TEXCOORD_"]:
             if bpy.app.version < (2, 80, 0):
                 if texcoord not in mesh.uv_textures:
@@ -148,24 +110,18 @@ class BlenderPrimitive():
                     mesh.uv_layers.new(name=texcoord)
                 pyprimitive.blender_texcoord[int(texcoord[9:])] = texcoord
 
-            original_texcoord_data = BinaryData.get_data_from_accessor(gltf, pyprimitive.attributes[texcoord])
-
-
-            tmp_indices = {}
-            tmp_idx = 0
-            texcoord_data = []
-            for i in pyprimitive.tmp_indices:
-                if i[0] not in tmp_indices.keys():
-                    tmp_indices[i[0]] = tmp_idx
-                    tmp_idx += 1
-                    texcoord_data.append(original_texcoord_data[i[0]])
+            original_texcoord_data = BinaryData.get_array_from_accessor(gltf, pyprimitive.attributes[texcoord])
 
-            for poly in mesh.polygons:
-                for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                    vert_idx = mesh.loops[loop_idx].vertex_index
-                    if vert_idx in range(offset, offset + pyprimitive.vertices_length):
-                        obj.data.uv_layers[texcoord].data[loop_idx].uv = \
-                            Vector((texcoord_data[vert_idx - offset][0], 1 - texcoord_data[vert_idx - offset][1]))
+            if texcoord not in uvs.keys():
+                uvs[texcoord] = (
+                    np.zeros((len(mesh.vertices), 2), dtype=np.float32),
+                    np.zeros(len(mesh.vertices), dtype=bool)
+                )
+            uv, has_uv = uvs[texcoord]
+            texcoord_data = original_texcoord_data[pyprimitive.vertex_indices]
+            uv[offset:offset + pyprimitive.vertices_length, 0] = texcoord_data[:, 0]
+            uv[offset:offset + pyprimitive.vertices_length, 1] = 1 - texcoord_data[:, 1]
+            has_uv[offset:offset + pyprimitive.vertices_length] = True
 
         offset = offset + pyprimitive.vertices_length
         return offset
@@ -200,8 +156,8 @@ class BlenderPrimitive():
                         [gltf.TEXTURE, gltf.TEXTURE_FACTOR]:
                     BlenderMaterial.set_uvmap(gltf, pyprimitive.material, pyprimitive, obj, vertex_color)
 
-    def assign_material(gltf, pyprimitive, obj, bm, offset, cpt_index_mat):
-        """Assign material to faces of primitives."""
+    def assign_material(gltf, pyprimitive, obj, offset, cpt_index_mat, material_indices):
+        """Assign material to primitives, setting its index for the primitive vertices in material_indices."""
         if pyprimitive.material is not None:
 
             vertex_color = None
@@ -209,11 +165,7 @@ class BlenderPrimitive():
                 vertex_color = 'COLOR_0'
 
             obj.data.materials.append(bpy.data.materials[gltf.data.materials[pyprimitive.material].blender_material[vertex_color]])
-            for vert in bm.verts:
-                if vert.index in range(offset, offset + pyprimitive.vertices_length):
-                    for loop in vert.link_loops:
-                        face = loop.face.index
-                        bm.faces[face].material_index = cpt_index_mat
+            material_indices[offset:offset + pyprimitive.vertices_length] = cpt_index_mat
             cpt_index_mat += 1
         offset = offset + pyprimitive.vertices_length
         return offset, cpt_index_mat
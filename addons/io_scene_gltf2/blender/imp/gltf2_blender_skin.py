@@ -14,6 +14,7 @@
 
 
 import bpy
+import numpy as np
 from mathutils import Vector, Matrix
 from ..com.gltf2_blender_conversion import matrix_gltf_to_blender, scale_to_matrix
 from ...io.imp.gltf2_io_binary import BinaryData
@@ -60,11 +61,11 @@ class BlenderSkin():
         if node_id in pyskin.joints:
             index_in_skel = pyskin.joints.index(node_id)
             if pyskin.inverse_bind_matrices is not None:
-                inverse_bind_matrices = BinaryData.get_data_from_accessor(gltf, pyskin.inverse_bind_matrices)
+                inverse_bind_matrices = BinaryData.get_array_from_accessor(gltf, pyskin.inverse_bind_matrices)
                 # Needed to keep scale in matrix, as bone.matrix seems to drop it
                 if index_in_skel < len(inverse_bind_matrices):
                     pynode.blender_bone_matrix = matrix_gltf_to_blender(
-                        inverse_bind_matrices[index_in_skel]
+                        inverse_bind_matrices[index_in_skel].tolist()
                     ).inverted()
                     bone.matrix = pynode.blender_bone_matrix
                 else:
@@ -176,60 +177,72 @@ class BlenderSkin():
             node = gltf.data.nodes[node_id]
             obj = bpy.data.objects[node.blender_object]
 
+            # Only vertices used by faces get weights
+            loop_vertices = np.empty(len(obj.data.loops), dtype=np.int32)
+            obj.data.loops.foreach_get('vertex_index', loop_vertices)
+            used = np.zeros(len(obj.data.vertices), dtype=bool)
+            used[loop_vertices] = True
+
+            vertices = []
+            joints = []
+            weights = []
             offset = 0
             for prim in gltf.data.meshes[node.mesh].primitives:
-                idx_already_done = {}
-
                 if 'JOINTS_0' in prim.attributes.keys() and 'WEIGHTS_0' in prim.attributes.keys():
-                    original_joint_ = BinaryData.get_data_from_accessor(gltf, prim.attributes['JOINTS_0'])
-                    original_weight_ = BinaryData.get_data_from_accessor(gltf, prim.attributes['WEIGHTS_0'])
-
-                    tmp_indices = {}
-                    tmp_idx = 0
-                    weight_ = []
-                    for i in prim.tmp_indices:
-                        if i[0] not in tmp_indices.keys():
-                            tmp_indices[i[0]] = tmp_idx
-                            tmp_idx += 1
-                            weight_.append(original_weight_[i[0]])
-
-                    tmp_indices = {}
-                    tmp_idx = 0
-                    joint_ = []
-                    for i in prim.tmp_indices:
-                        if i[0] not in tmp_indices.keys():
-                            tmp_indices[i[0]] = tmp_idx
-                            tmp_idx += 1
-                            joint_.append(original_joint_[i[0]])
-
-
-                    for poly in obj.data.polygons:
-                        for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                            vert_idx = obj.data.loops[loop_idx].vertex_index
-
-                            if vert_idx in idx_already_done.keys():
-                                continue
-                            idx_already_done[vert_idx] = True
-
-                            if vert_idx in range(offset, offset + prim.vertices_length):
-
-                                tab_index = vert_idx - offset
-                                cpt = 0
-                                for joint_idx in joint_[tab_index]:
-                                    weight_val = weight_[tab_index][cpt]
-                                    if weight_val != 0.0:   # It can be a problem to assign weights of 0
-                                                            # for bone index 0, if there is always 4 indices in joint_
-                                                            # tuple
-                                        group = obj.vertex_groups[gltf.data.nodes[
-                                            pyskin.joints[joint_idx]
-                                        ].blender_bone_name]
-                                        group.add([vert_idx], weight_val, 'REPLACE')
-                                    cpt += 1
+                    prim_vertices = offset + np.arange(prim.vertices_length)
+                    set_idx = 0
+                    while 'JOINTS_%d' % set_idx in prim.attributes.keys() and \
+                            'WEIGHTS_%d' % set_idx in prim.attributes.keys():
+                        joint_ = BinaryData.get_array_from_accessor(gltf, prim.attributes['JOINTS_%d' % set_idx])
+                        weight_ = BinaryData.get_array_from_accessor(gltf, prim.attributes['WEIGHTS_%d' % set_idx])
+                        joint_ = joint_[prim.vertex_indices]
+                        weight_ = weight_[prim.vertex_indices]
+
+                        vertices.append(np.repeat(prim_vertices, joint_.shape[1]))
+                        joints.append(joint_.reshape(-1).astype(np.int64))
+                        weights.append(weight_.reshape(-1))
+                        set_idx += 1
                 else:
                     gltf.log.error("No Skinning ?????")  # TODO
 
                 offset = offset + prim.vertices_length
 
+            if not vertices:
+                continue
+
+            vertices = np.concatenate(vertices)
+            joints = np.concatenate(joints)
+            weights = np.concatenate(weights)
+
+            # It can be a problem to assign weights of 0 for bone index 0, if there is always 4 indices in joint_ tuple
+            keep = (weights != 0.0) & used[vertices]
+            vertices = vertices[keep]
+            joints = joints[keep]
+            weights = weights[keep]
+            if len(vertices) == 0:
+                continue
+
+            # A joint used twice by a vertex gets its last weight
+            pairs = vertices * (joints.max() + 1) + joints
+            last = len(pairs) - 1 - np.unique(pairs[::-1], return_index=True)[1]
+            vertices = vertices[last]
+            joints = joints[last]
+            weights = weights[last]
+
+            # One call per joint and weight, for all the vertices having this weight
+            order = np.lexsort((vertices, weights, joints))
+            vertices = vertices[order]
+            joints = joints[order]
+            weights = weights[order]
+            starts = np.flatnonzero(np.concatenate((
+                [True], (joints[1:] != joints[:-1]) | (weights[1:] != weights[:-1])
+            )))
+            ends = np.append(starts[1:], len(vertices))
+
+            for start, end in zip(starts, ends):
+                group = obj.vertex_groups[gltf.data.nodes[pyskin.joints[joints[start]]].blender_bone_name]
+                group.add(vertices[start:end].tolist(), float(weights[start]), 'REPLACE')
+
     @staticmethod
     def create_armature_modifiers(gltf, skin_id):
         """Create Armature modifier."""
@@ -16,7 +16,8 @@
 # command used:
 # quicktype --src glTF.schema.json --src-lang schema -t gltf --lang python --python-version 3.5
 
-# TODO: add __slots__ to all classes by extending the generator
+# Schema properties are stored in __slots__. '__dict__' is kept as a slot because the importer
+# attaches its own data to objects (blender_object, blender_material...); it is only allocated when used.
 
 # TODO: REMOVE traceback import
 import sys
@@ -94,6 +95,8 @@ class AccessorSparseIndices:
     Indices of those attributes that deviate from their initialization value.
     """
 
+    __slots__ = ('buffer_view', 'byte_offset', 'component_type', 'extensions', 'extras', '__dict__')
+
     def __init__(self, buffer_view, byte_offset, component_type, extensions, extras):
         self.buffer_view = buffer_view
         self.byte_offset = byte_offset
@@ -132,6 +135,8 @@ class AccessorSparseValues:
     accessor attributes pointed by `accessor.sparse.indices`.
     """
 
+    __slots__ = ('buffer_view', 'byte_offset', 'extensions', 'extras', '__dict__')
+
     def __init__(self, buffer_view, byte_offset, extensions, extras):
         self.buffer_view = buffer_view
         self.byte_offset = byte_offset
@@ -161,6 +166,8 @@ class AccessorSparseValues:
 class AccessorSparse:
     """Sparse storage of attributes that deviate from their initialization value."""
 
+    __slots__ = ('count', 'extensions', 'extras', 'indices', 'values', '__dict__')
+
     def __init__(self, count, extensions, extras, indices, values):
         self.count = count
         self.extensions = extensions
@@ -196,6 +203,9 @@ class Accessor:
     WebGL's `vertexAttribPointer()` defines an attribute in a buffer.
     """
 
+    __slots__ = ('buffer_view', 'byte_offset', 'component_type', 'count', 'extensions', 'extras', 'max', 'min',
+                 'name', 'normalized', 'sparse', 'type', '__dict__')
+
     def __init__(self, buffer_view, byte_offset, component_type, count, extensions, extras, max, min, name, normalized,
                  sparse, type):
         self.buffer_view = buffer_view
@@ -254,6 +264,8 @@ class AnimationChannelTarget:
     The index of the node and TRS property that an animation channel targets.
     """
 
+    __slots__ = ('extensions', 'extras', 'node', 'path', '__dict__')
+
     def __init__(self, extensions, extras, node, path):
         self.extensions = extensions
         self.extras = extras
@@ -283,6 +295,8 @@ class AnimationChannelTarget:
 class AnimationChannel:
     """Targets an animation's sampler at a node's property."""
 
+    __slots__ = ('extensions', 'extras', 'sampler', 'target', '__dict__')
+
     def __init__(self, extensions, extras, sampler, target):
         self.extensions = extensions
         self.extras = extras
@@ -314,6 +328,8 @@ class AnimationSampler:
     graph (but not its target).
     """
 
+    __slots__ = ('extensions', 'extras', 'input', 'interpolation', 'output', '__dict__')
+
     def __init__(self, extensions, extras, input, interpolation, output):
         self.extensions = extensions
         self.extras = extras
@@ -346,6 +362,8 @@ class AnimationSampler:
 class Animation:
     """A keyframe animation."""
 
+    __slots__ = ('channels', 'extensions', 'extras', 'name', 'samplers', '__dict__')
+
     def __init__(self, channels, extensions, extras, name, samplers):
         self.channels = channels
         self.extensions = extensions
@@ -378,6 +396,8 @@ class Animation:
 class Asset:
     """Metadata about the glTF asset."""
 
+    __slots__ = ('copyright', 'extensions', 'extras', 'generator', 'min_version', 'version', '__dict__')
+
     def __init__(self, copyright, extensions, extras, generator, min_version, version):
         self.copyright = copyright
         self.extensions = extensions
@@ -413,6 +433,9 @@ class Asset:
 class BufferView:
     """A view into a buffer generally representing a subset of the buffer."""
 
+    __slots__ = ('buffer', 'byte_length', 'byte_offset', 'byte_stride', 'extensions', 'extras', 'name', 'target',
+                 '__dict__')
+
     def __init__(self, buffer, byte_length, byte_offset, byte_stride, extensions, extras, name, target):
         self.buffer = buffer
         self.byte_length = byte_length
@@ -454,6 +477,8 @@ class BufferView:
 class Buffer:
     """A buffer points to binary geometry, animation, or skins."""
 
+    __slots__ = ('byte_length', 'extensions', 'extras', 'name', 'uri', '__dict__')
+
     def __init__(self, byte_length, extensions, extras, name, uri):
         self.byte_length = byte_length
         self.extensions = extensions
@@ -486,6 +511,8 @@ class Buffer:
 class CameraOrthographic:
     """An orthographic camera containing properties to create an orthographic projection matrix."""
 
+    __slots__ = ('extensions', 'extras', 'xmag', 'ymag', 'zfar', 'znear', '__dict__')
+
     def __init__(self, extensions, extras, xmag, ymag, zfar, znear):
         self.extensions = extensions
         self.extras = extras
@@ -521,6 +548,8 @@ class CameraOrthographic:
 class CameraPerspective:
     """A perspective camera containing properties to create a perspective projection matrix."""
 
+    __slots__ = ('aspect_ratio', 'extensions', 'extras', 'yfov', 'zfar', 'znear', '__dict__')
+
     def __init__(self, aspect_ratio, extensions, extras, yfov, zfar, znear):
         self.aspect_ratio = aspect_ratio
         self.extensions = extensions
@@ -558,6 +587,8 @@ class Camera:
     camera in the scene.
     """
 
+    __slots__ = ('extensions', 'extras', 'name', 'orthographic', 'perspective', 'type', '__dict__')
+
     def __init__(self, extensions, extras, name, orthographic, perspective, type):
         self.extensions = extensions
         self.extras = extras
@@ -595,6 +626,8 @@ class Image:
     index. `mimeType` is required in the latter case.
     """
 
+    __slots__ = ('buffer_view', 'extensions', 'extras', 'mime_type', 'name', 'uri', '__dict__')
+
     def __init__(self, buffer_view, extensions, extras, mime_type, name, uri):
         self.buffer_view = buffer_view
         self.extensions = extensions
@@ -637,6 +670,8 @@ class TextureInfo:
     Reference to a texture.
     """
 
+    __slots__ = ('extensions', 'extras', 'index', 'tex_coord', '__dict__')
+
     def __init__(self, extensions, extras, index, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -669,6 +704,8 @@ class MaterialNormalTextureInfoClass:
     Reference to a texture.
     """
 
+    __slots__ = ('extensions', 'extras', 'index', 'scale', 'tex_coord', '__dict__')
+
     def __init__(self, extensions, extras, index, scale, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -704,6 +741,8 @@ class MaterialOcclusionTextureInfoClass:
     Reference to a texture.
     """
 
+    __slots__ = ('extensions', 'extras', 'index', 'strength', 'tex_coord', '__dict__')
+
     def __init__(self, extensions, extras, index, strength, tex_coord):
         self.extensions = extensions
         self.extras = extras
@@ -742,6 +781,9 @@ class MaterialPBRMetallicRoughness:
     from Physically-Based Rendering (PBR) methodology.
     """
 
+    __slots__ = ('base_color_factor', 'base_color_texture', 'extensions', 'extras', 'metallic_factor',
+                 'metallic_roughness_texture', 'roughness_factor', '__dict__')
+
     def __init__(self, base_color_factor, base_color_texture, extensions, extras, metallic_factor,
                  metallic_roughness_texture, roughness_factor):
         self.base_color_factor = base_color_factor
@@ -784,6 +826,9 @@ class MaterialPBRMetallicRoughness:
 class Material:
     """The material appearance of a primitive."""
 
+    __slots__ = ('alpha_cutoff', 'alpha_mode', 'double_sided', 'emissive_factor', 'emissive_texture', 'extensions',
+                 'extras', 'name', 'normal_texture', 'occlusion_texture', 'pbr_metallic_roughness', '__dict__')
+
     def __init__(self, alpha_cutoff, alpha_mode, double_sided, emissive_factor, emissive_texture, extensions, extras,
                  name, normal_texture, occlusion_texture, pbr_metallic_roughness):
         self.alpha_cutoff = alpha_cutoff
@@ -841,6 +886,8 @@ class Material:
 class MeshPrimitive:
     """Geometry to be rendered with the given material."""
 
+    __slots__ = ('attributes', 'extensions', 'extras', 'indices', 'material', 'mode', 'targets', '__dict__')
+
     def __init__(self, attributes, extensions, extras, indices, material, mode, targets):
         self.attributes = attributes
         self.extensions = extensions
@@ -882,6 +929,8 @@ class Mesh:
     places the mesh in the scene.
     """
 
+    __slots__ = ('extensions', 'extras', 'name', 'primitives', 'weights', '__dict__')
+
     def __init__(self, extensions, extras, name, primitives, weights):
         self.extensions = extensions
         self.extras = extras
@@ -922,6 +971,9 @@ class Node:
     may be present; `matrix` will not be present.
     """
 
+    __slots__ = ('camera', 'children', 'extensions', 'extras', 'matrix', 'mesh', 'name', 'rotation', 'scale', 'skin',
+                 'translation', 'weights', '__dict__')
+
     def __init__(self, camera, children, extensions, extras, matrix, mesh, name, rotation, scale, skin, translation,
                  weights):
         self.camera = camera
@@ -977,6 +1029,8 @@ class Node:
 class Sampler:
     """Texture sampler properties for filtering and wrapping modes."""
 
+    __slots__ = ('extensions', 'extras', 'mag_filter', 'min_filter', 'name', 'wrap_s', 'wrap_t', '__dict__')
+
     def __init__(self, extensions, extras, mag_filter, min_filter, name, wrap_s, wrap_t):
         self.extensions = extensions
         self.extras = extras
@@ -1015,6 +1069,8 @@ class Sampler:
 class Scene:
     """The root nodes of a scene."""
 
+    __slots__ = ('extensions', 'extras', 'name', 'nodes', '__dict__')
+
     def __init__(self, extensions, extras, name, nodes):
         self.extensions = extensions
         self.extras = extras
@@ -1044,6 +1100,8 @@ class Scene:
 class Skin:
     """Joints and matrices defining a skin."""
 
+    __slots__ = ('extensions', 'extras', 'inverse_bind_matrices', 'joints', 'name', 'skeleton', '__dict__')
+
     def __init__(self, extensions, extras, inverse_bind_matrices, joints, name, skeleton):
         self.extensions = extensions
         self.extras = extras
@@ -1079,6 +1137,8 @@ class Skin:
 class Texture:
     """A texture and its sampler."""
 
+    __slots__ = ('extensions', 'extras', 'name', 'sampler', 'source', '__dict__')
+
     def __init__(self, extensions, extras, name, sampler, source):
         self.extensions = extensions
         self.extras = extras
@@ -1111,6 +1171,10 @@ class Texture:
 class Gltf:
     """The root object for a glTF asset."""
 
+    __slots__ = ('accessors', 'animations', 'asset', 'buffers', 'buffer_views', 'cameras', 'extensions',
+                 'extensions_required', 'extensions_used', 'extras', 'images', 'materials', 'meshes', 'nodes',
+                 'samplers', 'scene', 'scenes', 'skins', 'textures', '__dict__')
+
     def __init__(self, accessors, animations, asset, buffers, buffer_views, cameras, extensions, extensions_required,
                  extensions_used, extras, images, materials, meshes, nodes, samplers, scene, scenes, skins, textures):
         self.accessors = accessors
@@ -1191,8 +1255,379 @@ class Gltf:
         return result
 
 
-def gltf_from_dict(s):
-    return Gltf.from_dict(s)
+# Fast decoder
+#
+# Property decoders dispatch on the type of the JSON value instead of trying each alternative of from_union.
+# Without strict mode, values are trusted and only converted (int to float, dict to class); in strict mode,
+# types and required properties are checked, and a ValueError giving the path of the wrong property is raised.
+
+def decode_error(path, e):
+    """Prefix error message of a nested property with its path."""
+    message = e.args[0]
+    return ValueError(path + (message if message[:1] in '.[' else ": " + message))
+
+
+def decode_any(x, strict):
+    return x
+
+
+def decode_int(x, strict):
+    if strict and (type(x) is not int):
+        raise ValueError("integer expected")
+    return x
+
+
+def decode_float(x, strict):
+    if type(x) is float:
+        return x
+    if type(x) is int:
+        return float(x)
+    if strict:
+        raise ValueError("number expected")
+    return x
+
+
+def decode_str(x, strict):
+    if strict and type(x) is not str:
+        raise ValueError("string expected")
+    return x
+
+
+def decode_bool(x, strict):
+    if strict and type(x) is not bool:
+        raise ValueError("boolean expected")
+    return x
+
+
+def decode_list(decode_item):
+    def decode(x, strict):
+        if type(x) is not list:
+            if strict:
+                raise ValueError("array expected")
+            return x
+        result = []
+        for i, item in enumerate(x):
+            try:
+                result.append(decode_item(item, strict))
+            except ValueError as e:
+                raise decode_error("[{}]".format(i), e) from None
+        return result
+    decode.item = decode_item
+    return decode
+
+
+def decode_float_list(x, strict):
+    if type(x) is not list:
+        if strict:
+            raise ValueError("array expected")
+        return x
+    if strict:
+        return [decode_float(v, strict) for v in x]
+    return [float(v) for v in x]
+
+
+def decode_dict(decode_item):
+    def decode(x, strict):
+        if type(x) is not dict:
+            if strict:
+                raise ValueError("object expected")
+            return x
+        if not strict and decode_item is decode_any:
+            return x
+        result = {}
+        for k, v in x.items():
+            try:
+                result[k] = decode_item(v, strict)
+            except ValueError as e:
+                raise decode_error("." + k, e) from None
+        return result
+    decode.value = decode_item
+    return decode
+
+
+def decode_class(cls):
+    def decode(x, strict):
+        if type(x) is not dict:
+            if strict:
+                raise ValueError("object expected")
+            return x
+        args = []
+        for key, decode_property, required in SCHEMA[cls]:
+            value = x.get(key)
+            if value is None:
+                if strict and required:
+                    raise ValueError(".{}: required property missing".format(key))
+                args.append(None)
+                continue
+            try:
+                args.append(decode_property(value, strict))
+            except ValueError as e:
+                raise decode_error("." + key, e) from None
+        return cls(*args)
+    decode.cls = cls
+    return decode
+
+
+decode_extensions = decode_dict(decode_dict(decode_any))
+decode_int_list = decode_list(decode_int)
+decode_str_list = decode_list(decode_str)
+decode_attributes = decode_dict(decode_int)
+
+# (JSON property, decoder, required), in constructor argument order
+SCHEMA = {
+    AccessorSparseIndices: (
+        ("bufferView", decode_int, True),
+        ("byteOffset", decode_int, False),
+        ("componentType", decode_int, True),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+    ),
+    AccessorSparseValues: (
+        ("bufferView", decode_int, True),
+        ("byteOffset", decode_int, False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+    ),
+    AccessorSparse: (
+        ("count", decode_int, True),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("indices", decode_class(AccessorSparseIndices), True),
+        ("values", decode_class(AccessorSparseValues), True),
+    ),
+    Accessor: (
+        ("bufferView", decode_int, False),
+        ("byteOffset", decode_int, False),
+        ("componentType", decode_int, True),
+        ("count", decode_int, True),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("max", decode_float_list, False),
+        ("min", decode_float_list, False),
+        ("name", decode_str, False),
+        ("normalized", decode_bool, False),
+        ("sparse", decode_class(AccessorSparse), False),
+        ("type", decode_str, True),
+    ),
+    AnimationChannelTarget: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("node", decode_int, False),
+        ("path", decode_str, True),
+    ),
+    AnimationChannel: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("sampler", decode_int, True),
+        ("target", decode_class(AnimationChannelTarget), True),
+    ),
+    AnimationSampler: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("input", decode_int, True),
+        ("interpolation", decode_str, False),
+        ("output", decode_int, True),
+    ),
+    Animation: (
+        ("channels", decode_list(decode_class(AnimationChannel)), True),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("samplers", decode_list(decode_class(AnimationSampler)), True),
+    ),
+    Asset: (
+        ("copyright", decode_str, False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("generator", decode_str, False),
+        ("minVersion", decode_str, False),
+        ("version", decode_str, True),
+    ),
+    BufferView: (
+        ("buffer", decode_int, True),
+        ("byteLength", decode_int, True),
+        ("byteOffset", decode_int, False),
+        ("byteStride", decode_int, False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("target", decode_int, False),
+    ),
+    Buffer: (
+        ("byteLength", decode_int, True),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("uri", decode_str, False),
+    ),
+    CameraOrthographic: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("xmag", decode_float, True),
+        ("ymag", decode_float, True),
+        ("zfar", decode_float, True),
+        ("znear", decode_float, True),
+    ),
+    CameraPerspective: (
+        ("aspectRatio", decode_float, False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("yfov", decode_float, True),
+        ("zfar", decode_float, False),
+        ("znear", decode_float, True),
+    ),
+    Camera: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("orthographic", decode_class(CameraOrthographic), False),
+        ("perspective", decode_class(CameraPerspective), False),
+        ("type", decode_str, True),
+    ),
+    Image: (
+        ("bufferView", decode_int, False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("mimeType", decode_str, False),
+        ("name", decode_str, False),
+        ("uri", decode_str, False),
+    ),
+    TextureInfo: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("index", decode_int, True),
+        ("texCoord", decode_int, False),
+    ),
+    MaterialNormalTextureInfoClass: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("index", decode_int, True),
+        ("scale", decode_float, False),
+        ("texCoord", decode_int, False),
+    ),
+    MaterialOcclusionTextureInfoClass: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("index", decode_int, True),
+        ("strength", decode_float, False),
+        ("texCoord", decode_int, False),
+    ),
+    MaterialPBRMetallicRoughness: (
+        ("baseColorFactor", decode_float_list, False),
+        ("baseColorTexture", decode_class(TextureInfo), False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("metallicFactor", decode_float, False),
+        ("metallicRoughnessTexture", decode_class(TextureInfo), False),
+        ("roughnessFactor", decode_float, False),
+    ),
+    Material: (
+        ("alphaCutoff", decode_float, False),
+        ("alphaMode", decode_str, False),
+        ("doubleSided", decode_bool, False),
+        ("emissiveFactor", decode_float_list, False),
+        ("emissiveTexture", decode_class(TextureInfo), False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("normalTexture", decode_class(MaterialNormalTextureInfoClass), False),
+        ("occlusionTexture", decode_class(MaterialOcclusionTextureInfoClass), False),
+        ("pbrMetallicRoughness", decode_class(MaterialPBRMetallicRoughness), False),
+    ),
+    MeshPrimitive: (
+        ("attributes", decode_attributes, True),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("indices", decode_int, False),
+        ("material", decode_int, False),
+        ("mode", decode_int, False),
+        ("targets", decode_list(decode_attributes), False),
+    ),
+    Mesh: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("primitives", decode_list(decode_class(MeshPrimitive)), True),
+        ("weights", decode_float_list, False),
+    ),
+    Node: (
+        ("camera", decode_int, False),
+        ("children", decode_int_list, False),
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("matrix", decode_float_list, False),
+        ("mesh", decode_int, False),
+        ("name", decode_str, False),
+        ("rotation", decode_float_list, False),
+        ("scale", decode_float_list, False),
+        ("skin", decode_int, False),
+        ("translation", decode_float_list, False),
+        ("weights", decode_float_list, False),
+    ),
+    Sampler: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("magFilter", decode_int, False),
+        ("minFilter", decode_int, False),
+        ("name", decode_str, False),
+        ("wrapS", decode_int, False),
+        ("wrapT", decode_int, False),
+    ),
+    Scene: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("nodes", decode_int_list, False),
+    ),
+    Skin: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("inverseBindMatrices", decode_int, False),
+        ("joints", decode_int_list, True),
+        ("name", decode_str, False),
+        ("skeleton", decode_int, False),
+    ),
+    Texture: (
+        ("extensions", decode_extensions, False),
+        ("extras", decode_any, False),
+        ("name", decode_str, False),
+        ("sampler", decode_int, False),
+        ("source", decode_int, True),
+    ),
+    Gltf: (
+        ("accessors", decode_list(decode_class(Accessor)), False),
+        ("animations", decode_list(decode_class(Animation)), False),
+        ("asset", decode_class(Asset), True),
+        ("buffers", decode_list(decode_class(Buffer)), False),
+        ("bufferViews", decode_list(decode_class(BufferView)), False),
+        ("cameras", decode_list(decode_class(Camera)), False),
+        ("extensions", decode_extensions, False),
+        ("extensionsRequired", decode_str_list, False),
+        ("extensionsUsed", decode_str_list, False),
+        ("extras", decode_any, False),
+        ("images", decode_list(decode_class(Image)), False),
+        ("materials", decode_list(decode_class(Material)), False),
+        ("meshes", decode_list(decode_class(Mesh)), False),
+        ("nodes", decode_list(decode_class(Node)), False),
+        ("samplers", decode_list(decode_class(Sampler)), False),
+        ("scene", decode_int, False),
+        ("scenes", decode_list(decode_class(Scene)), False),
+        ("skins", decode_list(decode_class(Skin)), False),
+        ("textures", decode_list(decode_class(Texture)), False),
+    ),
+}
+
+decode_gltf = decode_class(Gltf)
+
+
+def gltf_from_dict(s, strict=False):
+    """Build object model from JSON dict. In strict mode, a ValueError is raised on invalid properties."""
+    if type(s) is not dict:
+        raise ValueError("Invalid glTF: object expected")
+    try:
+        return decode_gltf(s, strict)
+    except ValueError as e:
+        raise ValueError("Invalid glTF: " + e.args[0].lstrip('.')) from None
 
 
 def gltf_to_dict(x):
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 
 def color_srgb_to_scene_linear(c):
     """
@@ -24,6 +26,16 @@ def color_srgb_to_scene_linear(c):
     else:
         return pow((c + 0.055) * (1.0 / 1.055), 2.4)
 
+
+def color_srgb_to_scene_linear_array(c):
+    """Convert a numpy array of sRGB values to scene linear color space."""
+    c = np.asarray(c, dtype=np.float64)
+    return np.where(
+        c < 0.04045,
+        np.where(c < 0.0, 0.0, c * (1.0 / 12.92)),
+        np.power((np.maximum(c, 0.04045) + 0.055) * (1.0 / 1.055), 2.4)
+    )
+
 def color_linear_to_srgb(c):
     """
     Convert from linear to sRGB color space.
@@ -34,3 +46,13 @@ def color_linear_to_srgb(c):
         return 0.0 if c < 0.0 else c * 12.92
     else:
         return 1.055 * pow(c, 1.0 / 2.4) - 0.055
+
+
+def color_linear_to_srgb_array(c):
+    """Convert a numpy array of linear values to sRGB color space."""
+    c = np.asarray(c, dtype=np.float64)
+    return np.where(
+        c < 0.0031308,
+        np.where(c < 0.0, 0.0, c * 12.92),
+        1.055 * np.power(np.maximum(c, 0.0031308), 1.0 / 2.4) - 0.055
+    )
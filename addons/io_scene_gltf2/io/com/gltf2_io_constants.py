@@ -57,6 +57,11 @@ class ComponentType(IntEnum):
         }[component_type]
 
 
+class BufferViewTarget(IntEnum):
+    ARRAY_BUFFER = 34962
+    ELEMENT_ARRAY_BUFFER = 34963
+
+
 class DataType:
     Scalar = "SCALAR"
     Vec2 = "VEC2"
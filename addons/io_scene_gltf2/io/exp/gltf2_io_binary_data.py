@@ -14,27 +14,50 @@
 
 import typing
 import array
+import hashlib
+import numpy as np
 from io_scene_gltf2.io.com import gltf2_io_constants
 
 
 class BinaryData:
     """Store for gltf binary data that can later be stored in a buffer."""
 
-    def __init__(self, data: bytes):
+    def __init__(self, data: bytes, buffer_view_target: typing.Optional[gltf2_io_constants.BufferViewTarget] = None,
+                 byte_stride: typing.Optional[int] = None):
         if not isinstance(data, bytes):
             raise TypeError("Data is not a bytes array")
         self.data = data
+        # Usage of the data: vertex attributes, indices, or None for anything else
+        self.buffer_view_target = buffer_view_target
+        # Size of one element of vertex attributes, required when their buffer view is shared
+        self.byte_stride = byte_stride
+        # Fingerprint of the data, to compare and share identical payloads without reading them again
+        self.digest = hashlib.sha256(data).digest()
 
     def __eq__(self, other):
-        return self.data == other.data
+        return isinstance(other, BinaryData) and self.digest == other.digest \
+            and self.buffer_view_target == other.buffer_view_target and self.byte_stride == other.byte_stride
 
     def __hash__(self):
-        return hash(self.data)
+        return hash((self.digest, self.buffer_view_target, self.byte_stride))
 
     @classmethod
-    def from_list(cls, lst: typing.List[typing.Any], gltf_component_type: gltf2_io_constants.ComponentType):
+    def from_list(cls, lst: typing.List[typing.Any], gltf_component_type: gltf2_io_constants.ComponentType,
+                  buffer_view_target: typing.Optional[gltf2_io_constants.BufferViewTarget] = None,
+                  gltf_data_type: typing.Optional[str] = None):
+        """
+        Binary data of a list of components.
+
+        :param gltf_data_type: type of the elements, only needed for vertex attributes
+        """
         format_char = gltf2_io_constants.ComponentType.to_type_code(gltf_component_type)
-        return BinaryData(array.array(format_char, lst).tobytes())
+        byte_stride = None
+        if buffer_view_target == gltf2_io_constants.BufferViewTarget.ARRAY_BUFFER:
+            byte_stride = gltf2_io_constants.DataType.num_elements(gltf_data_type) * \
+                gltf2_io_constants.ComponentType.get_size(gltf_component_type)
+        if isinstance(lst, np.ndarray):
+            return BinaryData(lst.astype(format_char, copy=False).tobytes(), buffer_view_target, byte_stride)
+        return BinaryData(array.array(format_char, lst).tobytes(), buffer_view_target, byte_stride)
 
     @property
     def byte_length(self):
@@ -19,42 +19,77 @@ from io_scene_gltf2.io.exp import gltf2_io_binary_data
 
 
 class Buffer:
-    """Class representing binary data for use in a glTF file as 'buffer' property."""
+    """Class representing binary data for use in a glTF file as 'buffer' property.
+
+    Data is kept as a list of chunks, and only joined when the whole buffer is requested.
+    Chunks are held in memory until the end of the export, writers avoid making a joined copy of them.
+    Identical data is only stored once: its buffer view is shared, between data of the same usage only,
+    as a buffer view cannot hold both indices and vertex attributes.
+    Vertex attributes only share views with the same element size, which is written as the stride of the view.
+    """
 
     def __init__(self, buffer_index=0):
-        self.__data = b""
+        self.__chunks = []
+        self.__byte_length = 0
         self.__buffer_index = buffer_index
+        self.__views = {}
+        self.__bytes_saved = 0
 
     def add_and_get_view(self, binary_data: gltf2_io_binary_data.BinaryData) -> gltf2_io.BufferView:
         """Add binary data to the buffer. Return a glTF BufferView."""
-        offset = len(self.__data)
-        self.__data += binary_data.data
+        key = (binary_data.digest, binary_data.buffer_view_target, binary_data.byte_stride)
+        buffer_view = self.__views.get(key)
+        if buffer_view is not None:
+            self.__bytes_saved += binary_data.byte_length
+            return buffer_view
+
+        offset = self.__byte_length
+        self.__chunks.append(binary_data.data)
 
         # offsets should be a multiple of 4 --> therefore add padding if necessary
         padding = (4 - (binary_data.byte_length % 4)) % 4
-        self.__data += b"\x00" * padding
+        if padding > 0:
+            self.__chunks.append(b"\x00" * padding)
+        self.__byte_length += binary_data.byte_length + padding
 
         buffer_view = gltf2_io.BufferView(
             buffer=self.__buffer_index,
             byte_length=binary_data.byte_length,
             byte_offset=offset,
-            byte_stride=None,
+            byte_stride=binary_data.byte_stride,
             extensions=None,
             extras=None,
             name=None,
-            target=None
+            target=binary_data.buffer_view_target
         )
+        self.__views[key] = buffer_view
         return buffer_view
 
     @property
     def byte_length(self):
-        return len(self.__data)
+        return self.__byte_length
+
+    @property
+    def bytes_saved(self):
+        """Length of the data that was not stored, because it was already in the buffer."""
+        return self.__bytes_saved
 
     def to_bytes(self):
-        return self.__data
+        data = b"".join(self.__chunks)
+        # Keep the joined data, so it is not joined again
+        self.__chunks = [data] if data else []
+        return data
+
+    def write(self, file):
+        """Write the buffer to a binary file object, without joining it in memory."""
+        for chunk in self.__chunks:
+            file.write(chunk)
 
     def to_embed_string(self):
-        return 'data:application/octet-stream;base64,' + base64.b64encode(self.__data).decode('ascii')
+        return 'data:application/octet-stream;base64,' + base64.b64encode(self.to_bytes()).decode('ascii')
 
     def clear(self):
-        self.__data = b""
+        self.__chunks = []
+        self.__byte_length = 0
+        self.__views = {}
+        self.__bytes_saved = 0
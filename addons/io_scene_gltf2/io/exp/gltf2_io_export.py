@@ -16,9 +16,10 @@
 # Imports
 #
 
-import json
 import struct
 
+from io_scene_gltf2.io.exp.gltf2_io_json import JSONWriter
+
 #
 # Globals
 #
@@ -26,7 +27,6 @@ import struct
 #
 # Functions
 #
-from collections import OrderedDict
 
 
 def save_gltf(gltf, export_settings, encoder, glb_buffer):
@@ -59,15 +59,16 @@ def save_gltf(gltf, export_settings, encoder, glb_buffer):
         "samplers",
         "buffers"
     ]
-    gltf_ordered = OrderedDict(sorted(gltf.items(), key=lambda item: sort_order.index(item[0])))
-    gltf_encoded = json.dumps(gltf_ordered, indent=indent, separators=separators, cls=encoder, allow_nan=False)
+    writer = JSONWriter(indent=indent, separators=separators, validate=export_settings['gltf_validate'],
+                        default=encoder().default)
+    gltf_data = writer.encode(gltf, key_order=sort_order)
 
     #
 
     if export_settings['gltf_format'] != 'GLB':
-        file = open(export_settings['gltf_filepath'], "w", encoding="utf8", newline="\n")
-        file.write(gltf_encoded)
-        file.write("\n")
+        file = open(export_settings['gltf_filepath'], "wb")
+        file.write(gltf_data)
+        file.write(b"\n")
         file.close()
 
         binary = export_settings['gltf_binary']
@@ -77,43 +78,45 @@ def save_gltf(gltf, export_settings, encoder, glb_buffer):
             file.close()
 
     else:
-        file = open(export_settings['gltf_filepath'], "wb")
-
-        gltf_data = gltf_encoded.encode()
-        binary = glb_buffer
-
-        length_gltf = len(gltf_data)
-        spaces_gltf = (4 - (length_gltf & 3)) & 3
-        length_gltf += spaces_gltf
-
-        length_bin = len(binary)
-        zeros_bin = (4 - (length_bin & 3)) & 3
-        length_bin += zeros_bin
-
-        length = 12 + 8 + length_gltf
-        if length_bin > 0:
-            length += 8 + length_bin
+        with open(export_settings['gltf_filepath'], "wb") as file:
+            write_glb(file, gltf_data, glb_buffer)
 
-        # Header (Version 2)
-        file.write('glTF'.encode())
-        file.write(struct.pack("I", 2))
-        file.write(struct.pack("I", length))
-
-        # Chunk 0 (JSON)
-        file.write(struct.pack("I", length_gltf))
-        file.write('JSON'.encode())
-        file.write(gltf_data)
-        for i in range(0, spaces_gltf):
-            file.write(' '.encode())
-
-        # Chunk 1 (BIN)
-        if length_bin > 0:
-            file.write(struct.pack("I", length_bin))
-            file.write('BIN\0'.encode())
-            file.write(binary)
-            for i in range(0, zeros_bin):
-                file.write('\0'.encode())
+    return True
 
-        file.close()
 
-    return True
+def write_glb(file, gltf_data, glb_buffer=None):
+    """
+    Write a GLB file, made of the JSON chunk gltf_data and of glb_buffer as binary chunk.
+
+    Chunk lengths are known from the buffer length, so the buffer data is written as it is,
+    without being joined in memory. The buffer still holds all its data while writing.
+    """
+    length_gltf = len(gltf_data)
+    spaces_gltf = (4 - (length_gltf & 3)) & 3
+    length_gltf += spaces_gltf
+
+    length_bin = glb_buffer.byte_length if glb_buffer is not None else 0
+    zeros_bin = (4 - (length_bin & 3)) & 3
+    length_bin += zeros_bin
+
+    length = 12 + 8 + length_gltf
+    if length_bin > 0:
+        length += 8 + length_bin
+
+    # Header (Version 2)
+    file.write(b'glTF')
+    file.write(struct.pack("I", 2))
+    file.write(struct.pack("I", length))
+
+    # Chunk 0 (JSON)
+    file.write(struct.pack("I", length_gltf))
+    file.write(b'JSON')
+    file.write(gltf_data)
+    file.write(b' ' * spaces_gltf)
+
+    # Chunk 1 (BIN)
+    if length_bin > 0:
+        file.write(struct.pack("I", length_bin))
+        file.write(b'BIN\0')
+        glb_buffer.write(file)
+        file.write(b'\0' * zeros_bin)
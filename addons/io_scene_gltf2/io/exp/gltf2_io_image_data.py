@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
 import re
 
 
@@ -23,12 +24,13 @@ class ImageData:
         self._data = data
         self._mime_type = mime_type
         self._name = name
+        self._digest = hashlib.sha256(data).digest()
 
     def __eq__(self, other):
-        return self._data == other.data
+        return isinstance(other, ImageData) and self._digest == other.digest
 
     def __hash__(self):
-        return hash(self._data)
+        return hash(self._digest)
 
     def adjusted_name(self):
         regex_dot = re.compile("\.")
@@ -40,6 +42,10 @@ class ImageData:
     def data(self):
         return self._data
 
+    @property
+    def digest(self):
+        return self._digest
+
     @property
     def name(self):
         return self._name
@@ -0,0 +1,273 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from collections import namedtuple
+
+from io_scene_gltf2.io.com import gltf2_io
+from io_scene_gltf2.io.com.gltf2_io import (SCHEMA, decode_any, decode_bool, decode_error, decode_float,
+                                           decode_float_list, decode_int, decode_str)
+
+#
+# Globals
+#
+
+# Empty objects that are still written, because their presence has a meaning
+ALLOWED_EMPTY_COLLECTIONS = ("KHR_materials_unlit",)
+
+# C implementation of the json module, when available
+encode_string = json.encoder.encode_basestring_ascii
+
+Field = namedtuple('Field', ('attribute', 'key', 'encoded_key', 'check', 'required'))
+
+
+#
+# Functions
+#
+
+def check_int(x):
+    if not isinstance(x, int) or isinstance(x, bool):
+        raise ValueError("integer expected")
+
+
+def check_number(x):
+    if not isinstance(x, (int, float)) or isinstance(x, bool):
+        raise ValueError("number expected")
+
+
+def check_str(x):
+    if not isinstance(x, str):
+        raise ValueError("string expected")
+
+
+def check_bool(x):
+    if not isinstance(x, bool):
+        raise ValueError("boolean expected")
+
+
+def check_instance(cls):
+    def check(x):
+        if not isinstance(x, cls):
+            raise ValueError("{} expected".format(cls.__name__))
+    return check
+
+
+def check_list(check_item):
+    def check(x):
+        if not isinstance(x, list):
+            raise ValueError("array expected")
+        if check_item is not None:
+            for i, item in enumerate(x):
+                try:
+                    check_item(item)
+                except ValueError as e:
+                    raise decode_error("[{}]".format(i), e) from None
+    return check
+
+
+def check_dict(check_value):
+    def check(x):
+        if not isinstance(x, dict):
+            raise ValueError("object expected")
+        if check_value is not None:
+            for k, v in x.items():
+                try:
+                    check_value(v)
+                except ValueError as e:
+                    raise decode_error("." + str(k), e) from None
+    return check
+
+
+SCALAR_CHECKS = {
+    decode_any: None,
+    decode_int: check_int,
+    decode_float: check_number,
+    decode_str: check_str,
+    decode_bool: check_bool,
+    decode_float_list: check_list(check_number)
+}
+
+
+def check_property(decode_property):
+    """Validation function of a property, built from its decoder. Nested objects are checked when written."""
+    if decode_property in SCALAR_CHECKS:
+        return SCALAR_CHECKS[decode_property]
+    if hasattr(decode_property, 'cls'):
+        return check_instance(decode_property.cls)
+    if hasattr(decode_property, 'item'):
+        return check_list(check_property(decode_property.item))
+    return check_dict(check_property(decode_property.value))
+
+
+def compile_fields(cls):
+    """Properties of an object model class, in the order of the generated to_dict."""
+    attributes = [slot for slot in cls.__slots__ if slot != '__dict__']
+    return tuple(
+        Field(attribute, key, encode_string(key), check_property(decode_property), required)
+        for attribute, (key, decode_property, required) in zip(attributes, SCHEMA[cls])
+    )
+
+
+FIELDS = {cls: compile_fields(cls) for cls in SCHEMA}
+
+
+class JSONWriter:
+    """Single pass serializer of the glTF object model.
+
+    Produces the same output as json.dumps on the cleaned up result of Gltf.to_dict: None values
+    and empty collections are skipped, and floats holding an integer are written as integers.
+    With validate, property types are checked (a ValueError giving the property path is raised),
+    otherwise values are written as they are.
+    """
+
+    def __init__(self, indent=None, separators=(',', ':'), validate=True, default=None):
+        if isinstance(indent, int):
+            indent = ' ' * indent
+        self.__indent = indent
+        self.__item_separator, self.__key_separator = separators
+        self.__validate = validate
+        self.__default = default
+        self.__newlines = []
+        self.__chunks = []
+
+    def encode(self, gltf: gltf2_io.Gltf, key_order=None) -> bytes:
+        """Serialize a glTF. Top level properties are written in key_order, if given."""
+        fields = FIELDS[gltf2_io.Gltf]
+        if key_order is not None:
+            fields = sorted(fields, key=lambda field: key_order.index(field.key))
+
+        self.__chunks = []
+        try:
+            self.__write_object(gltf, fields, 0)
+        except ValueError as e:
+            raise ValueError("Invalid glTF: " + e.args[0].lstrip('.')) from None
+        data = ''.join(self.__chunks).encode()
+        self.__chunks = []
+        return data
+
+    def __separators(self, level):
+        """Separators before the first item, between items, and before the closing bracket."""
+        if self.__indent is None:
+            return '', self.__item_separator, ''
+        while len(self.__newlines) <= level + 1:
+            self.__newlines.append('\n' + self.__indent * len(self.__newlines))
+        return self.__newlines[level + 1], self.__item_separator + self.__newlines[level + 1], self.__newlines[level]
+
+    def __write_value(self, x, level):
+        write = self.__chunks.append
+        # Exact types first, they are by far the most common
+        t = type(x)
+        if t is int:
+            write(int.__repr__(x))
+        elif t is float:
+            write(self.__encode_float(x))
+        elif t is str:
+            write(encode_string(x))
+        elif t is list:
+            self.__write_list(x, level)
+        elif t in FIELDS:
+            self.__write_object(x, FIELDS[t], level)
+        elif x is None:
+            write('null')
+        elif x is True:
+            write('true')
+        elif x is False:
+            write('false')
+        elif isinstance(x, str):
+            write(encode_string(x))
+        elif isinstance(x, int):
+            write(int.__repr__(x))
+        elif isinstance(x, float):
+            write(self.__encode_float(x))
+        elif isinstance(x, dict):
+            self.__write_dict(x, level)
+        elif isinstance(x, (list, tuple)):
+            self.__write_list(x, level)
+        elif self.__default is not None:
+            self.__write_value(self.__default(x), level)
+        else:
+            raise TypeError("Object of type {} is not JSON serializable".format(x.__class__.__name__))
+
+    @staticmethod
+    def __encode_float(x):
+        # Prevent INTEGER_WRITTEN_AS_FLOAT validator warnings
+        if x.is_integer():
+            return int.__repr__(int(x))
+        if x != x or x in (float('inf'), float('-inf')):
+            raise ValueError("Out of range float values are not JSON compliant: " + repr(x))
+        return float.__repr__(x)
+
+    def __write_object(self, obj, fields, level):
+        write = self.__chunks.append
+        validate = self.__validate
+        key_separator = self.__key_separator
+        first, separator, last = self.__separators(level)
+        written = False
+        for attribute, key, encoded_key, check, required in fields:
+            value = getattr(obj, attribute)
+            if value is None:
+                if validate and required:
+                    raise ValueError(".{}: required property missing".format(key))
+                continue
+            if validate and check is not None:
+                try:
+                    check(value)
+                except ValueError as e:
+                    raise decode_error("." + key, e) from None
+            if not value and isinstance(value, (dict, list)) and key not in ALLOWED_EMPTY_COLLECTIONS:
+                continue
+
+            write((separator if written else '{' + first) + encoded_key + key_separator)
+            try:
+                self.__write_value(value, level + 1)
+            except ValueError as e:
+                raise decode_error("." + key, e) from None
+            written = True
+        write(last + '}' if written else '{}')
+
+    def __write_dict(self, d, level):
+        write = self.__chunks.append
+        first, separator, last = self.__separators(level)
+        written = False
+        for key, value in d.items():
+            if value is None:
+                continue
+            if isinstance(value, (dict, list)) and not value and key not in ALLOWED_EMPTY_COLLECTIONS:
+                continue
+            if not isinstance(key, str):
+                key = json.dumps(key)
+
+            write((separator if written else '{' + first) + encode_string(key) + self.__key_separator)
+            try:
+                self.__write_value(value, level + 1)
+            except ValueError as e:
+                raise decode_error("." + key, e) from None
+            written = True
+        write(last + '}' if written else '{}')
+
+    def __write_list(self, values, level):
+        if not values:
+            self.__chunks.append('[]')
+            return
+        write = self.__chunks.append
+        first, separator, last = self.__separators(level)
+        write('[' + first)
+        for i, value in enumerate(values):
+            if i:
+                write(separator)
+            try:
+                self.__write_value(value, level + 1)
+            except ValueError as e:
+                raise decode_error("[{}]".format(i), e) from None
+        write(last + ']')
@@ -12,10 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import struct
 import base64
 from os.path import dirname, join, isfile, basename
 
+import numpy as np
+
+MATRIX_SIZE = {
+    'MAT2': 2,
+    'MAT3': 3,
+    'MAT4': 4
+}
+
+NORMALIZATION_DIVISOR = {
+    5120: 127.0,  # Byte
+    5121: 255.0,  # Unsigned Byte
+    5122: 32767.0,  # Short
+    5123: 65535.0  # Unsigned Short
+}
+
 
 class BinaryData():
     """Binary reader."""
@@ -45,34 +59,66 @@ class BinaryData():
         return buffer[accessor_offset + bufferview_offset:accessor_offset + bufferview_offset + bufferView.byte_length]
 
     @staticmethod
-    def get_data_from_accessor(gltf, accessor_idx):
-        """Get data from accessor."""
-        accessor = gltf.data.accessors[accessor_idx]
+    def get_buffer(gltf, buffer_idx):
+        """Get buffer, loading it (or waiting for its prefetch) if needed."""
+        if buffer_idx not in gltf.buffers.keys():
+            gltf.load_buffer(buffer_idx)
+        return gltf.buffers[buffer_idx]
 
-        bufferView = gltf.data.buffer_views[accessor.buffer_view]  # TODO initialize with 0 when not present!
-        buffer_data = BinaryData.get_binary_from_accessor(gltf, accessor_idx)
+    @staticmethod
+    def get_array_from_accessor(gltf, accessor_idx):
+        """Get data from accessor, as a numpy array of shape (count, component_nb).
+
+        Decoded arrays are cached (read-only) until the last known user of the accessor has read them.
+        """
+        if accessor_idx in gltf.accessor_cache.keys():
+            gltf.accessor_cache_hits += 1
+            data = gltf.accessor_cache[accessor_idx]
+        else:
+            gltf.accessor_cache_misses += 1
+            data = BinaryData.decode_accessor(gltf, accessor_idx)
+            data.flags.writeable = False
+            gltf.accessor_cache[accessor_idx] = data
 
-        fmt_char = gltf.fmt_char_dict[accessor.component_type]
+        # Evict once all known users have read this accessor
+        users = gltf.accessor_users.get(accessor_idx, 0) - 1
+        gltf.accessor_users[accessor_idx] = users
+        if users <= 0:
+            del gltf.accessor_cache[accessor_idx]
+
+        return data
+
+    @staticmethod
+    def decode_accessor(gltf, accessor_idx):
+        """Decode accessor, as a numpy array of shape (count, component_nb)."""
+        accessor = gltf.data.accessors[accessor_idx]
+
+        dtype = np.dtype('<' + gltf.fmt_char_dict[accessor.component_type])
         component_nb = gltf.component_nb_dict[accessor.type]
-        fmt = '<' + (fmt_char * component_nb)
-        stride_ = struct.calcsize(fmt)
-        # TODO data alignment stuff
 
-        if bufferView.byte_stride:
-            stride = bufferView.byte_stride
-        else:
-            stride = stride_
+        if accessor.buffer_view is not None:
+            bufferView = gltf.data.buffer_views[accessor.buffer_view]
+            buffer = BinaryData.get_buffer(gltf, bufferView.buffer)
 
-        data = []
-        offset = 0
-        while len(data) < accessor.count:
-            element = struct.unpack_from(fmt, buffer_data, offset)
-            data.append(element)
-            offset += stride
+            accessor_offset = accessor.byte_offset if accessor.byte_offset is not None else 0
+            bufferview_offset = bufferView.byte_offset if bufferView.byte_offset is not None else 0
+
+            data = BinaryData.decode_array(
+                buffer,
+                bufferview_offset + accessor_offset,
+                accessor.count,
+                accessor.type,
+                component_nb,
+                dtype,
+                bufferView.byte_stride
+            )
+        else:
+            # No bufferView: accessor is initialized with zeros (and probably sparse)
+            data = np.zeros((accessor.count, component_nb), dtype=dtype)
 
         if accessor.sparse:
-            sparse_indices_data = BinaryData.get_data_from_sparse(gltf, accessor.sparse, "indices")
-            sparse_values_values = BinaryData.get_data_from_sparse(
+            sparse_indices = BinaryData.get_array_from_sparse(gltf, accessor.sparse, "indices")
+            sparse_values = BinaryData.get_array_from_sparse(
                 gltf,
                 accessor.sparse,
                 "values",
@@ -81,68 +127,93 @@ class BinaryData():
             )
 
             # apply sparse
-            for cpt_idx, idx in enumerate(sparse_indices_data):
-                data[idx[0]] = sparse_values_values[cpt_idx]
+            data[sparse_indices[:, 0]] = sparse_values
 
         # Normalization
         if accessor.normalized:
-            for idx, tuple in enumerate(data):
-                new_tuple = ()
-                for i in tuple:
-                    if accessor.component_type == 5120:
-                        new_tuple += (max(float(i / 127.0 ), -1.0),)
-                    elif accessor.component_type == 5121:
-                        new_tuple += (float(i / 255.0),)
-                    elif accessor.component_type == 5122:
-                        new_tuple += (max(float(i / 32767.0), -1.0),)
-                    elif accessor.component_type == 5123:
-                        new_tuple += (i / 65535.0,)
-                    else:
-                        new_tuple += (float(i),)
-                data[idx] = new_tuple
+            data = BinaryData.normalize_array(data, accessor.component_type)
 
         return data
 
     @staticmethod
-    def get_data_from_sparse(gltf, sparse, type_, type_val=None, comp_type=None):
-        """Get data from sparse."""
+    def get_data_from_accessor(gltf, accessor_idx):
+        """Get data from accessor, as a list of tuples.
+
+        Legacy adapter on top of get_array_from_accessor, kept for callers not yet using arrays.
+        """
+        return [tuple(element) for element in BinaryData.get_array_from_accessor(gltf, accessor_idx).tolist()]
+
+    @staticmethod
+    def decode_array(buffer, offset, count, type_, component_nb, dtype, byte_stride=None):
+        """Decode count elements of type_ from buffer, honoring byte stride and matrix column alignment."""
+        if count == 0:
+            return np.zeros((0, component_nb), dtype=dtype)
+
+        # Matrix columns start on 4-byte boundaries (only matters for MAT2/MAT3 with 1 or 2 byte components)
+        if type_ in MATRIX_SIZE:
+            size = MATRIX_SIZE[type_]
+            column_stride = (size * dtype.itemsize + 3) // 4 * 4
+            element_size = column_stride * size
+            shape = (count, size, size)
+            strides = (byte_stride or element_size, column_stride, dtype.itemsize)
+        else:
+            element_size = component_nb * dtype.itemsize
+            shape = (count, component_nb)
+            strides = (byte_stride or element_size, dtype.itemsize)
+
+        # Strided view over the buffer: no data is read until the copy below
+        view = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset, strides=strides)
+
+        return view.copy().reshape(count, component_nb)
+
+    @staticmethod
+    def normalize_array(data, component_type):
+        """Convert normalized integer data to float."""
+        if component_type == 5126:
+            return data
+
+        data = data.astype(np.float32)
+        if component_type in NORMALIZATION_DIVISOR:
+            data /= NORMALIZATION_DIVISOR[component_type]
+            if component_type in (5120, 5122):
+                np.maximum(data, -1.0, out=data)
+        return data
+
+    @staticmethod
+    def get_array_from_sparse(gltf, sparse, type_, type_val=None, comp_type=None):
+        """Get data from sparse, as a numpy array of shape (count, component_nb)."""
         if type_ == "indices":
             bufferView = gltf.data.buffer_views[sparse.indices.buffer_view]
             offset = sparse.indices.byte_offset
-            component_nb = gltf.component_nb_dict['SCALAR']
-            fmt_char = gltf.fmt_char_dict[sparse.indices.component_type]
+            type_val = 'SCALAR'
+            comp_type = sparse.indices.component_type
         elif type_ == "values":
             bufferView = gltf.data.buffer_views[sparse.values.buffer_view]
             offset = sparse.values.byte_offset
-            component_nb = gltf.component_nb_dict[type_val]
-            fmt_char = gltf.fmt_char_dict[comp_type]
 
-        if bufferView.buffer in gltf.buffers.keys():
-            buffer = gltf.buffers[bufferView.buffer]
-        else:
-            # load buffer
-            gltf.load_buffer(bufferView.buffer)
-            buffer = gltf.buffers[bufferView.buffer]
+        buffer = BinaryData.get_buffer(gltf, bufferView.buffer)
 
-        bin_data = buffer[bufferView.byte_offset + offset:bufferView.byte_offset + offset + bufferView.byte_length]
+        bufferview_offset = bufferView.byte_offset if bufferView.byte_offset is not None else 0
+        if offset is None:
+            offset = 0
 
-        fmt = '<' + (fmt_char * component_nb)
-        stride_ = struct.calcsize(fmt)
-        # TODO data alignment stuff ?
+        return BinaryData.decode_array(
+            buffer,
+            bufferview_offset + offset,
+            sparse.count,
+            type_val,
+            gltf.component_nb_dict[type_val],
+            np.dtype('<' + gltf.fmt_char_dict[comp_type]),
+            bufferView.byte_stride
+        )
 
-        if bufferView.byte_stride:
-            stride = bufferView.byte_stride
-        else:
-            stride = stride_
-
-        data = []
-        offset = 0
-        while len(data) < sparse.count:
-            element = struct.unpack_from(fmt, bin_data, offset)
-            data.append(element)
-            offset += stride
-
-        return data
+    @staticmethod
+    def get_data_from_sparse(gltf, sparse, type_, type_val=None, comp_type=None):
+        """Get data from sparse, as a list of tuples."""
+        return [
+            tuple(element)
+            for element in BinaryData.get_array_from_sparse(gltf, sparse, type_, type_val, comp_type).tolist()
+        ]
 
     @staticmethod
     def get_image_data(gltf, img_idx):
@@ -152,31 +223,17 @@ class BinaryData():
         image_name = "Image_" + str(img_idx)
 
         if pyimage.uri:
-            sep = ';base64,'
-            if pyimage.uri[:5] == 'data:':
-                idx = pyimage.uri.find(sep)
-                if idx != -1:
-                    data = pyimage.uri[idx + len(sep):]
-                    return base64.b64decode(data), image_name
-
-            if isfile(join(dirname(gltf.filename), pyimage.uri)):
-                with open(join(dirname(gltf.filename), pyimage.uri), 'rb') as f_:
-                    return f_.read(), basename(join(dirname(gltf.filename), pyimage.uri))
-            else:
-                gltf.log.error("Missing file (index " + str(img_idx) + "): " + pyimage.uri)
-                return None, None
+            if img_idx in gltf.image_futures.keys():
+                # Image was prefetched in background
+                return gltf.image_futures.pop(img_idx).result()
+
+            return BinaryData.load_image_uri(gltf, img_idx)
 
         if pyimage.buffer_view is None:
             return None, None
 
         bufferView = gltf.data.buffer_views[pyimage.buffer_view]
-
-        if bufferView.buffer in gltf.buffers.keys():
-            buffer = gltf.buffers[bufferView.buffer]
-        else:
-            # load buffer
-            gltf.load_buffer(bufferView.buffer)
-            buffer = gltf.buffers[bufferView.buffer]
+        buffer = BinaryData.get_buffer(gltf, bufferView.buffer)
 
         bufferview_offset = bufferView.byte_offset
 
@@ -184,3 +241,24 @@ class BinaryData():
             bufferview_offset = 0
 
         return buffer[bufferview_offset:bufferview_offset + bufferView.byte_length], image_name
+
+    @staticmethod
+    def load_image_uri(gltf, img_idx):
+        """Read data from image uri (data uri or external file)."""
+        pyimage = gltf.data.images[img_idx]
+
+        image_name = "Image_" + str(img_idx)
+
+        sep = ';base64,'
+        if pyimage.uri[:5] == 'data:':
+            idx = pyimage.uri.find(sep)
+            if idx != -1:
+                data = pyimage.uri[idx + len(sep):]
+                return base64.b64decode(data), image_name
+
+        if isfile(join(dirname(gltf.filename), pyimage.uri)):
+            with open(join(dirname(gltf.filename), pyimage.uri), 'rb') as f_:
+                return f_.read(), basename(join(dirname(gltf.filename), pyimage.uri))
+        else:
+            gltf.log.error("Missing file (index " + str(img_idx) + "): " + pyimage.uri)
+            return None, None
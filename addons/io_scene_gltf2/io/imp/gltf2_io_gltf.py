@@ -14,12 +14,18 @@
 
 from ..com.gltf2_io import gltf_from_dict
 from ..com.gltf2_io_debug import Log
+from .gltf2_io_binary import BinaryData
+from concurrent.futures import ThreadPoolExecutor
+import gc
 import logging
 import json
+import mmap
 import struct
 import base64
 from os.path import dirname, join, getsize, isfile
 
+PREFETCH_MAX_WORKERS = 8
+
 
 class glTFImporter():
     """glTF Importer class."""
@@ -29,10 +35,33 @@ class glTFImporter():
         self.filename = filename
         self.import_settings = import_settings
         self.buffers = {}
+        self.mapped_files = []
+
+        # Buffers and images being read in background, see prefetch()
+        self.buffer_futures = {}
+        self.image_futures = {}
+
+        # Decoded accessors, and remaining number of reads before eviction
+        self.accessor_cache = {}
+        self.accessor_users = {}
+        self.accessor_cache_hits = 0
+        self.accessor_cache_misses = 0
 
         if 'loglevel' not in self.import_settings.keys():
             self.import_settings['loglevel'] = logging.ERROR
 
+        if 'import_memory_map' not in self.import_settings.keys():
+            self.import_settings['import_memory_map'] = False
+
+        if 'import_prefetch' not in self.import_settings.keys():
+            self.import_settings['import_prefetch'] = False
+
+        if 'import_strict' not in self.import_settings.keys():
+            self.import_settings['import_strict'] = False
+
+        if 'import_validate_mesh' not in self.import_settings.keys():
+            self.import_settings['import_validate_mesh'] = True
+
         log = Log(import_settings['loglevel'])
         self.log = log.logger
         self.log_handler = log.hdlr
@@ -117,8 +146,8 @@ class glTFImporter():
         if len_ != len(str_json):
             return False, "Length of json part doesn't match"
         try:
-            json_ = json.loads(str_json.decode('utf-8'), parse_constant=glTFImporter.bad_json_value)
-            self.data = gltf_from_dict(json_)
+            json_ = json.loads(bytes(str_json).decode('utf-8'), parse_constant=glTFImporter.bad_json_value)
+            self.data = gltf_from_dict(json_, self.import_settings['import_strict'])
         except ValueError as e:
             return False, e.args[0]
 
@@ -136,7 +165,7 @@ class glTFImporter():
         return True, None
 
     def load_chunk(self, offset):
-        """Load chunk."""
+        """Load chunk. Chunk data is a view on file content, not a copy."""
         chunk_header = struct.unpack_from('<I4s', self.content, offset)
         data_length = chunk_header[0]
         data_type = chunk_header[1]
@@ -152,26 +181,106 @@ class glTFImporter():
 
         # Check if file is gltf or glb
         with open(self.filename, 'rb') as f:
-            self.content = f.read()
-
-        self.is_glb_format = self.content[:4] == b'glTF'
+            self.is_glb_format = f.read(4) == b'glTF'
 
         # glTF file
         if not self.is_glb_format:
-            self.content = None
             with open(self.filename, 'r') as f:
                 content = f.read()
                 try:
-                    self.data = gltf_from_dict(json.loads(content, parse_constant=glTFImporter.bad_json_value))
-                    return True, None
+                    self.data = gltf_from_dict(
+                        json.loads(content, parse_constant=glTFImporter.bad_json_value),
+                        self.import_settings['import_strict']
+                    )
                 except ValueError as e:
                     return False, e.args[0]
 
         # glb file
         else:
             # Parsing glb file
+            self.content = self.load_file(self.filename)
             success, txt = self.load_glb()
-            return success, txt
+            if not success:
+                return success, txt
+
+        self.compute_accessor_users()
+
+        if self.import_settings['import_prefetch']:
+            self.prefetch()
+
+        return True, None
+
+    def prefetch(self):
+        """Start reading external buffers and images on a thread pool.
+
+        Blender objects creation can start meanwhile: load_buffer and BinaryData.get_image_data
+        only wait for the file they need.
+        """
+        executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS)
+
+        if self.data.buffers is not None:
+            for buffer_idx, buffer in enumerate(self.data.buffers):
+                if buffer_idx in self.buffers.keys() or not buffer.uri:
+                    continue
+                self.buffer_futures[buffer_idx] = executor.submit(self.read_buffer, buffer_idx)
+
+        if self.data.images is not None:
+            for img_idx, img in enumerate(self.data.images):
+                if not img.uri:
+                    continue
+                # Not packed images are directly loaded from their file by Blender
+                if img.uri[:5] != 'data:' and self.import_settings.get('import_pack_images') is False:
+                    continue
+                self.image_futures[img_idx] = executor.submit(BinaryData.load_image_uri, self, img_idx)
+
+        # Does not wait: threads end when all files are read
+        executor.shutdown(wait=False)
+
+    def compute_accessor_users(self):
+        """Count how many times each accessor will be read during creation.
+
+        Counts are computed from the JSON graph. An accessor read more often than
+        expected is just decoded again, one read less often stays cached until the end.
+        """
+        self.accessor_users = {}
+
+        def add_user(accessor_idx, nb=1):
+            if accessor_idx is not None and nb > 0:
+                self.accessor_users[accessor_idx] = self.accessor_users.get(accessor_idx, 0) + nb
+
+        # Skinning data are read once per skinned node
+        skinned_nodes = {}
+        if self.data.nodes is not None:
+            for node in self.data.nodes:
+                if node.mesh is not None and node.skin is not None:
+                    skinned_nodes[node.mesh] = skinned_nodes.get(node.mesh, 0) + 1
+
+        if self.data.meshes is not None:
+            for mesh_idx, mesh in enumerate(self.data.meshes):
+                for prim in mesh.primitives:
+                    add_user(prim.indices)
+                    for attr, accessor_idx in prim.attributes.items():
+                        if attr.startswith('JOINTS_') or attr.startswith('WEIGHTS_'):
+                            add_user(accessor_idx, skinned_nodes.get(mesh_idx, 0))
+                        else:
+                            add_user(accessor_idx)
+                    if prim.targets is not None:
+                        for target in prim.targets:
+                            add_user(target.get('POSITION'))
+
+        # Inverse bind matrices are read once per bone
+        if self.data.skins is not None:
+            for skin in self.data.skins:
+                add_user(skin.inverse_bind_matrices, len(skin.joints))
+
+        # Sampler input / output are read once per channel
+        if self.data.animations is not None:
+            for anim in self.data.animations:
+                for channel in anim.channels:
+                    if channel.target.node is None:
+                        continue
+                    add_user(anim.samplers[channel.sampler].input)
+                    add_user(anim.samplers[channel.sampler].output)
 
     def is_node_joint(self, node_idx):
         """Check if node is a joint."""
@@ -186,6 +295,17 @@ class glTFImporter():
 
     def load_buffer(self, buffer_idx):
         """Load buffer."""
+        if buffer_idx in self.buffer_futures.keys():
+            # Buffer was prefetched in background
+            self.buffers[buffer_idx] = self.buffer_futures.pop(buffer_idx).result()
+            return
+
+        data = self.read_buffer(buffer_idx)
+        if data is not None:
+            self.buffers[buffer_idx] = data
+
+    def read_buffer(self, buffer_idx):
+        """Read buffer data from its uri (data uri or external file)."""
         buffer = self.data.buffers[buffer_idx]
 
         if buffer.uri:
@@ -194,8 +314,43 @@ class glTFImporter():
                 idx = buffer.uri.find(sep)
                 if idx != -1:
                     data = buffer.uri[idx + len(sep):]
-                    self.buffers[buffer_idx] = base64.b64decode(data)
-                    return
+                    return base64.b64decode(data)
+
+            return self.load_file(join(dirname(self.filename), buffer.uri))
+
+        return None
 
-            with open(join(dirname(self.filename), buffer.uri), 'rb') as f_:
-                self.buffers[buffer_idx] = f_.read()
+    def load_file(self, filename):
+        """Read whole binary file, or map it in memory if import_memory_map is set.
+
+        A memoryview is returned in both cases, so that slicing it does not copy data.
+        """
+        with open(filename, 'rb') as f_:
+            if self.import_settings['import_memory_map'] and getsize(filename) > 0:
+                mapped_file = mmap.mmap(f_.fileno(), 0, access=mmap.ACCESS_READ)
+                self.mapped_files.append(mapped_file)
+                return memoryview(mapped_file)
+            return memoryview(f_.read())
+
+    def release_buffers(self):
+        """Release buffers, decoded accessors and memory-mapped files."""
+        for future in list(self.buffer_futures.values()) + list(self.image_futures.values()):
+            future.cancel()
+        self.buffer_futures = {}
+        self.image_futures = {}
+
+        self.content = None
+        self.buffers = {}
+        self.accessor_cache = {}
+
+        if self.mapped_files:
+            # Views on mapped files can still be referenced by reference cycles
+            gc.collect()
+
+        for mapped_file in self.mapped_files:
+            try:
+                mapped_file.close()
+            except BufferError:
+                # Some views are still alive, file will be closed when they are garbage collected
+                pass
+        self.mapped_files = []
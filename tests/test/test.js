@@ -492,6 +492,33 @@ describe('Exporter', function() {
                 assert.equalEpsilon(transform.offset[0], -0.20705524479697487);
                 assert.equalEpsilon(transform.offset[1], 0.2272593289624576);
             });
+
+            it('writes the same binary data in GLB files as in .bin files', function() {
+                // The scene has no image, so the buffer is the same in both formats
+                let gltfPath = path.resolve(outDirPath, '03_skinned_cylinder.gltf');
+                let glbPath = path.resolve(OUT_PREFIX, 'scenes', outDirName + '_glb', '03_skinned_cylinder.glb');
+                const asset = JSON.parse(fs.readFileSync(gltfPath));
+                const bin = fs.readFileSync(path.resolve(outDirPath, asset.buffers[0].uri));
+                const glb = fs.readFileSync(glbPath);
+
+                assert.strictEqual(glb.toString('ascii', 0, 4), 'glTF');
+                assert.strictEqual(glb.readUInt32LE(4), 2);
+                assert.strictEqual(glb.readUInt32LE(8), glb.length);
+
+                const jsonLength = glb.readUInt32LE(12);
+                assert.strictEqual(glb.toString('ascii', 16, 20), 'JSON');
+                assert.strictEqual(jsonLength % 4, 0);
+
+                const binOffset = 20 + jsonLength;
+                const binLength = glb.readUInt32LE(binOffset);
+                assert.strictEqual(glb.toString('ascii', binOffset + 4, binOffset + 8), 'BIN\0');
+                assert.strictEqual(binLength % 4, 0);
+                assert.strictEqual(binOffset + 8 + binLength, glb.length);
+
+                const glbBin = glb.slice(binOffset + 8, binOffset + 8 + binLength);
+                assert(glbBin.slice(0, bin.length).equals(bin));
+                assert(glbBin.slice(bin.length).every(byte => byte === 0));
+            });
         });
     });
 });
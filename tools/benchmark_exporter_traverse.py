@@ -0,0 +1,88 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file times GlTF2Exporter.add_scene, which flattens the exported scene graph into the glTF root arrays,
+# on synthetic scenes with one mesh (and accessors) per node: a flat scene and a single deep hierarchy.
+# Times for a tenth of the nodes are given too, a linear traversal takes about 10 times longer on the full scene.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_exporter_traverse.py -- -n 100000
+
+import argparse
+import struct
+import sys
+import time
+
+from io_scene_gltf2.blender.exp.gltf2_blender_gltf2_exporter import GlTF2Exporter
+from io_scene_gltf2.io.com import gltf2_io
+from io_scene_gltf2.io.exp.gltf2_io_binary_data import BinaryData
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--nodes", type=int, default=100000, help="number of nodes (and meshes)")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+
+def accessor(data, count):
+    return gltf2_io.Accessor(
+        buffer_view=BinaryData(data), byte_offset=None, component_type=5126, count=count, extensions=None,
+        extras=None, max=None, min=None, name=None, normalized=None, sparse=None, type="VEC3")
+
+
+def synthetic_scene(nb_nodes, deep):
+    """One mesh per node, all of them with the same material. Nodes are children of the previous one if deep."""
+    material = gltf2_io.Material(
+        alpha_cutoff=None, alpha_mode=None, double_sided=None, emissive_factor=None, emissive_texture=None,
+        extensions=None, extras=None, name="Material", normal_texture=None, occlusion_texture=None,
+        pbr_metallic_roughness=None)
+    nodes = []
+    for i in range(nb_nodes):
+        primitive = gltf2_io.MeshPrimitive(
+            attributes={"POSITION": accessor(struct.pack("3f", i, 0, 0), 1)}, extensions=None, extras=None,
+            indices=None, material=material, mode=None, targets=None)
+        mesh = gltf2_io.Mesh(extensions=None, extras=None, name="Mesh_" + str(i), primitives=[primitive],
+                             weights=None)
+        node = gltf2_io.Node(
+            camera=None, children=[], extensions=None, extras=None, matrix=None, mesh=mesh, name="Node_" + str(i),
+            rotation=None, scale=None, skin=None, translation=[i, 0, 0], weights=None)
+        if deep and nodes:
+            nodes[-1].children.append(node)
+        nodes.append(node)
+
+    root_nodes = nodes[:1] if deep else nodes
+    return gltf2_io.Scene(extensions=None, extras=None, name="Scene", nodes=root_nodes)
+
+
+def bench(name, nb_nodes, deep):
+    best = None
+    for _ in range(args["repeat"]):
+        scene = synthetic_scene(nb_nodes, deep)
+        exporter = GlTF2Exporter()
+        start = time.perf_counter()
+        exporter.add_scene(scene)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s".format(name, best))
+    return best
+
+
+nb_nodes = args["nodes"]
+print("{} nodes".format(nb_nodes))
+
+for deep in (False, True):
+    hierarchy = "deep" if deep else "flat"
+    small = bench("{} scene, {} nodes".format(hierarchy, nb_nodes // 10), nb_nodes // 10, deep)
+    full = bench("{} scene, {} nodes".format(hierarchy, nb_nodes), nb_nodes, deep)
+    print("{} scene, time ratio for 10x nodes: {:.1f}".format(hierarchy, full / small))
@@ -0,0 +1,95 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file compares the sampling of F-curves during export
+# (FCurveData.evaluate on keyframe points read in bulk, and FCurve.evaluate frame by frame)
+# on an object with keyed location, rotation and scale, and checks that both give the same values.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_fcurve_sampling.py -- -n 1000 -s 0.25
+
+import argparse
+import random
+import sys
+import time
+
+import bpy
+import numpy as np
+
+from io_scene_gltf2.blender.exp import gltf2_blender_gather_animation_sampler_keyframes
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--keyframes", type=int, default=1000, help="number of keyframes per F-curve")
+ap.add_argument("-s", "--step", type=float, default=0.25, help="sampling step, in frames")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+INTERPOLATIONS = ("BEZIER", "LINEAR", "CONSTANT")
+
+
+def keyed_object(nb_keyframes):
+    """Random values on every 4th frame, with all interpolations, and linear extrapolation on some curves."""
+    random.seed(0)
+    blender_object = bpy.data.objects.new("Keyed", None)
+    bpy.context.scene.collection.objects.link(blender_object)
+    for i in range(nb_keyframes):
+        blender_object.location = [random.uniform(-1, 1) for _ in range(3)]
+        blender_object.rotation_euler = [random.uniform(-3, 3) for _ in range(3)]
+        blender_object.scale = [random.uniform(0.5, 2) for _ in range(3)]
+        for data_path in ("location", "rotation_euler", "scale"):
+            blender_object.keyframe_insert(data_path, frame=1 + 4 * i)
+
+    fcurves = list(blender_object.animation_data.action.fcurves)
+    for i, fcurve in enumerate(fcurves):
+        fcurve.extrapolation = "LINEAR" if i % 2 else "CONSTANT"
+        for j, keyframe in enumerate(fcurve.keyframe_points):
+            keyframe.interpolation = INTERPOLATIONS[(i + j) % 3]
+        fcurve.update()
+    return fcurves
+
+
+def frame_by_frame(fcurves, frames):
+    return np.array([[fcurve.evaluate(frame) for frame in frames] for fcurve in fcurves])
+
+
+def vectorized(fcurves, frames):
+    # Keyframe points are read on each run, as during an export
+    return np.array([gltf2_blender_gather_animation_sampler_keyframes.FCurveData(fcurve).evaluate(frames)
+                     for fcurve in fcurves])
+
+
+def bench(name, func, *arguments):
+    best = None
+    for _ in range(args["repeat"]):
+        start = time.perf_counter()
+        result = func(*arguments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s".format(name, best))
+    return best, result
+
+
+fcurves = keyed_object(args["keyframes"])
+start_frame, end_frame = fcurves[0].range()
+# Start and end beyond the keyframes, for the extrapolation
+frames = np.arange(start_frame - 10, end_frame + 10, args["step"]).tolist()
+print("{} F-curves, {} keyframes, {} frames".format(len(fcurves), args["keyframes"], len(frames)))
+
+reference, reference_values = bench("FCurve.evaluate", frame_by_frame, fcurves, frames)
+fast, fast_values = bench("FCurveData.evaluate", vectorized, fcurves, frames)
+
+error = np.abs(reference_values - fast_values).max()
+assert error < 1e-4, "Sampled values differ by {}".format(error)
+print("max difference {:.2e}, speedup: {:.1f}x".format(error, reference / fast))
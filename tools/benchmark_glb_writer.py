@@ -0,0 +1,120 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file compares the GLB writers
+# (write_glb streaming the buffer views, and the former writer of the joined buffer, kept here as reference)
+# on a synthetic buffer made of many views, and checks that both write the same file.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_glb_writer.py -- -n 1000 -s 100000
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from io_scene_gltf2.io.exp import gltf2_io_binary_data, gltf2_io_buffer
+from io_scene_gltf2.io.exp.gltf2_io_export import write_glb
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--views", type=int, default=1000, help="number of buffer views")
+ap.add_argument("-s", "--size", type=int, default=100000, help="maximum size of a buffer view, in bytes")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+
+def synthetic_buffer(nb_views, max_size):
+    """Views of varying sizes, most of them not a multiple of 4."""
+    pattern = bytes(range(256)) * (max_size // 256 + 2)
+    buffer = gltf2_io_buffer.Buffer()
+    for i in range(nb_views):
+        size = max_size - i % 7 - (i * 7919) % (max_size // 2)
+        buffer.add_and_get_view(gltf2_io_binary_data.BinaryData(pattern[i % 256:i % 256 + size]))
+    return buffer
+
+
+def former_writer(file, gltf_data, buffer):
+    binary = buffer.to_bytes()
+
+    length_gltf = len(gltf_data)
+    spaces_gltf = (4 - (length_gltf & 3)) & 3
+    length_gltf += spaces_gltf
+
+    length_bin = len(binary)
+    zeros_bin = (4 - (length_bin & 3)) & 3
+    length_bin += zeros_bin
+
+    length = 12 + 8 + length_gltf
+    if length_bin > 0:
+        length += 8 + length_bin
+
+    file.write('glTF'.encode())
+    file.write(struct.pack("I", 2))
+    file.write(struct.pack("I", length))
+
+    file.write(struct.pack("I", length_gltf))
+    file.write('JSON'.encode())
+    file.write(gltf_data)
+    for i in range(0, spaces_gltf):
+        file.write(' '.encode())
+
+    if length_bin > 0:
+        file.write(struct.pack("I", length_bin))
+        file.write('BIN\0'.encode())
+        file.write(binary)
+        for i in range(0, zeros_bin):
+            file.write('\0'.encode())
+
+
+def bench(name, writer, path, gltf_data):
+    best = None
+    peak = 0
+    for _ in range(args["repeat"]):
+        # New buffer on each run, former_writer keeps the joined data in it
+        buffer = synthetic_buffer(args["views"], args["size"])
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, "wb") as file:
+            writer(file, gltf_data, buffer)
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s {:8.1f} MB peak".format(name, best, peak / 2 ** 20))
+    return best
+
+
+directory = tempfile.mkdtemp()
+reference_path = os.path.join(directory, "reference.glb")
+streamed_path = os.path.join(directory, "streamed.glb")
+# JSON length not a multiple of 4, to check its padding
+gltf_data = b'{"asset":{"version":"2.0"},"buffers":[{"byteLength":0}]}'
+
+buffer_length = synthetic_buffer(args["views"], args["size"]).byte_length
+print("{} views, {:.1f} MB".format(args["views"], buffer_length / 2 ** 20))
+
+reference = bench("former writer", former_writer, reference_path, gltf_data)
+fast = bench("write_glb", write_glb, streamed_path, gltf_data)
+
+with open(reference_path, "rb") as reference_file, open(streamed_path, "rb") as streamed_file:
+    assert reference_file.read() == streamed_file.read(), "GLB files differ"
+print("same files, speedup: {:.1f}x".format(reference / fast))
+
+os.remove(reference_path)
+os.remove(streamed_path)
+os.rmdir(directory)
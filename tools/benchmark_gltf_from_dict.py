@@ -0,0 +1,85 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file compares the JSON to object model decoders
+# (generated Gltf.from_dict, and gltf_from_dict with and without strict mode)
+# on synthetic documents with many nodes and accessors.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_gltf_from_dict.py -- -n 100000
+
+import argparse
+import sys
+import time
+
+from io_scene_gltf2.io.com.gltf2_io import Gltf, gltf_from_dict
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--nodes", type=int, default=100000, help="number of nodes (and meshes)")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+
+def synthetic_document(nb_nodes):
+    """One mesh per node, each mesh with POSITION / NORMAL / TEXCOORD_0 / indices accessors."""
+    accessors = []
+    meshes = []
+    nodes = []
+    for i in range(nb_nodes):
+        first = len(accessors)
+        accessors.append({"bufferView": 0, "componentType": 5126, "count": 24, "type": "VEC3",
+                          "max": [1, 1, 1], "min": [-1, -1, -1]})
+        accessors.append({"bufferView": 1, "componentType": 5126, "count": 24, "type": "VEC3"})
+        accessors.append({"bufferView": 2, "componentType": 5126, "count": 24, "type": "VEC2"})
+        accessors.append({"bufferView": 3, "componentType": 5123, "count": 36, "type": "SCALAR"})
+        meshes.append({"primitives": [{
+            "attributes": {"POSITION": first, "NORMAL": first + 1, "TEXCOORD_0": first + 2},
+            "indices": first + 3,
+            "material": 0
+        }]})
+        nodes.append({"name": "Node_" + str(i), "mesh": i, "translation": [i, 0, 0], "rotation": [0, 0, 0, 1]})
+
+    return {
+        "asset": {"version": "2.0", "generator": "benchmark"},
+        "scene": 0,
+        "scenes": [{"nodes": list(range(nb_nodes))}],
+        "nodes": nodes,
+        "meshes": meshes,
+        "accessors": accessors,
+        "materials": [{"pbrMetallicRoughness": {"baseColorFactor": [1, 1, 1, 1], "metallicFactor": 0}}],
+        "bufferViews": [{"buffer": 0, "byteLength": 288, "byteOffset": 288 * i} for i in range(4)],
+        "buffers": [{"byteLength": 1152}]
+    }
+
+
+def bench(name, func, document):
+    best = None
+    for _ in range(args["repeat"]):
+        start = time.perf_counter()
+        func(document)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s".format(name, best))
+    return best
+
+
+document = synthetic_document(args["nodes"])
+print("{} nodes, {} accessors".format(len(document["nodes"]), len(document["accessors"])))
+
+reference = bench("Gltf.from_dict", Gltf.from_dict, document)
+fast = bench("gltf_from_dict", gltf_from_dict, document)
+strict = bench("gltf_from_dict (strict)", lambda d: gltf_from_dict(d, strict=True), document)
+
+print("speedup: {:.1f}x, {:.1f}x in strict mode".format(reference / fast, reference / strict))
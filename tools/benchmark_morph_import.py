@@ -0,0 +1,177 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file compares the creation of shape keys during import
+# (BlenderMesh.set_shape_keys, and the former bmesh round trip per target and primitive, kept here as reference)
+# on a synthetic face rig, a grid with many morph targets, and checks that both give the same shape keys.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_morph_import.py -- -n 100 -t 60
+
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+
+import bmesh
+import bpy
+import numpy as np
+
+from io_scene_gltf2.io.imp.gltf2_io_gltf import glTFImporter
+from io_scene_gltf2.io.imp.gltf2_io_binary import BinaryData
+from io_scene_gltf2.blender.imp.gltf2_blender_mesh import BlenderMesh
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--size", type=int, default=100, help="number of vertices on each side of the grid")
+ap.add_argument("-t", "--targets", type=int, default=60, help="number of morph targets")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+
+def face_rig(path, size, nb_targets):
+    """A grid whose vertices are shuffled in the file, each target moves a random region of it."""
+    rng = np.random.RandomState(0)
+    x, y = np.meshgrid(np.linspace(-1, 1, size), np.linspace(-1, 1, size))
+    positions = np.stack([x.ravel(), y.ravel(), np.zeros(size * size)], axis=1).astype('<f4')
+    quads = (np.arange(size - 1)[:, np.newaxis] * size + np.arange(size - 1)).ravel()
+    indices = np.stack([quads, quads + 1, quads + size, quads + size, quads + 1, quads + size + 1], axis=1)
+
+    # Vertices are not stored in the order of their first use, as often in exported files
+    order = rng.permutation(len(positions))
+    positions = positions[order]
+    indices = np.argsort(order)[indices].astype('<u4')
+
+    chunks = [positions, indices]
+    for _ in range(nb_targets):
+        center = rng.uniform(-1, 1, 2)
+        weight = np.exp(-np.sum((positions[:, :2] - center) ** 2, axis=1) * 20)
+        chunks.append((weight[:, np.newaxis] * rng.uniform(-0.1, 0.1, 3)).astype('<f4'))
+
+    data = b''
+    views = []
+    for chunk in chunks:
+        views.append({"buffer": 0, "byteOffset": len(data), "byteLength": chunk.nbytes})
+        data += chunk.tobytes()
+    accessors = [
+        {"bufferView": 0, "componentType": 5126, "count": len(positions), "type": "VEC3",
+         "min": positions.min(axis=0).tolist(), "max": positions.max(axis=0).tolist()},
+        {"bufferView": 1, "componentType": 5125, "count": indices.size, "type": "SCALAR"},
+    ]
+    accessors += [{"bufferView": 2 + i, "componentType": 5126, "count": len(positions), "type": "VEC3"}
+                  for i in range(nb_targets)]
+    gltf = {
+        "asset": {"version": "2.0"},
+        "buffers": [{"byteLength": len(data),
+                     "uri": "data:application/octet-stream;base64," + base64.b64encode(data).decode()}],
+        "bufferViews": views,
+        "accessors": accessors,
+        "meshes": [{
+            "primitives": [{"attributes": {"POSITION": 0}, "indices": 1,
+                            "targets": [{"POSITION": 2 + i} for i in range(nb_targets)]}],
+            "weights": [0.0] * nb_targets,
+            "extras": {"targetNames": ["Shape_" + str(i) for i in range(nb_targets)]},
+        }],
+        "nodes": [{"mesh": 0}],
+        "scenes": [{"nodes": [0]}],
+    }
+    with open(path, "w") as file:
+        json.dump(gltf, file)
+
+
+def former_shape_keys(gltf, pymesh, mesh, obj):
+    obj.shape_key_add(name="Basis")
+    for sk in range(len(pymesh.primitives[0].targets)):
+        obj.shape_key_add(name=pymesh.extras['targetNames'][sk])
+        offset_idx = 0
+        for prim in pymesh.primitives:
+            bm = bmesh.new()
+            bm.from_mesh(mesh)
+
+            shape_layer = bm.verts.layers.shape[sk + 1]
+            original_pos = BinaryData.get_data_from_accessor(gltf, prim.targets[sk]['POSITION'])
+            indices = BinaryData.get_data_from_accessor(gltf, prim.indices)
+
+            tmp_indices = {}
+            tmp_idx = 0
+            pos = []
+            for i in indices:
+                if i[0] not in tmp_indices.keys():
+                    tmp_indices[i[0]] = tmp_idx
+                    tmp_idx += 1
+                    pos.append(original_pos[i[0]])
+
+            for vert in bm.verts:
+                if vert.index not in range(offset_idx, offset_idx + prim.vertices_length):
+                    continue
+
+                shape = vert[shape_layer]
+                co = list(pos[vert.index - offset_idx])
+                shape.x = obj.data.vertices[vert.index].co.x + co[0]
+                shape.y = obj.data.vertices[vert.index].co.y + co[1]
+                shape.z = obj.data.vertices[vert.index].co.z + co[2]
+
+            bm.to_mesh(obj.data)
+            bm.free()
+            offset_idx += prim.vertices_length
+
+
+def shape_keys(obj):
+    key_blocks = obj.data.shape_keys.key_blocks
+    co = np.empty((len(key_blocks), len(obj.data.vertices) * 3), dtype=np.float32)
+    for key_block, key_co in zip(key_blocks, co):
+        key_block.data.foreach_get('co', key_co)
+    return [key_block.name for key_block in key_blocks], co
+
+
+def bench(name, func, gltf, pymesh, mesh, obj):
+    best = None
+    for _ in range(args["repeat"]):
+        obj.shape_key_clear()
+        gltf.shapekeys = {}
+        start = time.perf_counter()
+        func(gltf, pymesh, mesh, obj)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s".format(name, best))
+    return best, shape_keys(obj)
+
+
+directory = tempfile.mkdtemp()
+path = os.path.join(directory, "face_rig.gltf")
+face_rig(path, args["size"], args["targets"])
+
+gltf = glTFImporter(path, {'import_shading': 'NORMALS'})
+gltf.read()
+gltf.checks()
+pymesh = gltf.data.meshes[0]
+mesh = BlenderMesh.create(gltf, 0, None, None)
+obj = bpy.data.objects.new("Face", mesh)
+bpy.context.scene.collection.objects.link(obj)
+print("{} vertices, {} morph targets".format(len(mesh.vertices), args["targets"]))
+
+reference, (reference_names, reference_co) = bench("former bmesh round trips", former_shape_keys,
+                                                    gltf, pymesh, mesh, obj)
+fast, (fast_names, fast_co) = bench("BlenderMesh.set_shape_keys", BlenderMesh.set_shape_keys, gltf, pymesh, mesh, obj)
+
+assert reference_names == fast_names, "Shape key names differ"
+error = np.abs(reference_co - fast_co).max()
+assert error < 1e-6, "Shape keys differ by {}".format(error)
+print("max difference {:.2e}, speedup: {:.1f}x".format(error, reference / fast))
+
+os.remove(path)
+os.rmdir(directory)
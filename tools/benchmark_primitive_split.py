@@ -0,0 +1,435 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file compares the splitting of primitives with 65535 vertices or more
+# (split_primitive, and the former splitting by index ranges, kept here as reference)
+# on a UV mapped grid, and checks that both produce the same triangles.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_primitive_split.py -- -n 1000
+
+import argparse
+import sys
+import time
+
+import bpy
+import numpy as np
+
+from io_scene_gltf2.blender.exp import gltf2_blender_extract
+from io_scene_gltf2.blender.exp.gltf2_blender_extract import (
+    INDICES_ID, MATERIAL_ID, ATTRIBUTES_ID,
+    COLOR_PREFIX, MORPH_TANGENT_PREFIX, MORPH_NORMAL_PREFIX, MORPH_POSITION_PREFIX, TEXCOORD_PREFIX,
+    WEIGHTS_PREFIX, JOINTS_PREFIX,
+    TANGENT_ATTRIBUTE, NORMAL_ATTRIBUTE, POSITION_ATTRIBUTE
+)
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--subdivisions", type=int, default=1000, help="grid subdivisions (n x n quads)")
+ap.add_argument("-s", "--shuffle", action="store_true", help="shuffle the polygons of the grid")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+RANGE_INDICES = 65535
+
+
+def uv_grid(subdivisions, shuffle):
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions,
+                                    calc_uvs=True)
+    blender_object = bpy.context.object
+    if shuffle:
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.mesh.sort_elements(type='RANDOMIZE', elements={'FACE'})
+        bpy.ops.object.mode_set(mode='OBJECT')
+    return blender_object
+
+
+# Former functions, unchanged, working on lists
+
+
+def extract_primitive_floor(a, indices, use_tangents):
+    """Shift indices, that the first one starts with 0. It is assumed, that the indices are packed."""
+    attributes = {
+        POSITION_ATTRIBUTE: [],
+        NORMAL_ATTRIBUTE: []
+    }
+
+    if use_tangents:
+        attributes[TANGENT_ATTRIBUTE] = []
+
+    result_primitive = {
+        MATERIAL_ID: a[MATERIAL_ID],
+        INDICES_ID: [],
+        ATTRIBUTES_ID: attributes
+    }
+
+    source_attributes = a[ATTRIBUTES_ID]
+
+    #
+
+    tex_coord_index = 0
+    process_tex_coord = True
+    while process_tex_coord:
+        tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
+
+        if source_attributes.get(tex_coord_id) is not None:
+            attributes[tex_coord_id] = []
+            tex_coord_index += 1
+        else:
+            process_tex_coord = False
+
+    tex_coord_max = tex_coord_index
+
+    #
+
+    color_index = 0
+    process_color = True
+    while process_color:
+        color_id = COLOR_PREFIX + str(color_index)
+
+        if source_attributes.get(color_id) is not None:
+            attributes[color_id] = []
+            color_index += 1
+        else:
+            process_color = False
+
+    color_max = color_index
+
+    #
+
+    bone_index = 0
+    process_bone = True
+    while process_bone:
+        joint_id = JOINTS_PREFIX + str(bone_index)
+        weight_id = WEIGHTS_PREFIX + str(bone_index)
+
+        if source_attributes.get(joint_id) is not None:
+            attributes[joint_id] = []
+            attributes[weight_id] = []
+            bone_index += 1
+        else:
+            process_bone = False
+
+    bone_max = bone_index
+
+    #
+
+    morph_index = 0
+    process_morph = True
+    while process_morph:
+        morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
+        morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
+        morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+
+        if source_attributes.get(morph_position_id) is not None:
+            attributes[morph_position_id] = []
+            attributes[morph_normal_id] = []
+            if use_tangents:
+                attributes[morph_tangent_id] = []
+            morph_index += 1
+        else:
+            process_morph = False
+
+    morph_max = morph_index
+
+    #
+
+    min_index = min(indices)
+    max_index = max(indices)
+
+    for old_index in indices:
+        result_primitive[INDICES_ID].append(old_index - min_index)
+
+    for old_index in range(min_index, max_index + 1):
+        for vi in range(0, 3):
+            attributes[POSITION_ATTRIBUTE].append(source_attributes[POSITION_ATTRIBUTE][old_index * 3 + vi])
+            attributes[NORMAL_ATTRIBUTE].append(source_attributes[NORMAL_ATTRIBUTE][old_index * 3 + vi])
+
+        if use_tangents:
+            for vi in range(0, 4):
+                attributes[TANGENT_ATTRIBUTE].append(source_attributes[TANGENT_ATTRIBUTE][old_index * 4 + vi])
+
+        for tex_coord_index in range(0, tex_coord_max):
+            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
+            for vi in range(0, 2):
+                attributes[tex_coord_id].append(source_attributes[tex_coord_id][old_index * 2 + vi])
+
+        for color_index in range(0, color_max):
+            color_id = COLOR_PREFIX + str(color_index)
+            for vi in range(0, 4):
+                attributes[color_id].append(source_attributes[color_id][old_index * 4 + vi])
+
+        for bone_index in range(0, bone_max):
+            joint_id = JOINTS_PREFIX + str(bone_index)
+            weight_id = WEIGHTS_PREFIX + str(bone_index)
+            for vi in range(0, 4):
+                attributes[joint_id].append(source_attributes[joint_id][old_index * 4 + vi])
+                attributes[weight_id].append(source_attributes[weight_id][old_index * 4 + vi])
+
+        for morph_index in range(0, morph_max):
+            morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
+            morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
+            morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+            for vi in range(0, 3):
+                attributes[morph_position_id].append(source_attributes[morph_position_id][old_index * 3 + vi])
+                attributes[morph_normal_id].append(source_attributes[morph_normal_id][old_index * 3 + vi])
+            if use_tangents:
+                for vi in range(0, 4):
+                    attributes[morph_tangent_id].append(source_attributes[morph_tangent_id][old_index * 4 + vi])
+
+    return result_primitive
+
+
+def extract_primitive_pack(a, indices, use_tangents):
+    """Pack indices, that the first one starts with 0. Current indices can have gaps."""
+    attributes = {
+        POSITION_ATTRIBUTE: [],
+        NORMAL_ATTRIBUTE: []
+    }
+
+    if use_tangents:
+        attributes[TANGENT_ATTRIBUTE] = []
+
+    result_primitive = {
+        MATERIAL_ID: a[MATERIAL_ID],
+        INDICES_ID: [],
+        ATTRIBUTES_ID: attributes
+    }
+
+    source_attributes = a[ATTRIBUTES_ID]
+
+    #
+
+    tex_coord_index = 0
+    process_tex_coord = True
+    while process_tex_coord:
+        tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
+
+        if source_attributes.get(tex_coord_id) is not None:
+            attributes[tex_coord_id] = []
+            tex_coord_index += 1
+        else:
+            process_tex_coord = False
+
+    tex_coord_max = tex_coord_index
+
+    #
+
+    color_index = 0
+    process_color = True
+    while process_color:
+        color_id = COLOR_PREFIX + str(color_index)
+
+        if source_attributes.get(color_id) is not None:
+            attributes[color_id] = []
+            color_index += 1
+        else:
+            process_color = False
+
+    color_max = color_index
+
+    #
+
+    bone_index = 0
+    process_bone = True
+    while process_bone:
+        joint_id = JOINTS_PREFIX + str(bone_index)
+        weight_id = WEIGHTS_PREFIX + str(bone_index)
+
+        if source_attributes.get(joint_id) is not None:
+            attributes[joint_id] = []
+            attributes[weight_id] = []
+            bone_index += 1
+        else:
+            process_bone = False
+
+    bone_max = bone_index
+
+    #
+
+    morph_index = 0
+    process_morph = True
+    while process_morph:
+        morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
+        morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
+        morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+
+        if source_attributes.get(morph_position_id) is not None:
+            attributes[morph_position_id] = []
+            attributes[morph_normal_id] = []
+            if use_tangents:
+                attributes[morph_tangent_id] = []
+            morph_index += 1
+        else:
+            process_morph = False
+
+    morph_max = morph_index
+
+    #
+
+    old_to_new_indices = {}
+    new_to_old_indices = {}
+
+    new_index = 0
+    for old_index in indices:
+        if old_to_new_indices.get(old_index) is None:
+            old_to_new_indices[old_index] = new_index
+            new_to_old_indices[new_index] = old_index
+            new_index += 1
+
+        result_primitive[INDICES_ID].append(old_to_new_indices[old_index])
+
+    end_new_index = new_index
+
+    for new_index in range(0, end_new_index):
+        old_index = new_to_old_indices[new_index]
+
+        for vi in range(0, 3):
+            attributes[POSITION_ATTRIBUTE].append(source_attributes[POSITION_ATTRIBUTE][old_index * 3 + vi])
+            attributes[NORMAL_ATTRIBUTE].append(source_attributes[NORMAL_ATTRIBUTE][old_index * 3 + vi])
+
+        if use_tangents:
+            for vi in range(0, 4):
+                attributes[TANGENT_ATTRIBUTE].append(source_attributes[TANGENT_ATTRIBUTE][old_index * 4 + vi])
+
+        for tex_coord_index in range(0, tex_coord_max):
+            tex_coord_id = TEXCOORD_PREFIX + str(tex_coord_index)
+            for vi in range(0, 2):
+                attributes[tex_coord_id].append(source_attributes[tex_coord_id][old_index * 2 + vi])
+
+        for color_index in range(0, color_max):
+            color_id = COLOR_PREFIX + str(color_index)
+            for vi in range(0, 4):
+                attributes[color_id].append(source_attributes[color_id][old_index * 4 + vi])
+
+        for bone_index in range(0, bone_max):
+            joint_id = JOINTS_PREFIX + str(bone_index)
+            weight_id = WEIGHTS_PREFIX + str(bone_index)
+            for vi in range(0, 4):
+                attributes[joint_id].append(source_attributes[joint_id][old_index * 4 + vi])
+                attributes[weight_id].append(source_attributes[weight_id][old_index * 4 + vi])
+
+        for morph_index in range(0, morph_max):
+            morph_position_id = MORPH_POSITION_PREFIX + str(morph_index)
+            morph_normal_id = MORPH_NORMAL_PREFIX + str(morph_index)
+            morph_tangent_id = MORPH_TANGENT_PREFIX + str(morph_index)
+            for vi in range(0, 3):
+                attributes[morph_position_id].append(source_attributes[morph_position_id][old_index * 3 + vi])
+                attributes[morph_normal_id].append(source_attributes[morph_normal_id][old_index * 3 + vi])
+            if use_tangents:
+                for vi in range(0, 4):
+                    attributes[morph_tangent_id].append(source_attributes[morph_tangent_id][old_index * 4 + vi])
+
+    return result_primitive
+
+
+def range_split(primitive):
+    """Former algorithm: bucket triangles by index range, and repeat on the triangles across ranges."""
+    result_primitives = []
+    use_tangents = TANGENT_ATTRIBUTE in primitive[ATTRIBUTES_ID]
+
+    pending_primitive = primitive
+    pending_indices = pending_primitive[INDICES_ID]
+
+    while len(pending_indices) > 0:
+        process_indices = pending_primitive[INDICES_ID]
+        max_index = max(process_indices)
+
+        pending_indices = []
+        all_local_indices = [[] for _ in range(max_index // RANGE_INDICES + 1)]
+
+        for face_index in range(0, len(process_indices), 3):
+            face = process_indices[face_index:face_index + 3]
+            face_min_index = min(face)
+            face_max_index = max(face)
+
+            written = False
+            for i in range(0, (max_index // RANGE_INDICES) + 1):
+                offset = i * RANGE_INDICES
+                if face_min_index >= offset and face_max_index < offset + RANGE_INDICES:
+                    all_local_indices[i].extend(face)
+                    written = True
+                    break
+
+            if not written:
+                pending_indices.extend(face)
+
+        for local_indices in all_local_indices:
+            if len(local_indices) > 0:
+                result_primitives.append(extract_primitive_floor(pending_primitive, local_indices, use_tangents))
+
+        if len(pending_indices) > 0:
+            pending_primitive = extract_primitive_pack(pending_primitive, pending_indices, use_tangents)
+
+    return result_primitives
+
+
+def as_lists(primitive):
+    """Primitive with lists, as the former extraction made them."""
+    return {
+        MATERIAL_ID: primitive[MATERIAL_ID],
+        INDICES_ID: primitive[INDICES_ID].tolist(),
+        ATTRIBUTES_ID: {attribute_id: attribute.tolist()
+                        for attribute_id, attribute in primitive[ATTRIBUTES_ID].items()}
+    }
+
+
+def linear_split(primitive):
+    return list(gltf2_blender_extract.split_primitive(primitive, RANGE_INDICES))
+
+
+def triangles(primitives):
+    """Attributes of the corners of all triangles, one row per triangle, in a canonical order."""
+    rows = []
+    for primitive in primitives:
+        indices = np.asarray(primitive['indices'])
+        assert indices.max() < RANGE_INDICES
+        vertex_count = len(primitive['attributes']['POSITION']) // 3
+        corners = [np.asarray(attribute, dtype=np.float64).reshape(vertex_count, -1)[indices]
+                   for _, attribute in sorted(primitive['attributes'].items())]
+        rows.append(np.hstack(corners).reshape(len(indices) // 3, -1))
+    rows = np.concatenate(rows)
+    return rows[np.lexsort(rows.T[::-1])]
+
+
+def bench(name, func, *arguments):
+    best = None
+    for _ in range(args["repeat"]):
+        start = time.perf_counter()
+        result = func(*arguments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s {:4} primitives".format(name, best, len(result)))
+    return best, result
+
+
+export_settings = {
+    'gltf_yup': True,
+    'gltf_texcoords': True,
+    'gltf_skins': False,
+    'gltf_morph': False,
+    'gltf_split_primitives': False,
+    'gltf_all_vertex_influences': False
+}
+
+mesh = uv_grid(args["subdivisions"], args["shuffle"]).data
+primitive, = gltf2_blender_extract.extract_primitives(None, mesh, None, None, export_settings)
+print("{} triangles, {} vertices".format(len(primitive['indices']) // 3, len(primitive['attributes']['POSITION']) // 3))
+
+reference, reference_primitives = bench("split by index ranges", range_split, as_lists(primitive))
+fast, fast_primitives = bench("split_primitive", linear_split, primitive)
+
+assert np.array_equal(triangles(reference_primitives), triangles(fast_primitives)), "Split primitives differ"
+print("same triangles, speedup: {:.1f}x".format(reference / fast))
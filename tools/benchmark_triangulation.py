@@ -0,0 +1,95 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file compares the triangulation of meshes during export
+# (Blender loop triangles, and tessellation of polygons one by one)
+# on a quad grid, with some n-gons, and times the whole primitive extraction.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python benchmark_triangulation.py -- -n 1000
+
+import argparse
+import sys
+import time
+
+import bpy
+import numpy as np
+
+from io_scene_gltf2.blender.exp import gltf2_blender_extract
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-n", "--subdivisions", type=int, default=1000, help="grid subdivisions (n x n quads)")
+ap.add_argument("-g", "--ngons", type=float, default=0.01, help="fraction of quads dissolved into n-gons")
+ap.add_argument("-r", "--repeat", type=int, default=3, help="number of runs, best one is kept")
+args = vars(ap.parse_args(argv))
+
+
+def quad_grid(subdivisions, ngons):
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions)
+    blender_object = bpy.context.object
+    if ngons > 0:
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='DESELECT')
+        bpy.ops.mesh.select_mode(type='FACE')
+        bpy.ops.mesh.select_random(ratio=ngons, seed=0)
+        bpy.ops.mesh.select_more()
+        bpy.ops.mesh.dissolve_faces()
+        bpy.ops.object.mode_set(mode='OBJECT')
+    return blender_object
+
+
+def get_array(collection, attribute, components):
+    array = np.empty(len(collection) * components, dtype=np.int32)
+    collection.foreach_get(attribute, array)
+    return array
+
+
+def tessellate(blender_mesh):
+    vertex_locations = np.empty(len(blender_mesh.vertices) * 3, dtype=np.float32)
+    blender_mesh.vertices.foreach_get('co', vertex_locations)
+    return gltf2_blender_extract.tessellate_polygons(
+        get_array(blender_mesh.polygons, 'loop_start', 1),
+        get_array(blender_mesh.polygons, 'loop_total', 1),
+        get_array(blender_mesh.loops, 'vertex_index', 1),
+        vertex_locations.reshape(-1, 3))
+
+
+def bench(name, func, *arguments):
+    best = None
+    for _ in range(args["repeat"]):
+        start = time.perf_counter()
+        func(*arguments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:8.3f}s".format(name, best))
+    return best
+
+
+export_settings = {
+    'gltf_yup': True,
+    'gltf_skins': False,
+    'gltf_morph': False,
+    'gltf_split_primitives': True,
+    'gltf_all_vertex_influences': False
+}
+
+mesh = quad_grid(args["subdivisions"], args["ngons"]).data
+print("{} polygons, {} loops".format(len(mesh.polygons), len(mesh.loops)))
+
+reference = bench("tessellate_polygons", tessellate, mesh)
+fast = bench("get_loop_triangles", gltf2_blender_extract.get_loop_triangles, mesh)
+bench("extract_primitives", gltf2_blender_extract.extract_primitives, None, mesh, None, None, export_settings)
+
+print("triangulation speedup: {:.1f}x".format(reference / fast))
@@ -0,0 +1,105 @@
+# Copyright 2018-2019 The glTF-Blender-IO authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file exports a synthetic character, an armature with several actions in NLA tracks, with sampled animations,
+# and reports the size of the animation sampler inputs (key times), shared between samplers with the same ones,
+# compared with one input per sampler.
+# Half of the actions are shorter than the others, so not all samplers have the same inputs.
+# Must be run from Blender, with the addon enabled:
+# blender -b --addons io_scene_gltf2 --python report_sampler_inputs.py -- -b 50 -a 8 -f 100
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+import bpy
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+ap = argparse.ArgumentParser()
+ap.add_argument("-b", "--bones", type=int, default=50, help="number of bones")
+ap.add_argument("-a", "--actions", type=int, default=8, help="number of actions")
+ap.add_argument("-f", "--frames", type=int, default=100, help="number of frames of the longest actions")
+args = vars(ap.parse_args(argv))
+
+
+def character(nb_bones, nb_actions, nb_frames):
+    """A chain of bones, each action keys all of them on a few frames."""
+    random.seed(0)
+    bpy.ops.object.armature_add()
+    armature = bpy.context.object
+    bpy.ops.object.mode_set(mode='EDIT')
+    parent = armature.data.edit_bones[0]
+    for i in range(nb_bones - 1):
+        bone = armature.data.edit_bones.new("Bone_" + str(i))
+        bone.head = parent.tail
+        bone.tail = parent.tail + parent.vector
+        bone.parent = parent
+        parent = bone
+    bpy.ops.object.mode_set(mode='POSE')
+
+    armature.animation_data_create()
+    for i in range(nb_actions):
+        action = bpy.data.actions.new("Action_" + str(i))
+        armature.animation_data.action = action
+        last_frame = nb_frames if i % 2 == 0 else nb_frames // 2
+        for frame in (1, last_frame // 2, last_frame):
+            for pose_bone in armature.pose.bones:
+                pose_bone.location = [random.uniform(-0.1, 0.1) for _ in range(3)]
+                pose_bone.rotation_quaternion = [1.0] + [random.uniform(-0.2, 0.2) for _ in range(3)]
+                for data_path in ("location", "rotation_quaternion", "scale"):
+                    pose_bone.keyframe_insert(data_path, frame=frame)
+        track = armature.animation_data.nla_tracks.new()
+        track.strips.new(action.name, 1, action)
+    armature.animation_data.action = None
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def input_sizes(gltf):
+    """Number of samplers, number of inputs, and bytes of all the inputs, shared or not."""
+    samplers = [sampler for animation in gltf.get("animations", []) for sampler in animation["samplers"]]
+    accessors = gltf["accessors"]
+    views = gltf["bufferViews"]
+
+    def byte_length(accessor):
+        return views[accessors[accessor]["bufferView"]]["byteLength"]
+
+    inputs = set(sampler["input"] for sampler in samplers)
+    return (len(samplers),
+            len(inputs),
+            sum(byte_length(sampler["input"]) for sampler in samplers),
+            sum(byte_length(accessor) for accessor in inputs))
+
+
+character(args["bones"], args["actions"], args["frames"])
+
+directory = tempfile.mkdtemp()
+path = os.path.join(directory, "character.gltf")
+bpy.ops.export_scene.gltf(filepath=path, export_format='GLTF_SEPARATE', export_force_sampling=True)
+with open(path) as file:
+    nb_samplers, nb_inputs, unshared, shared = input_sizes(json.load(file))
+
+print("{} bones, {} actions, {} frames".format(args["bones"], args["actions"], args["frames"]))
+print("{:<32} {:8d}".format("samplers", nb_samplers))
+print("{:<32} {:8d}".format("inputs", nb_inputs))
+print("{:<32} {:8d}".format("input bytes, one per sampler", unshared))
+print("{:<32} {:8d}".format("input bytes, shared", shared))
+print("input bytes saved: {} ({:.1f}%)".format(unshared - shared, 100 * (unshared - shared) / max(unshared, 1)))
+
+for name in os.listdir(directory):
+    os.remove(os.path.join(directory, name))
+os.rmdir(directory)